@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+# filename: bench_parseTimeline.py
+# description:
+#   Benchmarks the bulk tokenizer behind EdgeTimeline.from_file against
+#   the per-line regex path (read_file + parse_edges_from_str_list) on
+#   the same full_bindingsites.data file, and checks they agree.
+#
+#   Without an input file, a synthetic 50001-line file in the dotted
+#   format (20 receptors, 20 ligands) is generated in a temp directory.
+#--------------------------------------------------------------------
+# usage:
+#   bench_parseTimeline.py [<ifname>] [<numRepeats>]
+#--------------------------------------------------------------------
+
+import os
+import sys
+import time
+import tempfile
+
+import numpy as np
+
+from util_fullBindingSitesParser import read_file, parse_edges_from_str_list
+from util_edgeTimeline import EdgeTimeline
+from util_testFixtures import gen_synthetic_file
+
+
+def best_time(fn, numRepeats):
+    best = None
+    result = None
+    for i in range(0, numRepeats):
+        start = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if (best is None) else min(best, elapsed)
+    return best, result
+
+def main():
+    tmpDir = None
+    if len(sys.argv) > 1:
+        ifname = sys.argv[1]
+    else:
+        tmpDir = tempfile.mkdtemp()
+        ifname = os.path.join( tmpDir, "full_bindingsites.data" )
+        print( "Generating synthetic input: {}".format( ifname ))
+        gen_synthetic_file( ifname )
+    numRepeats = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    tRegex, llist_edges = best_time( lambda: parse_edges_from_str_list( read_file(ifname) ), numRepeats )
+    tBulk, timeline = best_time( lambda: EdgeTimeline.from_file( ifname ), numRepeats )
+
+    expected = EdgeTimeline.from_edge_lists( llist_edges )
+    agree = np.array_equal( expected.edges, timeline.edges ) and np.array_equal( expected.offsets, timeline.offsets )
+
+    print( "input: {} ({} bytes, {} timesteps, {} edges)".format(
+        ifname, os.path.getsize(ifname), len(timeline), len(timeline.edges) ))
+    print( "regex path (read_file + parse_edges_from_str_list): {:.3f} s".format( tRegex ))
+    print( "bulk tokenizer (EdgeTimeline.from_file):            {:.3f} s".format( tBulk ))
+    print( "speedup: {:.1f}x".format( tRegex / tBulk ))
+    print( "results agree: {}".format( agree ))
+
+    if tmpDir is not None:
+        os.remove( ifname )
+        os.rmdir( tmpDir )
+    return 0 if agree else 1
+
+if __name__ == "__main__":
+    sys.exit( main() )
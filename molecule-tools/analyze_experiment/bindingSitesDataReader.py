@@ -35,7 +35,8 @@
 #--------------------------------------------------------------------
 
 import sys
-import re
+
+from util_bindingSitesEngine import parse_edges_from_str, load_timeline
 
 USAGE = """
 usage:
@@ -82,35 +83,27 @@ def ut_parseGraphFromStr(inputLine, expectedVertices, expectedEdges):
     return result
 
 
-def parseGraphFromStr(line):
+def parseGraphFromStr(line, dialect=None):
     """generate a graph G=(V,E) from a single line"""
     V = []
     E = []
 
-    re_boundPair = "\(\d+\.\d+,\d+\.\d+\)"
-    #re_specific = r'(?P<mol1>\d+).(?P<site1>\d+),(?<mol2>\d+).(?<site2>\d+)'
-
-    listOfBoundPairs = re.findall(re_boundPair, line)   ## list of strings '(m1.b1,m2.b2)', ...
-    for boundPairStr in listOfBoundPairs:
-        numbers = re.findall("\d+", boundPairStr)
-        mol1 = int(numbers[0])
-        site1 = int(numbers[1])
-        mol2 = int(numbers[2])
-        site2 = int(numbers[3])
-        E.append( (mol1,mol2,site1,site2) )
-        V.append( mol1 )
-        V.append( mol2 )
+    ## bound pairs are parsed by the shared engine (any input dialect; dotted by default).
+    for e in parse_edges_from_str(line, dialect):
+        E.append( (e.mol1, e.mol2, e.bsite1, e.bsite2) )
+        V.append( e.mol1 )
+        V.append( e.mol2 )
     return (V,E)
 
-def readBindingSitesData(fname):
+def readBindingSitesData(fname, dialect=None):
     """For each line in fname, generate a graph G=(V,E)."""
     graphList = []
-    with open(fname) as f:
-        lines = f.readlines()
-        for l in lines:
-            l = l.strip()
-            (V,E) = parseGraphFromStr(l)
-            graphList.append( (V,E) )
+    timeline = load_timeline(fname, dialect)
+    for rows in timeline:
+        ## rows are (mol1,site1,mol2,site2); graphs store (mol1,mol2,site1,site2).
+        E = [ tuple(r) for r in rows[:, (0,2,1,3)].tolist() ]
+        V = [ v for (mol1,mol2,site1,site2) in E for v in (mol1,mol2) ]
+        graphList.append( (V,E) )
     return graphList
 
 def writeBindingSitesDataAsGraphs(ofname, graphList):
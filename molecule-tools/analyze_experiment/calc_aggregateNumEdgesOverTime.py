@@ -9,33 +9,56 @@ import glob
 import pandas as pd
 import numpy as np
 
-from util_fullBindingSitesParser import *
+from util_bindingSitesEngine import *
+from util_runDiscovery import find_runs, load_runs_into
+from util_sampling import pop_sampling_arg, load_sampled_timeline
 
 
-def aggNumEdgesOverTime( ifnameBase ):
-    maxTimesteps = 50001
+def numEdgesOfRun( fname, sampling=None ):
+    """Returns the number of edges at each (sampled) timestep of one run."""
+    if sampling is None:
+        return load_timeline( fname, numWorkers=1 ).num_edges()  ## the runs are already spread over threads
+    timeline, timesteps = load_sampled_timeline( fname, sampling )
+    numEdges, labels = sampling.reduce( timeline.num_edges(), timesteps )
+    return numEdges
+
+def aggNumEdgesOverTime( ifnameBase, sampling=None, numWorkers=None, numTimesteps=None ):
+    """Returns (timesteps, M): the number of edges at each (sampled) timestep, one column per run, in runID order.
+    numTimesteps is the length of the runs (default: that of the first run). A shorter run leaves
+    its last rows 0, with a warning; a longer one is an error."""
     numRuns = 100
-    M = np.zeros( (maxTimesteps, numRuns) )
-    for fname in glob.glob( "**/{}".format( ifnameBase )):
-        ## ==== Warning! the order these files are read is no by runID ====
-        print( "fname: {}".format( fname ))
-        str_list = read_file( fname )
-        llist_edges = parse_edges_from_str_list( str_list )
-
-        t = 0
-        for listOfEdges in llist_edges:
-            numEdges = len( listOfEdges )
-            M[t] = numEdges
-            t = 1 + t
-        break ## remove me after debug.
-    return M
+    runs = find_runs( "**/{}".format( ifnameBase ))
+    print( "runIDs: {}".format( [ runID for runID, fname in runs ] ))
+    if (numTimesteps is None) and runs:
+        numTimesteps = count_timesteps( runs[0][1] )
+    labels = np.arange( numTimesteps or 0 )
+    if sampling is not None:
+        timesteps = sampling.timesteps( len(labels) )
+        _, labels = sampling.reduce( np.zeros( len(timesteps) ), timesteps )
+    M = np.zeros( (len(labels), max( numRuns, len(runs) )) )
+    fnames = [ fname for runID, fname in runs ]
+
+    def store( slot, numEdges ):
+        if len(numEdges) > len(labels):
+            raise ValueError( "{} has {} rows, more than the {} of {} timesteps.".format(
+                fnames[slot], len(numEdges), len(labels), numTimesteps ))
+        if len(numEdges) < len(labels):
+            print( "[Warning] {} has {} rows, fewer than the {} of {} timesteps.".format(
+                fnames[slot], len(numEdges), len(labels), numTimesteps ), file=sys.stderr )
+        M[ :len(numEdges), slot ] = numEdges
+    load_runs_into( fnames, lambda fname: numEdgesOfRun( fname, sampling ), store, numWorkers )
+    return labels, M
 
 
 def main():
-    expName = sys.argv[1]
-    ifnameBase = sys.argv[2]
-    M = aggNumEdgesOverTime( ifnameBase )
+    sampling, argv = pop_sampling_arg( sys.argv )  ## e.g. --sample=stride:10 (see util_sampling)
+    expName = argv[1]
+    ifnameBase = argv[2]
+    numWorkers = int( argv[3] ) if (len(argv) > 3) else None
+    numTimesteps = int( argv[4] ) if (len(argv) > 4) else None  ## default: the length of the first run
+    timesteps, M = aggNumEdgesOverTime( ifnameBase, sampling, numWorkers, numTimesteps )
 
+    print( "timesteps: {}".format( timesteps ))
     print( "M: {}".format( M ))
 
     
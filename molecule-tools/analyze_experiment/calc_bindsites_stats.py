@@ -15,12 +15,24 @@
 #     corresponding molecule.
 #
 #   Example row: (1,1,2,2),(1,2,3,4);
+#
+#   The raw simulator format, where each edge is written as
+#     (Mol1.Bind1,Mol2.Bind2), is also accepted directly, so there
+#     is no need to replace periods with commas beforehand.
+#
+#   Example row: [(1.1,2.2),(1.2,3.4)]
 #--------------------------------------------------------------------
 
 import sys
-import re
 import csv
 
+import numpy as np
+
+## getMoleculeType is specific to this report (20 IgE, then 20 MB4N); parsing comes from the engine.
+from util_bindingSitesEngine import BindingEdge, as_binding_edges, load_timeline, \
+    read_file, parse_edges_from_str, parse_edges_from_str_list
+from util_siteOccupancy import as_timeline, num_molecules_of, build_occupancy, count_sites_bound
+from util_sampling import pop_sampling_arg, load_sampled_timeline, format_labelled_rows
 
 
 USAGE_STR = """
@@ -33,6 +45,8 @@ USAGE_STR = """
           <molType> = {-1:UNKNOWN, 0:IgE, 1:MB4N},
           <totalMols> = (int) number of molecules of the given type,
           <startIndex> = (int) starting index of molecule ID for the given type
+          [--sample=<items>] = only some timesteps, e.g. --sample=stride:10,average:100
+                               (see util_sampling); each row then starts with its timestep
 
  Usage #2:
    python2 calc_bindsites_stats.py <report-file>
@@ -46,9 +60,6 @@ MOLTYPE_UNKNOWN = -1
 MOLTYPE_IGE = 0
 MOLTYPE_MB4N = 1
 
-p = re.compile('\(\d+,\d+,\d+\,\d+\)')  ## RE for (mol1,b1,mol2,b2)
-p2 = re.compile('\d+')
-
 def getMoleculeType( mol_id ):
     molType = MOLTYPE_UNKNOWN
     if (mol_id >= 0) and (mol_id <= 19):
@@ -67,27 +78,6 @@ def isMoltype( moltype, mol_id ):
     return moltype == getMoleculeType( mol_id )
 
 
-class BindingEdge:
-    def __init__(self, mol1, bsite1, mol2, bsite2):
-        self.mol1 = int(mol1)
-        self.bsite1 = int(bsite1)
-        self.mol2 = int(mol2)
-        self.bsite2 = int(bsite2)
-
-    def __init__(self, s):
-        """Constructor given a string representing a tuple (m1,b1,m2,b2)"""
-        clean_s = s[1:-1]  ## removes '(' and ')' characters
-        result = clean_s.split(',')
-        self.mol1 = int(result[0])
-        self.bsite1 = int(result[1])
-        self.mol2 = int(result[2])
-        self.bsite2 = int(result[3])
-
-    def __str__(self):
-        s = "({},{},{},{})".format( self.mol1, self.bsite1, self.mol2, self.bsite2 )
-        return s
-
-
 class SingleStateCountReport2Valency:
     """A report for a single state (i.e. a single list of edges)."""
     def __init__(self, molType, totalMolsOfType, moltypeStartIndex, lEdges):
@@ -205,32 +195,6 @@ class SingleStateProbabiliesReport4Valency:
 ## end of class SingleStateProbabilitiesReport4Valency
 
 
-def read_file(fname):
-    """Reads aggregated binding sites file, and returns a list of strings."""
-    str_list = []
-    with open(fname) as f:
-        for line in f:
-            clean_line = line.strip()
-            str_list.append( clean_line )
-    return str_list
-
-def parse_edges_from_str_list(list_s):
-    """Parses a list of strings and returns a list of list of tuples."""
-    llist_edges = []  ## a list of list of edges
-    for s in list_s:
-        edges_list = parse_edges_from_str(s)  ## a list of edges
-        llist_edges.append( edges_list )
-    return llist_edges
-
-def parse_edges_from_str(s):
-    """Parses a string s and returns a list of BindingEdges."""
-    list_of_matched_tuples = p.findall(s)  ## list of strings (each element represents a tuple)
-    edge_list = []  ## list of BindingEdges
-    for s in list_of_matched_tuples:
-        edge = BindingEdge(s)
-        edge_list.append( edge )
-    return edge_list
-
 def q_probSingleSiteBound(bsite_id, molType, totalMolsOfType, moltypeStartIndex, lEdges):
     """query: given a single graph, what is the probability that binding site bsite_id is bound?"""
     count, tbl = count_singleSiteBound(bsite_id, molType, totalMolsOfType, moltypeStartIndex, lEdges)
@@ -272,7 +236,7 @@ def count_singleSiteBound(bsite_id, molType, totalMolsOfType, moltypeStartIndex,
     for i in range(0, totalMolsOfType):
         index = i + moltypeStartIndex
         boundSitesTable[index] = []
-    for bindingEdge in lEdges:
+    for bindingEdge in as_binding_edges( lEdges ):  ## lEdges may also be a timestep of an EdgeTimeline
         fmol1_id = bindingEdge.mol1
         fmol2_id = bindingEdge.mol2
         fbsite1_id = bindingEdge.bsite1
@@ -302,7 +266,7 @@ def count_twoSitesBound(bsite1_id, bsite2_id, molType, maxNumMolsOfType, moltype
     for i in range(0, maxNumMolsOfType):
         index = i + moltypeStartIndex
         boundSitesTable[index] = []
-    for bindingEdge in lEdges:
+    for bindingEdge in as_binding_edges( lEdges ):  ## lEdges may also be a timestep of an EdgeTimeline
         fmol1_id = bindingEdge.mol1
         fmol2_id = bindingEdge.mol2
         fbsite1_id = bindingEdge.bsite1
@@ -331,23 +295,24 @@ def calculateProbabilitiesFromCountReport(fname):
         
 
 def main():
-    numCmdArgs = len(sys.argv)
+    sampling, argv = pop_sampling_arg( sys.argv )
+    numCmdArgs = len(argv)
     print("numCmdArgs: {}".format(numCmdArgs))
     if (numCmdArgs != 6) and (numCmdArgs != 2):
         print(USAGE_STR)
         exit(1)
 
     if numCmdArgs == 2:
-        countReportFName = sys.argv[1]
+        countReportFName = argv[1]
         calculateProbabilitiesFromCountReport(countReportFName)
         return 0
 
     ## otherwise, numCmdArgs == 6...
-    ifname = sys.argv[1]
-    ofname = sys.argv[2]
-    molType = int(sys.argv[3])
-    totalMolsOfType = int(sys.argv[4])
-    moltypeStartIndex = int(sys.argv[5])
+    ifname = argv[1]
+    ofname = argv[2]
+    molType = int(argv[3])
+    totalMolsOfType = int(argv[4])
+    moltypeStartIndex = int(argv[5])
 
     print( "" )
     print( "Running script: calc_bindingsites_stats.py ...")
@@ -357,10 +322,13 @@ def main():
     print( "\tinput(totalMolsOfType): {}".format( totalMolsOfType ) )
     print( "\tintput(moltypeStartIndex): {}".format( moltypeStartIndex ) )
     print( "" )
-    str_list = read_file(ifname)
-    llist_edges = parse_edges_from_str_list( str_list )
-
-    gen_finalReport(ifname, ofname, molType, totalMolsOfType, moltypeStartIndex, llist_edges)
+    if sampling is None:
+        llist_edges = load_timeline(ifname)  ## an EdgeTimeline; parsed once, then memory-mapped from cache
+        gen_finalReport(ifname, ofname, molType, totalMolsOfType, moltypeStartIndex, llist_edges)
+    else:
+        llist_edges, timesteps = load_sampled_timeline( ifname, sampling )
+        print( "\tsampling: {} ({} timesteps)".format( sampling, len(timesteps) ))
+        gen_sampledReport(ofname, molType, totalMolsOfType, moltypeStartIndex, llist_edges, timesteps, sampling)
     print( "Generated report: {}".format( ofname ) )
     print( "Done." )
     print( "" )
@@ -380,23 +348,47 @@ def gen_finalReport(ifname, ofname, molType, totalMolsOfType, moltypeStartIndex,
     #gen_finalReport4Valency(ifname, ofname, molType, totalMolsOfType, moltypeStartIndex, listOfListOfBindingEdges)
 
 
-def gen_finalReport2Valency(ifname, ofname, molType, totalMolsOfType, moltypeStartIndex, listOfListOfBindingEdges):
-    str_list = read_file(ifname)  ## each string is a representation of final state for runs 0..99
-    llist_edges = parse_edges_from_str_list( str_list )  ## list of list of BindingEdges
+## columns of the count reports: (x,) = |Lx|, (x, y) = |Lxy|, in the order of SingleStateCountReport*.__str__
+COUNT_COLUMNS_2VALENCY = [ (0,), (1,), (1, 0), (0, 1) ]
+COUNT_COLUMNS_4VALENCY = [ (0,), (1,), (2,), (3,),
+                           (1, 0), (2, 0), (3, 0),
+                           (0, 1), (2, 1), (3, 1),
+                           (0, 2), (1, 2), (3, 2),
+                           (0, 3), (1, 3), (2, 3) ]
+
+def occupancy_of_moltype(molType, totalMolsOfType, moltypeStartIndex, listOfListOfBindingEdges):
+    """The site occupancy (see util_siteOccupancy) of the molecules of type molType
+    among moltypeStartIndex..moltypeStartIndex+totalMolsOfType-1, one row per state."""
+    timeline = as_timeline( listOfListOfBindingEdges )
+    stop = moltypeStartIndex + totalMolsOfType
+    occupancy = build_occupancy( timeline, max( num_molecules_of( timeline ), stop ))
+    molIDs = [ i for i in range(moltypeStartIndex, stop) if isMoltype( molType, i ) ]
+    return occupancy[:, molIDs]
+
+def count_report_rows(occupancy, columns):
+    """Returns one row per state: the number of molecules with all sites of each column bound."""
+    return np.stack( [ count_sites_bound( occupancy, sites, axis=1 ) for sites in columns ], axis=1 )
+
+def write_count_report(ofname, rows):
     with open(ofname, 'w') as f:
-        for bindingEdgesList in listOfListOfBindingEdges:
-            #singleReport = SingleStateProbabilitiesReport4Valency( molType, totalMolsOfType, moltypeStartIndex, bindingEdgesList)
-            singleReport = SingleStateCountReport2Valency( molType, totalMolsOfType, moltypeStartIndex, bindingEdgesList)
-            f.write( str(singleReport) )
+        f.write( "".join( ", ".join( str(c) for c in row ) + "\n" for row in rows.tolist() ))
+
+def gen_finalReport2Valency(ifname, ofname, molType, totalMolsOfType, moltypeStartIndex, listOfListOfBindingEdges):
+    """Same rows as SingleStateCountReport2Valency, for all states at once."""
+    occupancy = occupancy_of_moltype( molType, totalMolsOfType, moltypeStartIndex, listOfListOfBindingEdges )
+    write_count_report( ofname, count_report_rows( occupancy, COUNT_COLUMNS_2VALENCY ))
 
 def gen_finalReport4Valency(ifname, ofname, molType, totalMolsOfType, moltypeStartIndex, listOfListOfBindingEdges):
-    str_list = read_file(ifname)  ## each string is a representation of final state for runs 0..99
-    llist_edges = parse_edges_from_str_list( str_list )  ## list of list of BindingEdges
+    """Same rows as SingleStateCountReport4Valency, for all states at once."""
+    occupancy = occupancy_of_moltype( molType, totalMolsOfType, moltypeStartIndex, listOfListOfBindingEdges )
+    write_count_report( ofname, count_report_rows( occupancy, COUNT_COLUMNS_4VALENCY ))
+
+def gen_sampledReport(ofname, molType, totalMolsOfType, moltypeStartIndex, timeline, timesteps, sampling, columns=COUNT_COLUMNS_2VALENCY):
+    """Same rows as gen_finalReport2Valency for the sampled timesteps, each starting with its timestep."""
+    occupancy = occupancy_of_moltype( molType, totalMolsOfType, moltypeStartIndex, timeline )
+    rows, labels = sampling.reduce( count_report_rows( occupancy, columns ), timesteps )
     with open(ofname, 'w') as f:
-        for bindingEdgesList in listOfListOfBindingEdges:
-            #singleReport = SingleStateProbabilitiesReport4Valency( molType, totalMolsOfType, moltypeStartIndex, bindingEdgesList)
-            singleReport = SingleStateCountReport4Valency( molType, totalMolsOfType, moltypeStartIndex, bindingEdgesList)
-            f.write( str(singleReport) )
+        f.write( format_labelled_rows( labels, rows, separator=', ' ))
 
 def ut_read_file():
     fname = 'zztemp.bindingsite.data.aggregate.small'
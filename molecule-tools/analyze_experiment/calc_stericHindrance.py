@@ -21,6 +21,12 @@
 #     corresponding molecule.
 #
 #   Example row: (1,1,2,2),(1,2,3,4);
+#
+#   The raw simulator format, where each edge is written as
+#     (Mol1.Bind1,Mol2.Bind2), is also accepted directly, so there
+#     is no need to replace periods with commas beforehand.
+#
+#   Example row: [(1.1,2.2),(1.2,3.4)]
 #--------------------------------------------------------------------
 
 import sys
@@ -30,7 +36,10 @@ import csv
 import numpy as np
 from collections import deque
 
-from util_fullBindingSitesParser import *
+from util_bindingSitesEngine import *
+from util_csrGraph import CSRGraph
+from util_siteOccupancy import as_timeline, num_molecules_of, build_occupancy, site_bound, all_sites_bound, MAX_SITES
+from util_sampling import pop_sampling_arg, load_sampled_timeline
 
 USAGE_STR = """
 
@@ -42,6 +51,8 @@ USAGE_STR = """
           <numMolType> = (uint) the number of molecule types (including IgE receptor)
           <totalMols> = (int) total number of molecules
           <startIndexList> = [(int)] a list describing the start index of each molecule type.
+          [--sample=<items>] = count only some timesteps, e.g. --sample=window:40000:,stride:10
+                               (see util_sampling; the counts are summed, so average:W has no effect)
 
   Example #1:
     Suppose I have an experiment with 20R, 10L, and 10M; then:
@@ -51,6 +62,9 @@ USAGE_STR = """
 """
 
 def checkIfSiteXIsBound( moleculeID, listOfEdges, expectedSiteVal ):
+    """listOfEdges is a list of edges, or a CSRGraph (then the lookup is O(1))."""
+    if isinstance( listOfEdges, CSRGraph ):
+        return listOfEdges.is_site_bound( moleculeID, expectedSiteVal )
     for e in listOfEdges:
         if (e.mol1 == moleculeID) and (e.bsite1 == expectedSiteVal):
             return True
@@ -91,27 +105,57 @@ def update_table_addAmount( tab, key, val ):
         tab[key] = 0
     tab[key] = val + tab[key]
     
+def bindEventTable_of_timestep( listOfEdges, numRecs, startIdxList ):
+    """Counts one timestep's bind events: {(ligandType, siteID): count, (ligandType, "both"): count}."""
+    listOfEdges = as_binding_edges( listOfEdges )
+    activeMoleculeIDList = []
+    bindEventTbl = {}
+    for e in listOfEdges:
+        moleculeID = e.mol1
+        if moleculeID < numRecs: continue
+        activeMoleculeIDList.append( moleculeID )
+        moleculeType = classify_ligandID( moleculeID, startIdxList )
+        siteID = e.bsite1
+        k = (moleculeType, siteID)
+        update_table_addAmount( bindEventTbl, k, 1 )  ## increment by one
+    G = CSRGraph( listOfEdges )
+    for moleculeID in set( activeMoleculeIDList ):
+        bothSitesBound = checkIfBothSitesBound( moleculeID, G )
+        moleculeType = classify_ligandID( moleculeID, startIdxList )
+        if bothSitesBound:
+            k = (moleculeType, "both")
+            update_table_addAmount( bindEventTbl, k, 1)
+    return bindEventTbl
+
 def populate_stericHindranceTable( fout, llist_edges, numRecs, startIdxList ):
-    grandBindEventTbl = {}
-    for listOfEdges in llist_edges:
-        activeMoleculeIDList = []
-        bindEventTbl = {}
-        for e in listOfEdges:
-            moleculeID = e.mol1
-            if moleculeID < numRecs: continue
-            activeMoleculeIDList.append( moleculeID )
-            moleculeType = classify_ligandID( moleculeID, startIdxList )
-            siteID = e.bsite1
+    """Sums the bind events of all timesteps. The counts are bitwise operations on the site
+    occupancy (see util_siteOccupancy). The keys are in order of the first timestep they occur at;
+    within a timestep the site keys come before the "both" keys, each by the lowest ligand ID
+    that has them at that timestep, then by site."""
+    timeline = as_timeline( llist_edges )   ## a list of lists of BindingEdges, or an EdgeTimeline
+    numMolecules = max( num_molecules_of( timeline ), numRecs )
+    ligandOccupancy = build_occupancy( timeline, numMolecules )[:, numRecs:]
+    ligandIDs = np.arange( numRecs, numMolecules )
+    ligandTypes = np.searchsorted( np.asarray( startIdxList ), ligandIDs, side='right' ) - 1  ## as classify_ligandID
+    numTypes = len(startIdxList)
+
+    counts = {}  ## key -> total count
+    order = {}  ## key -> (first timestep, is "both", lowest ligand ID at that timestep, site)
+    conditions = [ (siteID, site_bound( ligandOccupancy, siteID )) for siteID in range(0, MAX_SITES) ]
+    conditions.append( ("both", all_sites_bound( ligandOccupancy, (0, 1) )) )
+    for siteID, isBound in conditions:
+        perLigand = np.count_nonzero( isBound, axis=0 )
+        perType = np.bincount( ligandTypes, weights=perLigand, minlength=numTypes )
+        for moleculeType in np.flatnonzero( perType ).tolist():
             k = (moleculeType, siteID)
-            update_table_addAmount( bindEventTbl, k, 1 )  ## increment by one
-        for moleculeID in set( activeMoleculeIDList ):
-            bothSitesBound = checkIfBothSitesBound( moleculeID, listOfEdges)
-            moleculeType = classify_ligandID( moleculeID, startIdxList )
-            if bothSitesBound:
-                k = (moleculeType, "both")
-                update_table_addAmount( bindEventTbl, k, 1)
-        update_grand_table( grandBindEventTbl, bindEventTbl )
-    return grandBindEventTbl
+            counts[k] = int( perType[moleculeType] )
+            isBoundOfType = isBound[:, ligandTypes == moleculeType]
+            t = int( np.argmax( isBoundOfType.any( axis=1 )))
+            firstLigand = int( ligandIDs[ ligandTypes == moleculeType ][ np.argmax( isBoundOfType[t] ) ] )
+            isBoth = siteID == "both"
+            order[k] = (t, isBoth, firstLigand, MAX_SITES if isBoth else siteID)
+
+    return { k: counts[k] for k in sorted( counts, key=order.get ) }
 
 def compute_stericHindrance_perType( T, moleculeType ):
     countSiteA = 0
@@ -168,20 +212,21 @@ def computeNumLigs( numMolsPerType ):
 
 def main():
 
-    numCmdArgs = len(sys.argv)
+    sampling, argv = pop_sampling_arg( sys.argv )
+    numCmdArgs = len(argv)
     print("numCmdArgs: {}".format(numCmdArgs))
     if (numCmdArgs < 6):
         print(USAGE_STR)
         exit(1)
 
     ## otherwise, numCmdArgs == 6...
-    ifname = sys.argv[1]
-    ofname = sys.argv[2]
-    numMolType = int(sys.argv[3])
-    totalNumMols = int(sys.argv[4])
+    ifname = argv[1]
+    ofname = argv[2]
+    numMolType = int(argv[3])
+    totalNumMols = int(argv[4])
 
     startIndexList =  []
-    for startIdx in sys.argv[5].split(","):
+    for startIdx in argv[5].split(","):
         startIndexList.append( int(startIdx) )
 
     numMolsPerType = []
@@ -200,8 +245,11 @@ def main():
     print( "\ttotalNumRecs: {}".format( totalNumRecs ))
     
     
-    str_list = read_file(ifname)
-    llist_edges = parse_edges_from_str_list( str_list )
+    if sampling is None:
+        llist_edges = load_timeline(ifname)  ## an EdgeTimeline; parsed once, then memory-mapped from cache
+    else:
+        llist_edges, timesteps = load_sampled_timeline( ifname, sampling )
+        print( "\tsampling: {} ({} timesteps)".format( sampling, len(timesteps) ))
 
     timestep = 0
     f = open(ofname, 'w')
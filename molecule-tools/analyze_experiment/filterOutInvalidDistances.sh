@@ -9,6 +9,10 @@
 #     bindingDistances.data.onlyValidEdges
 #
 #   By using the Python script of the same name, filterOutInvalidDistances.py, at each directory.
+#
+#   filterOutInvalidDistances.py is not in this tree and still expects the comma
+#   (m,s,m,s) form, so the periods are still replaced here (the tools that use
+#   util_bindingSitesEngine read the dotted form directly).
 #--------------------------------------------------------------------------------------------------
 # usage:
 #   This script does not require arguments, and is independent of experiment name. Simply call...
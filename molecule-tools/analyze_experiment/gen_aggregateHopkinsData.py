@@ -17,6 +17,8 @@ import glob
 import pandas as pd
 import numpy as np
 
+from util_compressedInput import open_input, glob_inputs
+
 USAGE_STR = """
 
  Usage #1:
@@ -29,7 +31,8 @@ USAGE_STR = """
 
 def read_csv(fname):
     """Return matrix is numberOfTimesteps x numberOfRuns."""
-    df = pd.read_csv(fname, sep=',',header=None)
+    with open_input(fname) as f:  ## plain, or gzip/bz2/xz compressed
+        df = pd.read_csv(f, sep=',',header=None)
     M = df.to_numpy()
     return M
 
@@ -38,7 +41,7 @@ def aggHopkinsData(expName, ifname):
     numCols = 0
     m_list = []
     numExperimentsFound = 0
-    for f in glob.glob("**/{}".format( ifname )):
+    for f in glob_inputs("**/{}".format( ifname )):
         print("Process file {}".format( f ))
         numExperimentsFound = 1 + numExperimentsFound
         M = read_csv(f)
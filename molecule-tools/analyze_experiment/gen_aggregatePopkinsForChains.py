@@ -15,7 +15,16 @@
 #       * cumulative_class_stats.10mer.<expName>.csv
 #
 #    Where,
-#      each row represents time, and columns represent runs.
+#      each row represents time, and columns represent runs, in runID
+#      order (see util_runDiscovery).
+#
+#   With output 'summary' (or 'both'), the runs are also (or only)
+#   accumulated into a util_runStats.RunStats, which writes
+#       * cumulative_class_summary.<class>.<expName>.csv
+#         (rows: mean,std,q05,q50,q95 over the runs, per timestep)
+#       * cumulative_class_stats.<expName>.runstats.npz
+#         (to merge with other batches of runs, see util_runStats)
+#   without keeping the runs, so memory does not grow with their number.
 #--------------------------------------------------------------------
 
 import sys
@@ -25,19 +34,35 @@ import csv
 import glob
 import pandas as pd
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from util_compressedInput import open_input
+from util_runDiscovery import find_runs, iter_loaded_runs
+from util_intCsv import write_int_csv
+from util_sizeBins import DEFAULT_BIN_SPEC, classes_of_bin_specs, bin_columns
+from util_runStats import RunStats, save_run_stats, write_summary, pop_bins_arg, DEFAULT_QUANTILES, DEFAULT_NUM_BINS
 
 USAGE_STR = """
 
  Usage #1:
-   python2 genData_popkinsForChains.py <expName>
+   python2 genData_popkinsForChains.py <expName> [<cubeFname>] [<numWorkers>] [<binSpecs>] [<output>] [--bins=<numBins>]
  
    where, <expName> = (string) name of experiment
+          [<cubeFname>] = (string) .npy file to memory-map the result cube from (default, or '-': in memory)
+          [<numWorkers>] = (int) number of threads reading the runs and writing the output files
+                           (default: number of CPUs)
+          [<binSpecs>] = (string) size bins, e.g. "2,3,4,5,6-9,10+"; several binnings separated by ';'
+                         (default: "2,3,4,5,6-9=6mer", i.e. 2mer..5mer and 6mer = 6..9 receptors)
+          [<output>] = runs (default: one column per run), summary (mean, std and quantiles over the runs), or both
+          [--bins=<numBins>] = (int) histogram bins per class and timestep of the summary quantiles (default: 32);
+                               exact while every count is below numBins, see util_runStats
 
 """
 
 def read_csv(fname):
     """Return matrix is numberOfTimesteps x numberOfRuns."""
-    df = pd.read_csv(fname, sep=',',header=None)
+    with open_input(fname) as f:  ## plain, or gzip/bz2/xz compressed
+        df = pd.read_csv(f, sep=',',header=None)
     M = df.to_numpy()
     return M
 
@@ -67,75 +92,111 @@ def _helper_fillMatrix(M, maxRows):
     return M_new
 
     
-def aggPopkinForChains(expName):
-    m_list = []
-    #numSteps = 0
-    expectedNumSteps = 50001  ## 50k records, for 500k steps, recorded every 10.
-    expectedNumRuns = 100
-    numExperimentsFound = 0
-    for f in glob.glob("**/*groupByAggsize.{}.csv".format(expName)):
-        M = read_csv(f)
-        m_list.append( M )
-        numSteps = M.shape[0]
-        numExperimentsFound = 1 + numExperimentsFound
-    numRuns = numExperimentsFound
-
-    AFree = np.zeros( (expectedNumSteps, expectedNumRuns) )
-    #ASingleton = np.zeros( (expectedNumSteps, expectedNumRuns) )
-    ASingletonA = np.zeros( (expectedNumSteps, expectedNumRuns) )
-    ASingletonB = np.zeros( (expectedNumSteps, expectedNumRuns) )
-    ASingletonAB = np.zeros( (expectedNumSteps, expectedNumRuns) )
-    
-    A2 = np.zeros( (expectedNumSteps, expectedNumRuns) )
-    A3 = np.zeros( (expectedNumSteps, expectedNumRuns) )
-    A4 = np.zeros( (expectedNumSteps, expectedNumRuns) )
-    A5 = np.zeros( (expectedNumSteps, expectedNumRuns) )
-    A6 = np.zeros( (expectedNumSteps, expectedNumRuns) )
-
+## output classes: (name, first column, last column + 1) of the popkins matrix; a class sums its columns
+POPKINS_CLASSES = classes_of_bin_specs( DEFAULT_BIN_SPEC )
+
+OUTPUTS = ('runs', 'summary', 'both')
+SUMMARY_FNAME = "cumulative_class_summary.{}.{}.csv"
+RUN_STATS_FNAME = "cumulative_class_stats.{}.runstats.npz"
+
+def _write_csv(fname, A):
+    return write_int_csv( fname, A )  ## same text as np.savetxt(fname, A, fmt="%i", delimiter=',')
+
+
+class PopkinsCube:
+    """One preallocated (classes x timesteps x runs) int32 array that runs are streamed into;
+    memory-mapped from fname (a .npy) if given. cube[c] is the (timesteps x runs) output of class c.
+    classes come from util_sizeBins (e.g. classes_of_bin_specs("2,3,4,5,6-9,10+"))."""
+    def __init__(self, expectedNumSteps, expectedNumRuns, classes=POPKINS_CLASSES, fname=None):
+        self.classes = classes
+        shape = (len(classes), expectedNumSteps, expectedNumRuns)
+        if fname is None:
+            self.cube = np.zeros( shape, dtype=np.int32 )
+        else:
+            self.cube = np.lib.format.open_memmap( fname, mode='w+', dtype=np.int32, shape=shape )
+
+    def add_run(self, runID, matrix):
+        """Writes a run's (numTimesteps x numColumns) popkins matrix into column runID. A run with
+        fewer timesteps is padded with its last row (as _helper_fillMatrix did)."""
+        self.add_series( runID, bin_columns( matrix, self.classes ))  ## (numSteps x classes), every binning in one pass
+
+    def add_series(self, runID, series):
+        """Like add_run, for a run's (numTimesteps x classes) series, already binned."""
+        expectedNumSteps = self.cube.shape[1]
+        numSteps = series.shape[0]
+        if numSteps > expectedNumSteps:
+            raise ValueError( "run {} has {} timesteps, more than the expected {}.".format( runID, numSteps, expectedNumSteps ))
+        if numSteps < expectedNumSteps:
+            print( "(test) matrix.shape[0] {} < expectedNumSteps {}".format( numSteps, expectedNumSteps ))
+        self.cube[:, :numSteps, runID] = series.T
+        self.cube[:, numSteps:, runID] = series[-1][:, np.newaxis]
+
+    def class_series(self, name):
+        """The (timesteps x runs) view of one class."""
+        return self.cube[ [ c[0] for c in self.classes ].index( name ) ]
+
+    def write_csvs(self, expName, numWorkers=None):
+        """Writes cumulative_class_stats.<class>.<expName>.csv for every class, in a thread pool.
+        Each thread formats its class (a view of the cube, memory-mapped or not) a block of rows at a time."""
+        fnames = [ "cumulative_class_stats.{}.{}.csv".format( name, expName ) for name, startCol, stopCol in self.classes ]
+        with ThreadPoolExecutor( max_workers=numWorkers ) as pool:
+            return list( pool.map( _write_csv, fnames, self.cube ))
+
+## end class PopkinsCube
+
+
+def aggPopkinForChains(expName, cubeFname=None, numWorkers=None, binSpecs=DEFAULT_BIN_SPEC, output='runs',
+                       numBins=DEFAULT_NUM_BINS):
+    """Streams every run's groupByAggsize CSV, in runID order, into one PopkinsCube, then writes the class files."""
+    runs = find_runs( "**/*groupByAggsize.{}.csv".format(expName) )
+    print( "runIDs: {}".format( [ runID for runID, f in runs ] ))
+    cumulatePopkinsForChains( iter_loaded_runs( [ f for runID, f in runs ], read_csv, numWorkers ),
+                              expName, cubeFname=cubeFname, numWorkers=numWorkers, binSpecs=binSpecs, output=output,
+                              numBins=numBins )
+
+def write_class_summaries(stats, expName, quantiles=DEFAULT_QUANTILES):
+    """Writes cumulative_class_summary.<class>.<expName>.csv for every class of stats, and the stats."""
+    save_run_stats( RUN_STATS_FNAME.format( expName ), stats )
+    return [ write_summary( SUMMARY_FNAME.format( name, expName ), stats.summary( name, quantiles )) for name in stats.names ]
+
+def cumulatePopkinsForChains(m_list, expName, expectedNumSteps=50001, expectedNumRuns=100, cubeFname=None, numWorkers=None,
+                             binSpecs=DEFAULT_BIN_SPEC, output='runs', numBins=DEFAULT_NUM_BINS):
+    """m_list is an iterable of (numTimesteps x numColumns) popkins matrices, one per run, in
+    column order; only one is held at a time. Writes the cumulative_class_stats.*.<expName>.csv files,
+    one per class of the size bins binSpecs (see util_sizeBins), and/or their summaries (output).
+    Returns (PopkinsCube or None, RunStats or None); the RunStats has numBins bins (see util_runStats).
+    expectedNumSteps: 50k records, for 500k steps, recorded every 10."""
+    if output not in OUTPUTS:
+        raise ValueError( "unknown output '{}' (expected one of {}).".format( output, ", ".join( OUTPUTS )))
+    classes = classes_of_bin_specs( binSpecs )
+    cube = None if (output == 'summary') else PopkinsCube( expectedNumSteps, expectedNumRuns, classes, fname=cubeFname )
+    stats = None if (output == 'runs') else RunStats( expectedNumSteps, [ c[0] for c in classes ], numBins )
     matrixCounter = 0
     for matrix in m_list:
-        ## if matrix has less than numSteps rows,
-        ##   fill in the rest of the values...
-        if matrix.shape[0] < expectedNumSteps:
-            print( "(test) matrix.shape[0] {} < expectedNumSteps {}".format( matrix.shape[0], expectedNumSteps ))
-            print( "(before) matrix.shape: {}".format( matrix.shape ))
-            matrix = _helper_fillMatrix(matrix, expectedNumSteps)
-            print( "(after) matrix.shape: {}".format( matrix.shape ))
         print("matrixCounter: {}".format(matrixCounter))
-        runID = matrixCounter
-
-        AFree[:,runID] = matrix[:,0]
-        #ASingleton[:,runID] = matrix[:,1]
-        ASingletonA[:,runID] = matrix[:,1]
-        ASingletonB[:,runID] = matrix[:,2]
-        ASingletonAB[:,runID] = matrix[:,3]
-        
-        A2[:,runID] = matrix[:,4]
-        A3[:,runID] = matrix[:,5]
-        A4[:,runID] = matrix[:,6]
-        A5[:,runID] = matrix[:,7]
-        A6[:,runID] = matrix[:,8] + matrix[:,9] + matrix[:,10] + matrix[:,11]
+        series = bin_columns( matrix, classes )
+        if cube is not None:
+            cube.add_series( matrixCounter, series )
+        if stats is not None:
+            stats.add_run( series )
         matrixCounter = 1 + matrixCounter
-
-    np.savetxt("cumulative_class_stats.free.{}.csv".format(expName), AFree.astype(int), fmt="%i", delimiter=',')
-    #np.savetxt("cumulative_class_stats.singletons.{}.csv".format(expName), ASingleton.astype(int), fmt="%i", delimiter=',')
-    np.savetxt("cumulative_class_stats.singletonsA.{}.csv".format(expName), ASingletonA.astype(int), fmt="%i", delimiter=',')
-    np.savetxt("cumulative_class_stats.singletonsB.{}.csv".format(expName), ASingletonB.astype(int), fmt="%i", delimiter=',')
-    np.savetxt("cumulative_class_stats.singletonsAB.{}.csv".format(expName), ASingletonAB.astype(int), fmt="%i", delimiter=',')
-        
-    np.savetxt("cumulative_class_stats.2mer.{}.csv".format(expName), A2.astype(int), fmt="%i", delimiter=',')
-    np.savetxt("cumulative_class_stats.3mer.{}.csv".format(expName), A3.astype(int), fmt="%i", delimiter=',')
-    np.savetxt("cumulative_class_stats.4mer.{}.csv".format(expName), A4.astype(int), fmt="%i", delimiter=',')
-    np.savetxt("cumulative_class_stats.5mer.{}.csv".format(expName), A5.astype(int), fmt="%i", delimiter=',')
-    np.savetxt("cumulative_class_stats.6mer.{}.csv".format(expName), A6.astype(int), fmt="%i", delimiter=',')
-    
+    if cube is not None:
+        cube.write_csvs( expName, numWorkers )
+    if stats is not None:
+        write_class_summaries( stats, expName )
+    return cube, stats
 
 
 if __name__ == '__main__':
+    numBins, sys.argv = pop_bins_arg( sys.argv )
     numCmdArgs = len(sys.argv)
     print("numCmdArgs: {}".format( numCmdArgs ))
-    if (numCmdArgs != 2):
+    if (numCmdArgs < 2) or (numCmdArgs > 6):
         print(USAGE_STR)
         sys.exit("Incorrent number of arguments.")
     expName = sys.argv[1]
-    aggPopkinForChains(expName)
+    cubeFname = sys.argv[2] if (numCmdArgs > 2) and (sys.argv[2] != '-') else None
+    numWorkers = int(sys.argv[3]) if (numCmdArgs > 3) else None
+    binSpecs = sys.argv[4] if (numCmdArgs > 4) else DEFAULT_BIN_SPEC
+    output = sys.argv[5] if (numCmdArgs > 5) else 'runs'
+    aggPopkinForChains(expName, cubeFname, numWorkers, binSpecs, output, numBins)
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+# filename: gen_classStats.py
+# description:
+#   Usage #1 reads full_bindingsites.data and writes the per-run class
+#   stats CSVs that used to be extracted from class_stats.m:
+#
+#     <prefix>.free.csv, <prefix>.singletons.csv, <prefix>.chains.csv,
+#     <prefix>.cycles.csv, <prefix>.clusters.csv
+#
+#   * rows represent timesteps
+#   * single column represents this run
+#   * each cell represents the number of receptors of that class
+#
+#   Usage #2 (what cumulate_class_stats.sh runs) does it for every run
+#   directory of an experiment (subdirectories of the current directory,
+#   in runID order, see util_runDiscovery), in a pool of worker
+#   processes, and writes one column per run to
+#     cumulative_class_stats.<class>.<expName>.csv
+#   A run with a class_stats.m is read from it, as before; the others
+#   are classified from their full_bindingsites.data (plain or
+#   compressed). A run with fewer timesteps leaves its cells empty.
+#
+#   A receptor is classified by the topology of its component (the
+#   molecules, receptors and ligands, connected by bonds):
+#     free:       the receptor has no bonds,
+#     singleton:  the only receptor of its component,
+#     chain:      2+ receptors, no cycle (cyclomatic number 0) and no
+#                 molecule with more than 2 bonds,
+#     cycle:      2+ receptors, exactly one cycle (cyclomatic number 1)
+#                 and no molecule with more than 2 bonds, i.e. a ring,
+#     cluster:    any other component of 2+ receptors (branched, or
+#                 with more than one cycle).
+#   The cyclomatic number of a component is E - V + 1 for its V
+#   molecules and E bonds; two bonds between the same two molecules
+#   count as a cycle.
+#
+#   Components are labelled a block of timesteps at a time (see
+#   util_batchComponents) and the per-component vertex, bond and
+#   branch (degree > 2) counts are computed with np.bincount.
+#--------------------------------------------------------------------
+
+import os
+import re
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from util_bindingSitesEngine import *
+from util_batchComponents import iter_label_blocks, DEFAULT_BLOCK_TIMESTEPS
+from util_runDiscovery import find_runs
+from util_intCsv import write_int_csv
+
+USAGE_STR = """
+
+ Usage #1:
+   gen_classStats.py <ifile> <totalMols> <startIndex> [<ofnamePrefix>]
+
+   where, <ifile> = (string) name of input bindingsite data file,
+          <totalMols> = (int) total number of molecules (receptors and ligands),
+          <startIndex> = (int) molecule ID of the first ligand (= number of receptors),
+          [<ofnamePrefix>] = (string) prefix of the output CSV files (default: class_stats)
+
+ Usage #2 (from the experiment directory):
+   gen_classStats.py --experiment <expName> <totalMols> <startIndex> [<numWorkers>]
+
+   where, <expName> = (string) name of experiment,
+          [<numWorkers>] = (int) number of worker processes (default: number of CPUs)
+"""
+
+CLASS_NAMES = ['free', 'singletons', 'chains', 'cycles', 'clusters']
+FREE, SINGLETON, CHAIN, CYCLE, CLUSTER = range(len(CLASS_NAMES))
+
+EXPERIMENT_ARG = "--experiment"
+RUN_DATA_FNAME = "full_bindingsites.data"
+CLASS_STATS_M_FNAME = "class_stats.m"
+CUMULATIVE_FNAME = "cumulative_class_stats.{}.{}.csv"
+
+
+def class_stats_block_from_labels( timeline, start, labels, totalNumRecs ):
+    """Returns the (numTimesteps x 5) receptor counts per class (columns in CLASS_NAMES order)
+    of timesteps start.. of timeline, from their component labels (see util_batchComponents)."""
+    numTimesteps, numMolecules = labels.shape
+    stop = start + numTimesteps
+    edges = np.asarray( timeline.edges[ timeline.offsets[start] : timeline.offsets[stop] ] )
+    tOfEdge = np.repeat( np.arange( numTimesteps ), np.diff( np.asarray( timeline.offsets[ start : stop+1 ] )))
+    numVertices = numTimesteps * numMolecules
+
+    ## every bond is listed in both directions, so a molecule's rows as mol1 are its degree
+    degree = np.bincount( tOfEdge * numMolecules + edges[:, 0], minlength=numVertices )
+    compIDs = (np.arange( numTimesteps )[:, np.newaxis] * numMolecules + labels).ravel()
+    hasEdge = degree > 0
+
+    numVerticesOf = np.bincount( compIDs[hasEdge], minlength=numVertices )
+    numRowsOf = np.bincount( compIDs[ tOfEdge * numMolecules + edges[:, 0] ], minlength=numVertices )  ## 2 x bonds
+    numBranchesOf = np.bincount( compIDs[ degree > 2 ], minlength=numVertices )
+    ## cyclomatic number E - V + 1, doubled so a half-listed bond can't round into a class
+    cyclomatic2 = numRowsOf - 2 * (numVerticesOf - 1)
+
+    recIDs = compIDs.reshape( numTimesteps, numMolecules )[:, :totalNumRecs]
+    recHasEdge = hasEdge.reshape( numTimesteps, numMolecules )[:, :totalNumRecs]
+    numRecsOf = np.bincount( recIDs[recHasEdge], minlength=numVertices )
+
+    classOf = np.full( numVertices, CLUSTER, dtype=np.int64 )
+    unbranched = numBranchesOf == 0
+    classOf[ unbranched & (cyclomatic2 == 2) ] = CYCLE
+    classOf[ unbranched & (cyclomatic2 == 0) ] = CHAIN
+    classOf[ numRecsOf == 1 ] = SINGLETON
+
+    recClass = np.where( recHasEdge, classOf[recIDs], FREE )
+    cells = np.arange( numTimesteps )[:, np.newaxis] * len(CLASS_NAMES) + recClass
+    return np.bincount( cells.ravel(), minlength=numTimesteps*len(CLASS_NAMES) ).reshape( numTimesteps, len(CLASS_NAMES) )
+
+def class_stats_of_timeline( timeline, totalNumRecs, totalNumLigs, blockTimesteps=DEFAULT_BLOCK_TIMESTEPS ):
+    """Returns the (numTimesteps x 5) receptor counts per class of every timestep of timeline."""
+    numMolecules = totalNumRecs + totalNumLigs
+    if len(timeline.edges):
+        numMolecules = max( numMolecules, 1 + int( timeline.edges[:, [0, 2]].max() ))
+    counts = np.zeros( (len(timeline), len(CLASS_NAMES)), dtype=np.int64 )
+    for start, labels in iter_label_blocks( timeline, numMolecules, blockTimesteps ):
+        counts[ start : start+len(labels) ] = class_stats_block_from_labels( timeline, start, labels, totalNumRecs )
+    return counts
+
+def class_stats_fnames( ofnamePrefix ):
+    """Returns the output filenames, e.g. class_stats.free.csv, in CLASS_NAMES order."""
+    return [ "{}.{}.csv".format( ofnamePrefix, name ) for name in CLASS_NAMES ]
+
+def write_class_stats( counts, ofnamePrefix ):
+    """Writes each column of counts to its own single-column CSV; returns the filenames."""
+    fnames = class_stats_fnames( ofnamePrefix )
+    for col, fname in enumerate(fnames):
+        with open(fname, 'w') as f:
+            f.write( "".join( "{}\n".format(x) for x in counts[:, col].tolist() ))
+    return fnames
+
+def read_class_stats_m( fname ):
+    """Returns the receptor counts per class (CLASS_NAMES order) of a class_stats.m, one array per class.
+    Line i of the file is class i, e.g. freeHist_50_50_86_50_0 = [ 50,50,...,0 ];"""
+    with open(fname) as f:
+        lines = f.read().splitlines()
+    series = []
+    for line in (lines + [''] * len(CLASS_NAMES))[ :len(CLASS_NAMES) ]:
+        values = line.split('=')[1] if ('=' in line) else line
+        cells = [ re.sub( r'\D', '', x ) for x in values.split(',') ]  ## the digits of each cell
+        series.append( np.array( [ int(x) for x in cells if x ], dtype=np.int32 ))
+    return series
+
+def find_class_stats_runs( expDir='.' ):
+    """Returns the input of every run directory directly under expDir, by runID: its class_stats.m
+    if it has one, else its full_bindingsites.data."""
+    byRunDir = {}
+    for fname in (RUN_DATA_FNAME, CLASS_STATS_M_FNAME):  ## a class_stats.m replaces the data file
+        for runID, f in find_runs( os.path.join( expDir, '*', fname )):
+            byRunDir[ os.path.dirname(f) ] = (runID, f)
+    runs = sorted( byRunDir.values(), key=lambda r: (r[0] is None, r[0] or 0, r[1]) )
+    return [ f for runID, f in runs ]
+
+def class_stats_of_run( fname, totalNumRecs, totalNumLigs ):
+    """Returns the receptor counts per class of one run (class_stats.m or binding sites file), one array per class."""
+    print( "Processing file {}".format( fname ))
+    if os.path.basename( fname ) == CLASS_STATS_M_FNAME:
+        return read_class_stats_m( fname )
+    timeline = load_timeline( fname, numWorkers=1 )  ## the runs are already spread over processes
+    return list( class_stats_of_timeline( timeline, totalNumRecs, totalNumLigs ).T.astype( np.int32 ))
+
+def iter_class_stats_of_experiment( totalNumRecs, totalNumLigs, expDir='.', numWorkers=None ):
+    """Yields class_stats_of_run of every run of the experiment in expDir, in run order."""
+    runFnames = find_class_stats_runs( expDir )
+    if (numWorkers == 1) or (len(runFnames) <= 1):
+        for f in runFnames:
+            yield class_stats_of_run( f, totalNumRecs, totalNumLigs )
+        return
+    with ProcessPoolExecutor( max_workers=numWorkers ) as pool:
+        futures = deque( pool.submit( class_stats_of_run, f, totalNumRecs, totalNumLigs ) for f in runFnames )
+        while futures:
+            yield futures.popleft().result()
+
+def write_cumulative_column_csv( fname, columns ):
+    """Writes one column per array of columns; a shorter column leaves its cells empty."""
+    numRows = max( [ len(c) for c in columns ] + [0] )
+    if columns and all( len(c) == numRows for c in columns ):
+        return write_int_csv( fname, np.column_stack( columns ))
+    with open(fname, 'w') as f:
+        for t in range(0, numRows):
+            f.write( ",".join( str( c[t] ) if (t < len(c)) else "" for c in columns ) + "\n" )
+    return fname
+
+def write_cumulative_class_stats( runs, expName, expDir='.' ):
+    """Writes cumulative_class_stats.<class>.<expName>.csv (one column per run of runs) for every class."""
+    runs = list( runs )
+    return [ write_cumulative_column_csv( os.path.join( expDir, CUMULATIVE_FNAME.format( name, expName )),
+                                          [ run[c] for run in runs ] )
+             for c, name in enumerate( CLASS_NAMES ) ]
+
+def main_experiment( argv ):
+    if (len(argv) < 4) or (len(argv) > 5):
+        print(USAGE_STR)
+        exit(1)
+    expName = argv[1]
+    totalMols = int(argv[2])
+    startIndex = int(argv[3])
+    numWorkers = int(argv[4]) if (len(argv) == 5) else None
+    runs = iter_class_stats_of_experiment( startIndex, totalMols - startIndex, numWorkers=numWorkers )
+    for fname in write_cumulative_class_stats( runs, expName ):
+        print( "Wrote to {}".format( fname ))
+    return
+
+def main():
+    if (len(sys.argv) > 1) and (sys.argv[1] == EXPERIMENT_ARG):
+        return main_experiment( sys.argv[1:] )
+    numCmdArgs = len(sys.argv)
+    if (numCmdArgs != 4) and (numCmdArgs != 5):
+        print(USAGE_STR)
+        exit(1)
+
+    ifname = sys.argv[1]
+    totalMols = int(sys.argv[2])
+    startIndex = int(sys.argv[3])
+    ofnamePrefix = sys.argv[4] if (numCmdArgs == 5) else 'class_stats'
+    totalNumRecs = startIndex
+    totalNumLigs = totalMols - startIndex
+
+    timeline = load_timeline(ifname)
+    counts = class_stats_of_timeline( timeline, totalNumRecs, totalNumLigs )
+    for fname in write_class_stats( counts, ofnamePrefix ):
+        print( "Wrote to {}".format( fname ))
+    return
+
+if __name__ == '__main__':
+    main()
@@ -20,15 +20,27 @@
 #     corresponding molecule.
 #
 #   Example row: (1,1,2,2),(1,2,3,4);
+#
+#   The raw simulator format, where each edge is written as
+#     (Mol1.Bind1,Mol2.Bind2), is also accepted directly, so there
+#     is no need to replace periods with commas beforehand.
+#
+#   Example row: [(1.1,2.2),(1.2,3.4)]
 #--------------------------------------------------------------------
 
 import sys
-import re
 import csv
 
 import numpy as np
-from collections import deque
 
+from util_bindingSitesEngine import *
+from util_incrementalComponents import IncrementalComponents
+from util_csrGraph import CSRGraph
+from util_classificationCache import ClassificationCache, component_signature
+from util_batchComponents import iter_label_blocks, DEFAULT_BLOCK_TIMESTEPS
+from util_siteOccupancy import as_timeline, occupancy_block, site_bound
+from util_intCsv import format_int_csv, write_int_csv
+from util_sampling import pop_sampling_arg, load_sampled_timeline, format_labelled_rows
 
 USAGE_STR = """
 
@@ -40,113 +52,20 @@ USAGE_STR = """
           <molType> = {-1:UNKNOWN, 0:IgE, 1:MB4N},
           <totalMols> = (int) number of molecules of the given type,
           <startIndex> = (int) starting index of molecule ID for the given type
+          [<mode>] = how components are found: batched (default), incremental, or perTimestep
+          [--singletons=<typing>] = how a component with one receptor is typed SingletonA/B/AB:
+                               firstMolecule (default, as always: by the sites of the first molecule of the
+                               component in the timestep's edge order, which may be a ligand) or
+                               receptor (by the receptor's own sites; changes the output)
+          [--sample=<items>] = only some timesteps, e.g. --sample=stride:10 (see util_sampling);
+                               each row then starts with its timestep
 """
 
-MOLTYPE_UNKNOWN = -1
-MOLTYPE_IGE = 0
-MOLTYPE_LIGAND = 1
-
-p = re.compile('\(\d+,\d+,\d+\,\d+\)')  ## RE for (mol1,b1,mol2,b2)
-p2 = re.compile('\d+')
-
-def getMoleculeType( mol_id, numRecs, numLigs ):
-    molType = MOLTYPE_UNKNOWN
-    if (mol_id >= 0) and (mol_id < numRecs):
-        molType = MOLTYPE_IGE
-    elif (numRecs >= numRecs) and (mol_id < (numRecs+numLigs)):
-        molType = MOLTYPE_LIGAND
-    return molType
-
-def isMoltypeIge( mol_id, numRecs, numLigs ):
-    return MOLTYPE_IGE == getMoleculeType( mol_id, numRecs, numLigs )
-
-def isMoltypeMb4n( mol_id, numRecs, numLigs ):
-    return MOLTYPE_LIGAND == getMoleculeType( mol_id, numRecs, numLigs )
-
-def isMoltype( moltype, mol_id, numRecs, numLigs ):
-    return moltype == getMoleculeType( mol_id, numRecs, numLigs )
-
-
-class BindingEdge:
-    def __init__(self, mol1, bsite1, mol2, bsite2):
-        self.mol1 = int(mol1)
-        self.bsite1 = int(bsite1)
-        self.mol2 = int(mol2)
-        self.bsite2 = int(bsite2)
-
-    def __init__(self, s):
-        """Constructor given a string representing a tuple (m1,b1,m2,b2)"""
-        clean_s = s[1:-1]  ## removes '(' and ')' characters
-        result = clean_s.split(',')
-        self.mol1 = int(result[0])
-        self.bsite1 = int(result[1])
-        self.mol2 = int(result[2])
-        self.bsite2 = int(result[3])
-
-    def __str__(self):
-        s = "({},{},{},{})".format( self.mol1, self.bsite1, self.mol2, self.bsite2 )
-        return s
-
-class Graph:
-    def __init__(self, llist_edges):
-        self.raw_llist_edges = llist_edges
-        self.adjDict = {}  ## type: <MoleculeID, [(Mol1,Site1,Mol2,Site2)]
-
-        self.initialize( self.raw_llist_edges )
-
-    def initialize(self, edge_list):
-        """llist_edges is a list of list of BindingEdges."""
-        for edge in edge_list:    ##   for each BindingEdge
-            moleculeID = edge.mol1
-            if moleculeID not in self.adjDict.keys():
-                self.adjDict[moleculeID] = []
-            self.adjDict[moleculeID].append(edge)
-
-    def get_connectedComponents(self):
-        """Returns a list of connected components of this graph. Each connected component is a list of moleculeIDs."""
-        listOfExploredVertices = deque()
-        visitedList = deque()
-        listOfCCs = deque()
-        for moleculeID in self.adjDict.keys():          ## for each vertex,
-            if moleculeID not in listOfExploredVertices:  ##   if moleculeID is not already explored,
-                visitedList = deque()
-                visitedList = self.bfs( deque([moleculeID]), deque() )
-                listOfCCs.append( visitedList )
-                listOfExploredVertices.extend( visitedList )
-        return listOfCCs
-        
-
-    def bfs(self, listOfMoleculesToVisit, visitedList):
-        #print("[DEBUG] in bfs...")
-        #print("\tlistOfMoleculesToVisit: {}".format( listOfMoleculesToVisit ))
-        #print("\tvisitedList: {}".format( visitedList ))
-        if not listOfMoleculesToVisit:   ## if list is empty...
-            return visitedList
-        moleculeID = listOfMoleculesToVisit[0]
-        if moleculeID in visitedList:
-            listOfMoleculesToVisit.popleft()  #listOfMoleculesToVisit.pop(0)     ## remove first element,
-            return self.bfs( listOfMoleculesToVisit, visitedList )
-        listOfMoleculesToVisit.popleft()      #listOfMoleculesToVisit.pop(0)
-        visitedList.append( moleculeID )      ##  but add that element to the visited list
-        listOfEdges = self.adjDict[moleculeID]
-        for edge in listOfEdges:
-            adjacent_moleculeID = edge.mol2
-            if adjacent_moleculeID not in listOfMoleculesToVisit:
-                listOfMoleculesToVisit.append( adjacent_moleculeID )
-        return self.bfs(listOfMoleculesToVisit, visitedList)
-            
-    
-    def print_me(self):
-        print("Graph contents:")
-        print( "len(adjDidct.keys()): {}".format( len(self.adjDict.keys()) ))
-        for key in self.adjDict.keys():
-            print("[{}]: ".format(key), end='')
-            listOfEdges = self.adjDict[key]
-            for edge in listOfEdges:
-                print("{}, ".format(edge), end='')
-            print()
-## end class Graph
-
+## how a component with exactly one receptor is typed SingletonA/SingletonB/SingletonAB
+SINGLETONS_BY_FIRST_MOLECULE = 'firstMolecule'  ## by the sites of cc[0] (classify_aggregate's original behaviour)
+SINGLETONS_BY_RECEPTOR = 'receptor'             ## by the sites of the receptor itself
+SINGLETON_TYPINGS = (SINGLETONS_BY_FIRST_MOLECULE, SINGLETONS_BY_RECEPTOR)
+SINGLETON_TYPING_ARG_PREFIX = "--singletons="
 
 def initialize_histMappingDefault():
     """Initialize default mapping: {'Free':0, 'Singleton':1, 'XmerBase':2}"""
@@ -219,14 +138,18 @@ def count_numLigsBoundToIgE( moleculeID_ige, G ):
             ligCount = 1 + ligCount
     return ligCount, isSiteABound, isSiteBBound
 
-def classify_aggregate( cc, G, numReceptors, numLigands ):
-    """Classifies the given cc, a list of , and G, a Graph."""
+def classify_aggregate( cc, G, numReceptors, numLigands, singletonTyping=SINGLETONS_BY_FIRST_MOLECULE ):
+    """Classifies the given cc, a list of , and G, a Graph.
+    A single-receptor cc is typed by the sites of cc[0] (the first molecule found, which
+    may be a ligand), or by the sites of its receptor with SINGLETONS_BY_RECEPTOR."""
     numIgE = count_numRecsInCC( cc, numReceptors, numLigands )
     aggregateType = None
     if numIgE >= 2:
         aggregateType = "{}mer".format( numIgE )
     elif numIgE == 1:
         moleculeID_ige = cc[0]
+        if singletonTyping == SINGLETONS_BY_RECEPTOR:
+            moleculeID_ige = [ m for m in cc if isMoltypeIge( m, numReceptors, numLigands ) ][0]
         numLigs, isSiteABound, isSiteBBound = count_numLigsBoundToIgE( moleculeID_ige, G )
         if isSiteABound and isSiteBBound:
             aggregateType = "SingletonAB"
@@ -264,47 +187,252 @@ def histogramToString(histogram, numRecs):
     s = s + "\n"
     return s
 
-def read_file(fname):
-    """Reads aggregated binding sites file, and returns a list of strings."""
-    str_list = []
-    with open(fname) as f:
-        for line in f:
-            clean_line = line.strip()
-            str_list.append( clean_line )
-    return str_list
-
-def parse_edges_from_str_list(list_s):
-    """Parses a list of strings and returns a list of list of tuples."""
-    llist_edges = []  ## a list of list of edges
-    for s in list_s:
-        edges_list = parse_edges_from_str(s)  ## a list of edges
-        llist_edges.append( edges_list )
-    return llist_edges
-
-def parse_edges_from_str(s):
-    """Parses a string s and returns a list of BindingEdges."""
-    list_of_matched_tuples = p.findall(s)  ## list of strings (each element represents a tuple)
-    edge_list = []  ## list of BindingEdges
-    for s in list_of_matched_tuples:
-        edge = BindingEdge(s)
-        edge_list.append( edge )
-    return edge_list
+def classify_signature( signature, numReceptors, numLigands ):
+    """Classifies a component from its signature (see util_classificationCache), like
+    classify_aggregate with SINGLETONS_BY_RECEPTOR. Returns (aggregateType, numIgE).
+    A single-receptor component is classified by the sites of that receptor."""
+    members, masks = signature
+    receptorMasks = [ mask for m, mask in zip( members, masks ) if isMoltypeIge( m, numReceptors, numLigands ) ]
+    numIgE = len(receptorMasks)
+    aggregateType = None
+    if numIgE >= 2:
+        aggregateType = "{}mer".format( numIgE )
+    elif numIgE == 1:
+        isSiteABound = (receptorMasks[0] & 1) != 0
+        isSiteBBound = (receptorMasks[0] & 2) != 0
+        if isSiteABound and isSiteBBound:
+            aggregateType = "SingletonAB"
+        elif isSiteABound and not isSiteBBound:
+            aggregateType = "SingletonA"
+        elif not isSiteABound and isSiteBBound:
+            aggregateType = "SingletonB"
+    return aggregateType, numIgE
+
+def classify_component( members, tracker, numReceptors, numLigands, cache=None ):
+    """Classifies a component of an IncrementalComponents tracker; see classify_signature.
+    With a ClassificationCache, each distinct signature is classified only once."""
+    signature = component_signature( members, lambda m: [ e[0] for e in tracker.edges[m] ] )
+    if cache is not None:
+        return cache.get( signature )
+    return classify_signature( signature, numReceptors, numLigands )
+
+def singleton_type( isSiteABound, isSiteBBound ):
+    """SingletonA/SingletonB/SingletonAB from the bound sites, or None if neither site is bound."""
+    if isSiteABound and isSiteBBound:
+        return "SingletonAB"
+    if isSiteABound:
+        return "SingletonA"
+    if isSiteBBound:
+        return "SingletonB"
+    return None
+
+def iter_histograms_perTimestep( timeline, totalNumRecs, totalNumLigs, singletonTyping=SINGLETONS_BY_FIRST_MOLECULE ):
+    """Yields the histogram of each timestep, building a (CSR) graph from scratch every time."""
+    for listOfEdges in timeline:
+        myG = CSRGraph(listOfEdges)
+        histogram = initializeNewHistogram(totalNumRecs)
+        for cc in myG.get_connectedComponents():
+            countNumRecs = count_numRecsInCC(cc, totalNumRecs, totalNumLigs)
+            aggregateType = classify_aggregate(cc, myG, totalNumRecs, totalNumLigs, singletonTyping )
+            if aggregateType not in histogram.keys():
+                print( "[DEBUG] Warning! Found undefined aggregateType: {}".format( aggregateType ))
+                histogram[ aggregateType ] = 0
+            histogram[ aggregateType ] = countNumRecs + histogram[aggregateType]
+            histogram["Free"] = histogram["Free"] - countNumRecs  ## remove from free.
+        yield histogram
 
+def _count_singletons_by_first_molecule( histogram, singletons, tracker, mol1s ):
+    """Sets the Singleton* counts of histogram from the single-receptor components singletons,
+    each typed by the sites of its first molecule in the timestep's edge order (mol1s), like cc[0]."""
+    for k in ("SingletonA", "SingletonB", "SingletonAB"):
+        histogram[k] = 0
+    pending = { tracker.ds.find( next(iter(cc)) ) for cc in singletons }  ## roots
+    for m in mol1s:
+        if not pending:
+            break
+        root = tracker.ds.find( m )
+        if root in pending:
+            pending.discard( root )
+            bsites = [ e[0] for e in tracker.edges[m] ]
+            aggregateType = singleton_type( 0 in bsites, 1 in bsites )
+            if aggregateType is not None:
+                histogram[ aggregateType ] = 1 + histogram[ aggregateType ]
+
+def iter_histograms_incremental( timeline, totalNumRecs, totalNumLigs, cache=None, singletonTyping=SINGLETONS_BY_FIRST_MOLECULE ):
+    """Yields the histogram of each timestep, updating only the components that the
+    timestep's added/removed edges touch (see util_incrementalComponents).
+    Components are classified through cache (a ClassificationCache), if given.
+    With SINGLETONS_BY_FIRST_MOLECULE the type of a single-receptor component depends on the
+    order of the timestep's edges, so those components are re-typed at every timestep."""
+    timeline = as_timeline( timeline )
+    deltas = DeltaTimeline.from_timeline( timeline )
+    numMolecules = totalNumRecs + totalNumLigs
+    if len(deltas.edgeTable):
+        numMolecules = max( numMolecules, 1 + int( deltas.edgeTable[:, [0, 2]].max() ))
+    tracker = IncrementalComponents( numMolecules )
+    histogram = initializeNewHistogram(totalNumRecs)
+    contribution = {}  ## component members -> (aggregateType, countNumRecs)
+    singletons = set()  ## single-receptor components, with SINGLETONS_BY_FIRST_MOLECULE
+    byFirstMolecule = (singletonTyping == SINGLETONS_BY_FIRST_MOLECULE)
+    for t, removed, added in deltas.iter_event_lists():
+        vanished, appeared = tracker.apply( removed, added )
+        for cc in vanished:
+            aggregateType, countNumRecs = contribution.pop( cc )
+            if cc in singletons:
+                singletons.discard( cc )
+            else:
+                histogram[ aggregateType ] = histogram[ aggregateType ] - countNumRecs
+            histogram["Free"] = histogram["Free"] + countNumRecs
+        for cc in appeared:
+            aggregateType, countNumRecs = classify_component( cc, tracker, totalNumRecs, totalNumLigs, cache )
+            if byFirstMolecule and (countNumRecs == 1):
+                singletons.add( cc )  ## typed below, from this timestep's edge order
+                contribution[ cc ] = (aggregateType, countNumRecs)
+                histogram["Free"] = histogram["Free"] - countNumRecs
+                continue
+            if aggregateType not in histogram.keys():
+                print( "[DEBUG] Warning! Found undefined aggregateType: {}".format( aggregateType ))
+                histogram[ aggregateType ] = 0
+            contribution[ cc ] = (aggregateType, countNumRecs)
+            histogram[ aggregateType ] = countNumRecs + histogram[aggregateType]
+            histogram["Free"] = histogram["Free"] - countNumRecs  ## remove from free.
+        if byFirstMolecule:
+            _count_singletons_by_first_molecule( histogram, singletons, tracker, timeline[t][:, 0].tolist() )
+        yield dict( histogram )
+
+def first_molecule_of_components( timeline, start, labels ):
+    """Returns the (numTimesteps x numMolecules) first molecule of each component (by label) of
+    timesteps start.., in the order of their edges (the mol1 of the component's first edge),
+    i.e. cc[0] of Graph.get_connectedComponents; -1 for labels without edges."""
+    numTimesteps, numMolecules = labels.shape
+    offsets = np.asarray( timeline.offsets[ start : start+numTimesteps+1 ] )
+    mol1s = np.asarray( timeline.edges[ offsets[0] : offsets[-1], 0 ], dtype=np.int64 )
+    tOfEdge = np.repeat( np.arange( numTimesteps ), np.diff( offsets ))
+    keys = tOfEdge * numMolecules + labels[ tOfEdge, mol1s ]
+    uniqueKeys, firstRows = np.unique( keys, return_index=True )  ## first occurrence of each component
+    first = np.full( numTimesteps * numMolecules, -1, dtype=np.int64 )
+    first[ uniqueKeys ] = mol1s[ firstRows ]
+    return first.reshape( numTimesteps, numMolecules )
+
+def histogram_block_from_labels( timeline, start, labels, totalNumRecs, singletonTyping=SINGLETONS_BY_FIRST_MOLECULE ):
+    """Returns the (numTimesteps x numColumns) histogram rows of timesteps start.. of timeline,
+    in histogramToString's column order, from their component labels (see util_batchComponents).
+    A receptor counts towards the class of its component: Free if it has no edges,
+    SingletonA/B/AB if it is the only receptor, else "<n>mer". Singletons are typed by the
+    bound sites of the component's first molecule (as classify_aggregate), or by the receptor's
+    own with SINGLETONS_BY_RECEPTOR.
+    Also returns the number of receptors in components without a column ("<numRecs>mer")."""
+    numTimesteps, numMolecules = labels.shape
+    numColumns = 4 + max( totalNumRecs - 2, 0 )
+    stop = start + numTimesteps
+
+    occupancyAll = occupancy_block( timeline, start, stop, numMolecules )
+    occupancy = occupancyAll[:, :totalNumRecs]
+    hasEdge = occupancy != 0
+
+    ## number of receptors in each receptor's component
+    compIDs = np.arange( numTimesteps )[:, np.newaxis] * numMolecules + labels[:, :totalNumRecs]
+    numRecsInComp = np.bincount( compIDs.ravel(), minlength=numTimesteps*numMolecules )[ compIDs ]
+
+    typedBy = occupancy
+    if singletonTyping == SINGLETONS_BY_FIRST_MOLECULE:
+        firstMolecule = first_molecule_of_components( timeline, start, labels ).ravel()[ compIDs ]
+        typedBy = np.where( firstMolecule >= 0,
+                            occupancyAll[ np.arange( numTimesteps )[:, np.newaxis], np.maximum( firstMolecule, 0 ) ], 0 )
+    isSiteABound = site_bound( typedBy, 0 )
+    isSiteBBound = site_bound( typedBy, 1 )
+
+    column = np.full( (numTimesteps, totalNumRecs), -1, dtype=np.int64 )  ## -1: no column
+    single = hasEdge & (numRecsInComp == 1)
+    column[ single & isSiteABound & ~isSiteBBound ] = 1
+    column[ single & ~isSiteABound & isSiteBBound ] = 2
+    column[ single & isSiteABound & isSiteBBound ] = 3
+    multi = hasEdge & (numRecsInComp >= 2) & (numRecsInComp < totalNumRecs)
+    column[ multi ] = 4 + numRecsInComp[ multi ] - 2
+
+    rows = np.zeros( (numTimesteps, numColumns), dtype=np.int64 )
+    valid = column >= 0
+    cells = (np.arange( numTimesteps )[:, np.newaxis] * numColumns + column)[ valid ]
+    rows.ravel()[:] = np.bincount( cells, minlength=numTimesteps*numColumns )
+    rows[:, 0] = totalNumRecs - hasEdge.sum( axis=1 )
+    numUnclassified = int( np.count_nonzero( hasEdge & (numRecsInComp >= totalNumRecs) ))
+    return rows, numUnclassified
+
+def histogram_matrix_batched( timeline, totalNumRecs, totalNumLigs, blockTimesteps=DEFAULT_BLOCK_TIMESTEPS,
+                              singletonTyping=SINGLETONS_BY_FIRST_MOLECULE ):
+    """Returns the (numTimesteps x numColumns) histogram matrix of timeline, labelling blocks of
+    timesteps at once with scipy.sparse.csgraph and counting classes with numpy
+    (see histogram_block_from_labels). Columns are in histogramToString's order."""
+    numMolecules = totalNumRecs + totalNumLigs
+    if len(timeline.edges):
+        numMolecules = max( numMolecules, 1 + int( timeline.edges[:, [0, 2]].max() ))
+    matrix = np.zeros( (len(timeline), len( initializeNewHistogram(totalNumRecs) )), dtype=np.int64 )
+    warned = False
+    for start, labels in iter_label_blocks( timeline, numMolecules, blockTimesteps ):
+        rows, numUnclassified = histogram_block_from_labels( timeline, start, labels, totalNumRecs, singletonTyping )
+        if numUnclassified and not warned:
+            print( "[DEBUG] Warning! Found undefined aggregateType: {}mer".format( totalNumRecs ))
+            warned = True
+        matrix[ start : start+len(rows) ] = rows
+    return matrix
+
+def iter_histograms_batched( timeline, totalNumRecs, totalNumLigs, blockTimesteps=DEFAULT_BLOCK_TIMESTEPS,
+                             singletonTyping=SINGLETONS_BY_FIRST_MOLECULE ):
+    """Yields the histogram of each timestep, as a dict, from histogram_matrix_batched."""
+    keys = list( initializeNewHistogram(totalNumRecs).keys() )
+    for row in histogram_matrix_batched( timeline, totalNumRecs, totalNumLigs, blockTimesteps, singletonTyping ).tolist():
+        yield dict( zip( keys, row ))
+
+def histogram_matrix_from_dicts( histograms, totalNumRecs ):
+    """Returns the histogram matrix of an iterable of histogram dicts (columns as in histogramToString)."""
+    keys = list( initializeNewHistogram(totalNumRecs).keys() )
+    rows = [ [ histogram[k] for k in keys ] for histogram in histograms ]
+    return np.array( rows, dtype=np.int64 ).reshape( -1, len(keys) )
+
+def histogram_matrix_to_str( matrix ):
+    """The CSV text of a histogram matrix: one histogramToString line per row."""
+    return format_int_csv( matrix ).decode( 'ascii' )
+
+def write_histogram_matrix( ofname, matrix ):
+    write_int_csv( ofname, matrix )
+
+def pop_singleton_typing_arg( argv ):
+    """Returns (singleton typing, argv without the --singletons=... argument)."""
+    singletonTyping = SINGLETONS_BY_FIRST_MOLECULE
+    rest = []
+    for arg in argv:
+        if arg.startswith( SINGLETON_TYPING_ARG_PREFIX ):
+            singletonTyping = arg[ len(SINGLETON_TYPING_ARG_PREFIX) : ]
+            if singletonTyping not in SINGLETON_TYPINGS:
+                raise ValueError( "unknown singleton typing '{}' (expected one of {}).".format( singletonTyping, ", ".join( SINGLETON_TYPINGS )))
+        else:
+            rest.append( arg )
+    return singletonTyping, rest
+
+HISTOGRAM_MODES = { 'incremental': iter_histograms_incremental,
+                    'batched': iter_histograms_batched,
+                    'perTimestep': iter_histograms_perTimestep }
 
 def main():
 
-    numCmdArgs = len(sys.argv)
+    sampling, argv = pop_sampling_arg( sys.argv )
+    singletonTyping, argv = pop_singleton_typing_arg( argv )
+    numCmdArgs = len(argv)
     print("numCmdArgs: {}".format(numCmdArgs))
-    if (numCmdArgs != 6):
+    if (numCmdArgs != 6) and (numCmdArgs != 7):
         print(USAGE_STR)
         exit(1)
 
-    ## otherwise, numCmdArgs == 6...
-    ifname = sys.argv[1]
-    ofname = sys.argv[2]
-    molType = int(sys.argv[3])
-    totalMols = int(sys.argv[4])
-    startIndex = int(sys.argv[5])
+    ## otherwise, numCmdArgs == 6 or 7...
+    ifname = argv[1]
+    ofname = argv[2]
+    molType = int(argv[3])
+    totalMols = int(argv[4])
+    startIndex = int(argv[5])
+    mode = argv[6] if (numCmdArgs == 7) else 'batched'
+    if mode not in HISTOGRAM_MODES:
+        print(USAGE_STR)
+        sys.exit( "Unknown mode '{}'.".format( mode ))
 
     totalNumLigs = totalMols-startIndex
     totalNumRecs = totalMols-totalNumLigs
@@ -312,38 +440,30 @@ def main():
     #histKeysDict = initialize_histMappingDefault()
     histKeysDict = initialize_histMappingDetailedSingletons( totalNumRecs )
     
-    str_list = read_file(ifname)
-    llist_edges = parse_edges_from_str_list( str_list )
-
-    timestep = 0
-    f = open(ofname, 'w')
-    for listOfEdges in llist_edges:
-        myG = Graph(listOfEdges)  #Graph(llist_edges)
-        #myG.print_me()
-        histogram = initializeNewHistogram(totalNumRecs)
-        #print( "[DEBUG] new histogram: {}".format( histogramToString(histogram, totalNumRecs) ))
-        listOfConnectedComponents = myG.get_connectedComponents()
-
-        #histKeyDict = initialize_histMappingDefault()
-        histKeyDict = initialize_histMappingDetailedSingletons( totalNumRecs )
-        #print( "[DEBUG] timestep: {}".format( timestep ))
-        for cc in listOfConnectedComponents:
-            #print( "[DEBUG] cc: {}".format( cc ))
-            countNumRecs = count_numRecsInCC(cc, totalNumRecs, totalNumLigs)
-            aggregateType = classify_aggregate(cc, myG, totalNumRecs, totalNumLigs )
-            #print( "[DEBUG] aggregateType: {}".format( aggregateType ))
-            #histKey = histKeyDict[ aggregateType ] 
-            if aggregateType not in histogram.keys():
-                #print( "[DEBUG] oopsies, aggregateType {} wasn't in histogram.keys() {} ...".format(aggregateType, histogram.keys()) )
-                print( "[DEBUG] Warning! Found undefined aggregateType: {}".format( aggregateType ))
-                histogram[ aggregateType ] = 0
-            #histogram[countNumRecs] = countNumRecs + histogram[countNumRecs]
-            histogram[ aggregateType ] = countNumRecs + histogram[aggregateType]
-            histogram["Free"] = histogram["Free"] - countNumRecs  ## remove from free.
-        f.write( histogramToString(histogram,totalNumRecs) )
-        timestep = 1 + timestep
-    f.close()
+    if sampling is None:
+        llist_edges = load_timeline(ifname)  ## an EdgeTimeline; parsed once, then memory-mapped from cache
+    else:
+        llist_edges, timesteps = load_sampled_timeline( ifname, sampling )
+        print( "Sampling: {} ({} timesteps)".format( sampling, len(timesteps) ))
+
+    cache = None
+    if mode == 'batched':
+        matrix = histogram_matrix_batched( llist_edges, totalNumRecs, totalNumLigs, singletonTyping=singletonTyping )
+    elif mode == 'incremental':
+        cache = ClassificationCache( lambda signature: classify_signature( signature, totalNumRecs, totalNumLigs ))
+        matrix = histogram_matrix_from_dicts( iter_histograms_incremental( llist_edges, totalNumRecs, totalNumLigs, cache, singletonTyping ), totalNumRecs )
+    else:
+        matrix = histogram_matrix_from_dicts( iter_histograms_perTimestep( llist_edges, totalNumRecs, totalNumLigs, singletonTyping ), totalNumRecs )
+
+    if sampling is None:
+        write_histogram_matrix( ofname, matrix )
+    else:
+        rows, labels = sampling.reduce( matrix, timesteps )
+        with open(ofname, 'w') as f:
+            f.write( format_labelled_rows( labels, rows ))
     print( "Done. Wrote to {}".format( ofname ))
+    if cache is not None:
+        print( cache.stats() )
     print( "" )
     return
 
@@ -5,10 +5,13 @@
 # descriptions:
 #   For each experimental run, read files: bindingDistances.data and full_bindingsites.data
 #   And produce:
-#     full_bindingsites.data.noPeriods
-#     bindingDistances.data.onlyValidEdges
+#     class_stats.groupByAggsize.<expName>.csv
 #
-#   By using the Python script of the same name, filterOutInvalidDistances.py, at each directory.
+#   By using the Python script of the same name, gen_popkinsForChains.py, at each directory.
+#   full_bindingsites.data is read directly; no .noPeriods copy is made.
+#
+#   gen_popkinsForExperiment.py does the same (and the aggregation below)
+#   in one Python process, with the runs spread over a process pool.
 #--------------------------------------------------------------------------------------------------
 # usage:
 #   This script does not require arguments, and is independent of experiment name. Simply call...
@@ -16,7 +19,7 @@
 #   ./filterOutInvalidDistances.sh
 #
 #----
-# ./gen_popkinsForChains.py full_bindingsites.data.noPeriods temp 1 25 20
+# ./gen_popkinsForChains.py full_bindingsites.data temp 1 25 20
 #--------------------------------------------------------------------------------------------------
 
 
@@ -25,7 +28,6 @@ numMols=40
 startIdx=20
 
 f1a=full_bindingsites.data
-f1b=full_bindingsites.data.noPeriods
 outfPerRun=class_stats.groupByAggsize.${expName}.csv
 outfPer2mer=cumulative_class_stats.2mer.${expName}.csv
 
@@ -33,7 +35,6 @@ echo "expName: ${expName}"
 echo "numMols: ${numMols}"
 echo "startIdx: ${startIdx}"
 echo "f1a: ${f1a}"
-echo "f1b: ${f1b}"
 echo "outfPerRun: ${outfPerRun}"
 echo "outfPer2mer: ${outfPer2mer}"
 
@@ -41,8 +42,7 @@ echo "outfPer2mer: ${outfPer2mer}"
 find . -maxdepth 1 -type d \( ! -name . \) \
     -exec bash -c "( cd '{}' && 
                      pwd && 
-                     sed 's/\./,/g' ${f1a} > ${f1b} &&
-                     ../gen_popkinsForChains.py ${f1b} ${outfPerRun} 1 ${numMols} ${startIdx} )" \;
+                     ../gen_popkinsForChains.py ${f1a} ${outfPerRun} 1 ${numMols} ${startIdx} )" \;
 
 python3 gen_aggregatePopkinsForChains.py $expName
 
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# filename: gen_popkinsForExperiment.py
+# description:
+#   Does what gen_popkinsForChains.sh followed by
+#   gen_aggregatePopkinsForChains.py do, in a single process:
+#     * finds the run directories of the experiment (subdirectories of
+#       the current directory holding a full_bindingsites.data, plain
+#       or compressed),
+#     * computes each run's popkins histogram matrix
+#       (gen_popkinsForChains.histogram_matrix_batched) in a pool of
+#       worker processes,
+#     * streams the matrices into one result cube and writes
+#       cumulative_class_stats.*.<expName>.csv from it
+#       (gen_aggregatePopkinsForChains.cumulatePopkinsForChains).
+#   Runs fill the columns in runID order (util_runDiscovery). The per-run
+#   class_stats.groupByAggsize.<expName>.csv files are only written
+#   when asked. With <output> summary, only the mean, std and
+#   quantiles over the runs are kept (see util_runStats).
+#--------------------------------------------------------------------
+# usage:
+#   gen_popkinsForExperiment.py <expName> <totalMols> <startIndex> [<numWorkers>] [<writePerRun>] [<binSpecs>] [<output>] [--bins=<numBins>]
+#
+#   e.g. (from the experiment directory)
+#   ../gen_popkinsForExperiment.py my100GrpTwo20R10L10M 40 20 8
+#--------------------------------------------------------------------
+
+import os
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from util_runDiscovery import find_runs
+from util_timelineCache import load_timeline
+from gen_popkinsForChains import histogram_matrix_batched, write_histogram_matrix
+from gen_aggregatePopkinsForChains import cumulatePopkinsForChains
+from util_sizeBins import DEFAULT_BIN_SPEC
+from util_runStats import pop_bins_arg
+
+USAGE_STR = """
+
+ Usage:
+   gen_popkinsForExperiment.py <expName> <totalMols> <startIndex> [<numWorkers>] [<writePerRun>] [<binSpecs>] [<output>] [--bins=<numBins>]
+
+   where, <expName> = (string) name of experiment,
+          <totalMols> = (int) total number of molecules,
+          <startIndex> = (int) molecule ID of the first ligand (= number of receptors),
+          [<numWorkers>] = (int) number of worker processes (default: number of CPUs),
+          [<writePerRun>] = 1 to also write class_stats.groupByAggsize.<expName>.csv in each run (default: 0)
+          [<binSpecs>] = (string) size bins of the cumulative files, e.g. "2,3,4,5,6-9,10+" (see util_sizeBins)
+          [<output>] = runs (default), summary or both (see gen_aggregatePopkinsForChains)
+          [--bins=<numBins>] = (int) histogram bins of the summary quantiles (default: 32, see util_runStats)
+"""
+
+RUN_DATA_FNAME = "full_bindingsites.data"
+PER_RUN_FNAME = "class_stats.groupByAggsize.{}.csv"
+
+
+def find_run_data(expDir='.', fname=RUN_DATA_FNAME):
+    """Returns the binding sites file of every run directory directly under expDir, by runID."""
+    return [ f for runID, f in find_runs( os.path.join( expDir, '*', fname )) ]
+
+def popkins_of_run(ifname, totalNumRecs, totalNumLigs, perRunOfname=None):
+    """Returns the popkins histogram matrix of one run (and writes it to perRunOfname, if given)."""
+    timeline = load_timeline( ifname, numWorkers=1 )  ## the runs are already spread over processes
+    matrix = histogram_matrix_batched( timeline, totalNumRecs, totalNumLigs )
+    if perRunOfname is not None:
+        write_histogram_matrix( os.path.join( os.path.dirname( ifname ), perRunOfname ), matrix )
+    return matrix
+
+def iter_popkins_of_experiment(expName, totalNumRecs, totalNumLigs, expDir='.', numWorkers=None, writePerRun=False):
+    """Yields the popkins matrix of every run of the experiment in expDir, in run order."""
+    runFnames = find_run_data( expDir )
+    perRunOfname = PER_RUN_FNAME.format( expName ) if writePerRun else None
+    if (numWorkers == 1) or (len(runFnames) <= 1):
+        for f in runFnames:
+            yield popkins_of_run( f, totalNumRecs, totalNumLigs, perRunOfname )
+        return
+    with ProcessPoolExecutor( max_workers=numWorkers ) as pool:
+        futures = deque( pool.submit( popkins_of_run, f, totalNumRecs, totalNumLigs, perRunOfname ) for f in runFnames )
+        while futures:
+            yield futures.popleft().result()  ## no reference kept once the caller has it
+
+def popkins_of_experiment(expName, totalNumRecs, totalNumLigs, expDir='.', numWorkers=None, writePerRun=False):
+    """Returns the popkins matrices of every run of the experiment in expDir, in run order."""
+    return list( iter_popkins_of_experiment( expName, totalNumRecs, totalNumLigs, expDir, numWorkers, writePerRun ))
+
+def main():
+    numBins, argv = pop_bins_arg( sys.argv )
+    numCmdArgs = len(argv)
+    if (numCmdArgs < 4) or (numCmdArgs > 8):
+        print(USAGE_STR)
+        sys.exit("Incorrect number of arguments.")
+    expName = argv[1]
+    totalMols = int(argv[2])
+    startIndex = int(argv[3])
+    numWorkers = int(argv[4]) if (numCmdArgs > 4) else None
+    writePerRun = (numCmdArgs > 5) and (argv[5] == '1')
+    binSpecs = argv[6] if (numCmdArgs > 6) else DEFAULT_BIN_SPEC
+    output = argv[7] if (numCmdArgs > 7) else 'runs'
+    totalNumRecs = startIndex
+    totalNumLigs = totalMols - startIndex
+
+    matrices = iter_popkins_of_experiment( expName, totalNumRecs, totalNumLigs, numWorkers=numWorkers, writePerRun=writePerRun )
+    cumulatePopkinsForChains( matrices, expName, numWorkers=numWorkers, binSpecs=binSpecs, output=output, numBins=numBins )  ## each run is added as it arrives
+    print( "Done. Wrote cumulative_class_*.{}.csv".format( expName ))
+    return
+
+if __name__ == '__main__':
+    main()
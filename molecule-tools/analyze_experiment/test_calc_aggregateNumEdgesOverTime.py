@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+import io
+import os
+import tempfile
+import unittest
+from contextlib import redirect_stderr, redirect_stdout
+
+from util_testFixtures import gen_synthetic_file
+from util_edgeTimeline import EdgeTimeline
+from util_sampling import parse_sampling
+from calc_aggregateNumEdgesOverTime import *
+
+class TestAggNumEdgesOverTime(unittest.TestCase):
+    def setUp(self):
+        self.tmpDir = tempfile.TemporaryDirectory()
+        self.savedDir = os.getcwd()
+        os.chdir( self.tmpDir.name )
+        for runID, numTimesteps in ((1, 120), (2, 120)):
+            os.mkdir( "exp_{}".format( runID ))
+            gen_synthetic_file( os.path.join( "exp_{}".format( runID ), "run.data" ), numTimesteps=numTimesteps,
+                                numRecs=4, numLigs=4, seed=runID )
+
+    def tearDown(self):
+        os.chdir( self.savedDir )
+        self.tmpDir.cleanup()
+
+    def agg(self, *args, **kwargs):
+        with redirect_stdout( io.StringIO() ):
+            return aggNumEdgesOverTime( "run.data", *args, numWorkers=1, **kwargs )
+
+    def test_length_of_first_run(self):
+        labels, M = self.agg()
+        self.assertEqual( len(labels), 120 )
+        self.assertEqual( M[:, 1].tolist(), EdgeTimeline.from_file( os.path.join( "exp_2", "run.data" )).num_edges().tolist() )
+
+        labels, M = self.agg( parse_sampling( "stride:10,average:3" ))
+        self.assertEqual( labels.tolist(), [0, 30, 60, 90] )
+        self.assertEqual( M.shape[0], 4 )
+        return
+
+    def test_run_length_mismatch(self):
+        err = io.StringIO()
+        with redirect_stderr( err ):
+            labels, M = self.agg( numTimesteps=150 )
+        self.assertEqual( len(labels), 150 )
+        self.assertIn( "fewer", err.getvalue() )
+        with self.assertRaises( ValueError ):
+            self.agg( numTimesteps=100 )
+        return
+
+if __name__ == "__main__":
+    unittest.main()
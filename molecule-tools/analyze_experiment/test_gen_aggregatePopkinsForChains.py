@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from gen_aggregatePopkinsForChains import *
+from gen_aggregatePopkinsForChains import _helper_fillMatrix
+
+class TestPopkinsCube(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng( 2 )
+        self.m_list = [ rng.integers( 0, 20, (n, 22) ) for n in (30, 30, 17) ]  ## the last run ended early
+
+    def test_add_run_matches_fill(self):
+        cube = PopkinsCube( 30, 4 )
+        for runID, matrix in enumerate(self.m_list):
+            cube.add_run( runID, matrix )
+            filled = _helper_fillMatrix( matrix, 30 ) if (len(matrix) < 30) else matrix
+            self.assertEqual( cube.class_series('free')[:, runID].tolist(), filled[:, 0].tolist() )
+            self.assertEqual( cube.class_series('3mer')[:, runID].tolist(), filled[:, 5].tolist() )
+            self.assertEqual( cube.class_series('6mer')[:, runID].tolist(), filled[:, 8:12].sum( axis=1 ).tolist() )
+        self.assertFalse( cube.cube[:, :, 3].any() )
+        with self.assertRaises( ValueError ):
+            cube.add_run( 0, np.zeros( (31, 22), dtype=np.int64 ))
+        return
+
+    def test_memmapped_cube_writes_csvs(self):
+        with tempfile.TemporaryDirectory() as d:
+            cwd = os.getcwd()
+            os.chdir( d )
+            try:
+                cube, stats = cumulatePopkinsForChains( self.m_list, 'exp', expectedNumSteps=30, expectedNumRuns=3,
+                                                 cubeFname='cube.npy', numWorkers=2 )
+                self.assertIsInstance( cube.cube, np.memmap )
+                for name, startCol, stopCol in POPKINS_CLASSES:
+                    expected = cube.class_series( name )
+                    self.assertEqual( read_csv( "cumulative_class_stats.{}.exp.csv".format( name )).tolist(), expected.tolist() )
+            finally:
+                os.chdir( cwd )
+        return
+
+    def test_summary_only(self):
+        with tempfile.TemporaryDirectory() as d:
+            cwd = os.getcwd()
+            os.chdir( d )
+            try:
+                cube, stats = cumulatePopkinsForChains( self.m_list, 'exp', expectedNumSteps=30, expectedNumRuns=3, output='summary' )
+                self.assertIsNone( cube )
+                self.assertFalse( os.path.exists( "cumulative_class_stats.free.exp.csv" ))
+                summary = read_csv( SUMMARY_FNAME.format( 'free', 'exp' ))
+                self.assertTrue( os.path.exists( RUN_STATS_FNAME.format( 'exp' )))
+            finally:
+                os.chdir( cwd )
+        free = np.stack( [ _helper_fillMatrix( M, 30 )[:, 0] for M in self.m_list ], axis=1 )
+        self.assertEqual( stats.n, 3 )
+        self.assertTrue( np.allclose( summary[:, 0], free.mean( axis=1 ), rtol=1e-5 ))
+        self.assertTrue( np.allclose( summary[:, 3], np.median( free, axis=1 )))
+        with self.assertRaises( ValueError ):
+            cumulatePopkinsForChains( self.m_list, 'exp', output='cube' )
+        return
+
+if __name__ == "__main__":
+    unittest.main()
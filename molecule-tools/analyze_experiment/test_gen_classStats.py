@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from util_testFixtures import gen_synthetic_file
+from util_edgeTimeline import EdgeTimeline
+from util_components import component_labels
+from gen_classStats import *
+
+## 4 receptors (0-3), 4 ligands (4-7)
+LINES = [ "[]",
+          "[(0.0,4.0),(4.0,0.0)]",                                              ## singleton
+          "[(0.0,4.0),(4.0,0.0),(0.1,4.1),(4.1,0.1)]",                          ## singleton, bivalent to one ligand
+          "[(0.1,4.0),(4.0,0.1),(1.0,4.1),(4.1,1.0)]",                          ## chain of 2
+          "[(0.0,4.0),(4.0,0.0),(0.1,5.0),(5.0,0.1),(1.0,4.1),(4.1,1.0),(1.1,5.1),(5.1,1.1)]",  ## ring of 2
+          "[(0.0,4.0),(4.0,0.0),(1.0,4.1),(4.1,1.0),(2.0,4.2),(4.2,2.0)]" ]    ## branched at ligand 4
+
+def naive_class_stats(edges, numRecs, numMolecules):
+    labels = component_labels( edges, numMolecules ).tolist()
+    edges = np.asarray( edges ).tolist()
+    degree = [0] * numMolecules
+    for e in edges:
+        degree[ e[0] ] += 1
+    row = [0] * 5
+    for r in range(0, numRecs):
+        if degree[r] == 0:
+            row[FREE] += 1
+            continue
+        members = [ m for m in range(0, numMolecules) if (labels[m] == labels[r]) and degree[m] ]
+        numRecsInComp = sum( 1 for m in members if m < numRecs )
+        numBonds = sum( degree[m] for m in members ) // 2
+        cyclomatic = numBonds - len(members) + 1
+        branched = max( degree[m] for m in members ) > 2
+        if numRecsInComp == 1:
+            row[SINGLETON] += 1
+        elif (not branched) and (cyclomatic == 0):
+            row[CHAIN] += 1
+        elif (not branched) and (cyclomatic == 1):
+            row[CYCLE] += 1
+        else:
+            row[CLUSTER] += 1
+    return row
+
+class TestClassStats(unittest.TestCase):
+    def test_topologies(self):
+        counts = class_stats_of_timeline( EdgeTimeline.from_strs( LINES ), 4, 4, blockTimesteps=4 )
+        self.assertEqual( counts.tolist(), [ [4, 0, 0, 0, 0],
+                                             [3, 1, 0, 0, 0],
+                                             [3, 1, 0, 0, 0],
+                                             [2, 0, 2, 0, 0],
+                                             [2, 0, 0, 2, 0],
+                                             [1, 0, 0, 0, 3] ] )
+        return
+
+    def test_matches_naive_classifier(self):
+        with tempfile.NamedTemporaryFile( suffix='.data', delete=False ) as f:
+            fname = f.name
+        try:
+            gen_synthetic_file( fname, numTimesteps=300, numRecs=4, numLigs=4, seed=11 )
+            timeline = EdgeTimeline.from_file( fname )
+        finally:
+            os.remove( fname )
+        counts = class_stats_of_timeline( timeline, 4, 4, blockTimesteps=64 )
+        for t in range(0, len(timeline)):
+            self.assertEqual( counts[t].tolist(), naive_class_stats( timeline[t], 4, 8 ))
+        self.assertTrue( (counts.sum( axis=1 ) == 4).all() )
+        return
+
+    def test_write_class_stats(self):
+        with tempfile.TemporaryDirectory() as d:
+            prefix = os.path.join( d, 'class_stats' )
+            fnames = write_class_stats( np.array( [[4, 0, 0, 0, 0], [2, 0, 2, 0, 0]] ), prefix )
+            self.assertEqual( [ os.path.basename(x) for x in fnames ],
+                              [ 'class_stats.{}.csv'.format(name) for name in CLASS_NAMES ] )
+            with open(fnames[0]) as f:
+                self.assertEqual( f.read(), "4\n2\n" )
+            with open(fnames[CHAIN]) as f:
+                self.assertEqual( f.read(), "0\n2\n" )
+        return
+
+    def test_cumulative_class_stats_of_experiment(self):
+        with tempfile.TemporaryDirectory() as d:
+            for runID in (10, 2):
+                os.mkdir( os.path.join( d, "exp_{}".format( runID )))
+                gen_synthetic_file( os.path.join( d, "exp_{}".format( runID ), RUN_DATA_FNAME ),
+                                    numTimesteps=50, numRecs=4, numLigs=4, seed=runID )
+            os.mkdir( os.path.join( d, "exp_3" ))
+            with open( os.path.join( d, "exp_3", CLASS_STATS_M_FNAME ), 'w' ) as f:
+                for i, name in enumerate( ['freeHist', 'snglFound', 'chanFound', 'cyclFound', 'clstFound'] ):
+                    f.write( "{}_4_4_8_4_{} = [ {},{},{} ];\n".format( name, i, 4-i, i, 1 ))
+            self.assertEqual( [ os.path.relpath( f, d ) for f in find_class_stats_runs( d ) ],
+                              [ os.path.join( "exp_2", RUN_DATA_FNAME ), os.path.join( "exp_3", CLASS_STATS_M_FNAME ),
+                                os.path.join( "exp_10", RUN_DATA_FNAME ) ] )
+
+            fnames = write_cumulative_class_stats( iter_class_stats_of_experiment( 4, 4, d, numWorkers=1 ), "exp", d )
+            self.assertEqual( [ os.path.basename(x) for x in fnames ],
+                              [ 'cumulative_class_stats.{}.exp.csv'.format(name) for name in CLASS_NAMES ] )
+            expected = [ class_stats_of_timeline( EdgeTimeline.from_file( os.path.join( d, "exp_{}".format( runID ), RUN_DATA_FNAME )), 4, 4 )
+                         for runID in (2, 10) ]
+            with open(fnames[CHAIN]) as f:
+                lines = f.read().splitlines()
+            self.assertEqual( len(lines), 50 )
+            self.assertEqual( lines[0], "{},2,{}".format( expected[0][0, CHAIN], expected[1][0, CHAIN] ))
+            self.assertEqual( lines[3], "{},,{}".format( expected[0][3, CHAIN], expected[1][3, CHAIN] ))  ## class_stats.m has 3 timesteps
+        return
+
+if __name__ == "__main__":
+    unittest.main()
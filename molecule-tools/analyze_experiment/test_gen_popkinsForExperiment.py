@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from util_testFixtures import gen_synthetic_file
+from util_edgeTimeline import EdgeTimeline
+from gen_popkinsForChains import histogram_matrix_batched
+from gen_aggregatePopkinsForChains import read_csv, cumulatePopkinsForChains
+from gen_popkinsForExperiment import *
+
+class TestPopkinsForExperiment(unittest.TestCase):
+    def setUp(self):
+        self.tmpDir = tempfile.TemporaryDirectory()
+        self.expDir = self.tmpDir.name
+        for runID in (2, 1, 3):
+            runDir = os.path.join( self.expDir, "exp_{}".format( runID ))
+            os.mkdir( runDir )
+            gen_synthetic_file( os.path.join( runDir, RUN_DATA_FNAME ), numTimesteps=200, numRecs=20, numLigs=20, seed=runID )
+        os.mkdir( os.path.join( self.expDir, "notARun" ))
+
+    def tearDown(self):
+        self.tmpDir.cleanup()
+
+    def test_find_run_data(self):
+        found = [ os.path.relpath( f, self.expDir ) for f in find_run_data( self.expDir ) ]
+        self.assertEqual( found, [ os.path.join( "exp_{}".format(i), RUN_DATA_FNAME ) for i in (1, 2, 3) ] )
+        return
+
+    def test_pool_matches_per_run(self):
+        m_list = popkins_of_experiment( 'exp', 20, 20, expDir=self.expDir, numWorkers=2, writePerRun=True )
+        self.assertEqual( len(m_list), 3 )
+        for runID, M in zip( (1, 2, 3), m_list ):
+            runDir = os.path.join( self.expDir, "exp_{}".format( runID ))
+            expected = histogram_matrix_batched( EdgeTimeline.from_file( os.path.join( runDir, RUN_DATA_FNAME )), 20, 20 )
+            self.assertTrue( np.array_equal( M, expected ))
+            self.assertTrue( np.array_equal( read_csv( os.path.join( runDir, PER_RUN_FNAME.format( 'exp' ))), expected ))
+
+        cwd = os.getcwd()
+        os.chdir( self.expDir )
+        try:
+            cumulatePopkinsForChains( m_list, 'exp', expectedNumSteps=200, expectedNumRuns=3 )
+            free = read_csv( "cumulative_class_stats.free.exp.csv" )
+        finally:
+            os.chdir( cwd )
+        self.assertEqual( free.tolist(), np.stack( [ M[:, 0] for M in m_list ], axis=1 ).tolist() )
+        return
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from util_testFixtures import gen_synthetic_file
+from util_edgeTimeline import EdgeTimeline
+from util_fullBindingSitesParser import Graph
+from util_aggregateEvents import *
+
+## 3 receptors (0-2), 3 ligands (3-5)
+LINES = [ "[(0.0,3.0),(3.0,0.0)]",                                              ## birth {0,3}
+          "[(0.0,3.0),(3.0,0.0),(1.0,3.1),(3.1,1.0)]",                          ## grow to {0,1,3}
+          "[(0.0,3.0),(3.0,0.0),(1.0,3.1),(3.1,1.0),(2.0,4.0),(4.0,2.0)]",      ## birth {2,4}
+          "[(0.0,3.0),(3.0,0.0),(1.0,3.1),(3.1,1.0),(2.0,4.0),(4.0,2.0),(1.1,4.1),(4.1,1.1)]",  ## merge
+          "[(0.0,3.0),(3.0,0.0),(2.0,4.0),(4.0,2.0),(1.1,4.1),(4.1,1.1)]",      ## split {0,3} off
+          "[(0.0,3.0),(3.0,0.0),(1.1,4.1),(4.1,1.1)]",                          ## shrink to {1,4}
+          "[(1.1,4.1),(4.1,1.1)]" ]                                             ## death of {0,3}
+
+class TestAggregateEvents(unittest.TestCase):
+    def test_event_sequence(self):
+        events = track_aggregates( EdgeTimeline.from_strs( LINES ), 3, 6 )
+        actual = [ (int(e['timestep']), EVENT_NAMES[ e['kind'] ], int(e['aggregate']), int(e['other']), int(e['size']), int(e['prevSize']))
+                   for e in events ]
+        self.assertEqual( actual, [ (0, 'birth', 0, -1, 2, 0),
+                                    (1, 'grow', 0, -1, 3, 2),
+                                    (2, 'birth', 1, -1, 2, 0),
+                                    (3, 'merge', 0, 1, 5, 2),
+                                    (4, 'split', 2, 0, 2, 5),
+                                    (4, 'shrink', 0, -1, 3, 5),
+                                    (5, 'shrink', 0, -1, 2, 3),
+                                    (6, 'death', 2, -1, 0, 2) ] )
+        lifetimes = aggregate_lifetimes( events, len(LINES) )
+        self.assertEqual( lifetimes['start'].tolist(), [0, 2, 4] )
+        self.assertEqual( lifetimes['end'].tolist(), [7, 3, 6] )
+        self.assertEqual( lifetimes['ended'].tolist(), [False, True, True] )
+        return
+
+    def test_live_aggregates_match_components(self):
+        with tempfile.TemporaryDirectory() as d:
+            fname = os.path.join( d, 'full_bindingsites.data' )
+            gen_synthetic_file( fname, numTimesteps=400, numRecs=6, numLigs=6, seed=8 )
+            timeline = EdgeTimeline.from_file( fname )
+            events = track_aggregates( timeline, 6, 12 )
+            save_events( fname + EVENTS_SUFFIX, events )
+            self.assertTrue( np.array_equal( load_events( fname + EVENTS_SUFFIX ), events ))
+        ## births and splits add an aggregate, merges and deaths remove one
+        delta = np.zeros( len(timeline), dtype=np.int64 )
+        for kinds, sign in (((BIRTH, SPLIT), 1), ((MERGE, DEATH), -1)):
+            m = np.isin( events['kind'], kinds )
+            np.add.at( delta, events['timestep'][m], sign )
+        numLive = np.cumsum( delta )
+        for t in range(0, len(timeline)):
+            self.assertEqual( numLive[t], len( Graph( timeline[t] ).get_connectedComponents() ))
+        return
+
+if __name__ == "__main__":
+    unittest.main()
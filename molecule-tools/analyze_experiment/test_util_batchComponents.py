@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+
+from util_testFixtures import gen_synthetic_file, LIGAND_FIRST_LINES, LIGAND_FIRST_ROWS, LIGAND_FIRST_ROWS_BY_RECEPTOR
+from util_edgeTimeline import EdgeTimeline
+from util_components import component_labels
+from util_batchComponents import *
+from gen_popkinsForChains import iter_histograms_batched, iter_histograms_perTimestep, histogramToString, \
+    histogram_matrix_batched, histogram_matrix_from_dicts, histogram_matrix_to_str, SINGLETONS_BY_RECEPTOR
+
+class TestBatchComponents(unittest.TestCase):
+    def setUp(self):
+        with tempfile.NamedTemporaryFile( suffix='.data', delete=False ) as f:
+            self.fname = f.name
+        gen_synthetic_file( self.fname, numTimesteps=300, numRecs=3, numLigs=5, seed=5 )
+        self.timeline = EdgeTimeline.from_file( self.fname )
+
+    def tearDown(self):
+        os.remove( self.fname )
+
+    def test_labels_match_union_find(self):
+        labels = label_timesteps( self.timeline, 8, blockTimesteps=64 )
+        self.assertEqual( labels.shape, (300, 8) )
+        for t in range(0, len(self.timeline)):
+            self.assertEqual( labels[t].tolist(), component_labels( self.timeline[t], 8 ).tolist() )
+        return
+
+    def test_popkins_histograms_match(self):
+        batched = [ histogramToString( h, 3 ) for h in iter_histograms_batched( self.timeline, 3, 5, blockTimesteps=64 ) ]
+        perTimestep = [ histogramToString( h, 3 ) for h in iter_histograms_perTimestep( self.timeline, 3, 5 ) ]
+        self.assertEqual( batched, perTimestep )
+        return
+
+    def test_histogram_matrix_csv_matches(self):
+        matrix = histogram_matrix_batched( self.timeline, 3, 5, blockTimesteps=64 )
+        self.assertEqual( matrix.shape, (300, 5) )
+        expected = "".join( histogramToString( h, 3 ) for h in iter_histograms_perTimestep( self.timeline, 3, 5 ))
+        self.assertEqual( histogram_matrix_to_str( matrix ), expected )
+        fromDicts = histogram_matrix_from_dicts( iter_histograms_perTimestep( self.timeline, 3, 5 ), 3 )
+        self.assertEqual( fromDicts.tolist(), matrix.tolist() )
+        return
+
+    def test_ligand_first_singletons(self):
+        timeline = EdgeTimeline.from_strs( LIGAND_FIRST_LINES )
+        self.assertEqual( histogram_matrix_batched( timeline, 20, 20 )[:, :6].tolist(), LIGAND_FIRST_ROWS )
+        self.assertEqual( histogram_matrix_batched( timeline, 20, 20, singletonTyping=SINGLETONS_BY_RECEPTOR )[:, :6].tolist(),
+                          LIGAND_FIRST_ROWS_BY_RECEPTOR )
+        return
+
+if __name__ == "__main__":
+    unittest.main()
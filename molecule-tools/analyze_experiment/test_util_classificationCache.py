@@ -0,0 +1,40 @@
+#!/usr/bin/env python3
+
+import unittest
+
+from util_classificationCache import *
+from gen_popkinsForChains import classify_signature
+
+class TestClassificationCache(unittest.TestCase):
+    def test_signature_is_canonical(self):
+        bound = { 0: [0, 1], 20: [2], 21: [3] }
+        s1 = component_signature( [21, 0, 20], lambda m: bound[m] )
+        s2 = component_signature( {20, 21, 0}, lambda m: bound[m] )
+        self.assertEqual( s1, s2 )
+        self.assertEqual( s1, ((0, 20, 21), (3, 4, 8)) )
+        return
+
+    def test_hits_misses_and_bound(self):
+        calls = []
+        cache = ClassificationCache( lambda sig: calls.append(sig) or len(sig[0]), maxEntries=2 )
+        a = ((0, 20), (1, 1))
+        b = ((1, 21), (2, 1))
+        c = ((0, 1, 20), (1, 1, 3))
+        self.assertEqual( cache.get(a), 2 )
+        self.assertEqual( cache.get(a), 2 )
+        cache.get(b)
+        cache.get(c)  ## evicts a, the least recently used
+        cache.get(a)
+        self.assertEqual( (cache.hits, cache.misses, cache.evictions), (1, 4, 2) )
+        self.assertEqual( len(cache), 2 )
+        self.assertEqual( len(calls), 4 )
+        return
+
+    def test_classify_signature(self):
+        self.assertEqual( classify_signature( ((0, 20), (1, 1)), 20, 20 ), ("SingletonA", 1) )
+        self.assertEqual( classify_signature( ((20, 0), (1, 3)), 20, 20 ), ("SingletonAB", 1) )
+        self.assertEqual( classify_signature( ((0, 1, 20), (2, 1, 3)), 20, 20 ), ("2mer", 2) )
+        return
+
+if __name__ == "__main__":
+    unittest.main()
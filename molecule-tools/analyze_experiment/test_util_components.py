@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+
+import unittest
+
+import numpy as np
+
+from util_components import *
+from util_fullBindingSitesParser import Graph, parse_edges_from_str
+
+class TestComponents(unittest.TestCase):
+    def test_DisjointSet(self):
+        ds = DisjointSet( 6 )
+        ds.union( 4, 1 )
+        ds.union( 1, 5 )
+        ds.union( 2, 3 )
+        self.assertEqual( ds.find(5), ds.find(4) )
+        self.assertNotEqual( ds.find(0), ds.find(1) )
+        self.assertEqual( ds.labels().tolist(), [0, 1, 2, 2, 1, 1] )
+        self.assertEqual( ds.labels( order=[3, 5] ).tolist(), [2, 1, 0, 0, 1, 1] )
+        return
+
+    def test_component_labels(self):
+        edges = np.array( [[0, 1, 20, 4], [20, 4, 0, 1], [21, 0, 2, 1], [2, 1, 21, 0]], dtype=np.int32 )
+        labels = component_labels( edges, 22 )
+        self.assertEqual( len(labels), 22 )
+        self.assertEqual( labels[0], labels[20] )
+        self.assertEqual( labels[2], labels[21] )
+        self.assertEqual( len( set( labels.tolist() )), 22 - 2 )
+        return
+
+    def test_graph_components_unchanged(self):
+        s = "[(4.1,21.4),(21.4,4.1)],[(0.1,20.4),(20.4,0.1),(1.0,20.3),(20.3,1.0)]"
+        cc = Graph( parse_edges_from_str(s) ).get_connectedComponents()
+        self.assertEqual( [ c[0] for c in cc ], [4, 0] )
+        self.assertEqual( [ sorted(c) for c in cc ], [[4, 21], [0, 1, 20]] )
+        return
+
+    def test_long_chain_no_recursion_limit(self):
+        s = ",".join( "({}.0,{}.1),({}.1,{}.0)".format( i, i+1, i+1, i ) for i in range(0, 5000) )
+        cc = Graph( parse_edges_from_str(s) ).get_connectedComponents()
+        self.assertEqual( len(cc), 1 )
+        self.assertEqual( len(cc[0]), 5001 )
+        return
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+import os
+import bz2
+import gzip
+import lzma
+import tempfile
+import unittest
+
+import numpy as np
+
+from util_compressedInput import *
+from util_fullBindingSitesParser import read_file
+from util_edgeTimeline import EdgeTimeline
+from util_lineIndex import build_line_index, read_timesteps, read_last_timestep
+
+LINES = [ "[(0.1,20.4),(20.4,0.1)]",
+          "",
+          "[(1.0,21.2),(1.1,22.3),(21.2,1.0),(22.3,1.1)],[(2.1,22.0),(22.0,2.1)]" ]
+DATA = ("\n".join(LINES) + "\n").encode()
+
+COMPRESSORS = { CODEC_GZIP: gzip.compress, CODEC_BZ2: bz2.compress, CODEC_XZ: lzma.compress }
+
+class TestCompressedInput(unittest.TestCase):
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.plain = os.path.join( self.tmpDir, "full_bindingsites.data" )
+        with open(self.plain, 'wb') as f:
+            f.write( DATA )
+        self.fnames = {}
+        for codec, compress in COMPRESSORS.items():
+            fname = os.path.join( self.tmpDir, "archived.{}".format( codec ))  ## suffix does not matter
+            with open(fname, 'wb') as f:
+                f.write( compress( DATA ))
+            self.fnames[codec] = fname
+
+    def tearDown(self):
+        for fname in os.listdir( self.tmpDir ):
+            os.remove( os.path.join( self.tmpDir, fname ))
+        os.rmdir( self.tmpDir )
+
+    def check_readers(self, fname):
+        self.assertEqual( read_file( fname ), LINES )
+        expected = EdgeTimeline.from_file( self.plain )
+        actual = EdgeTimeline.from_file( fname )
+        self.assertTrue( np.array_equal( actual.edges, expected.edges ))
+        self.assertTrue( np.array_equal( actual.offsets, expected.offsets ))
+        self.assertEqual( build_line_index( fname ).tolist(), build_line_index( self.plain ).tolist() )
+        index = build_line_index( fname )
+        self.assertEqual( read_timesteps( fname, 1, None, 1, index ), LINES[1:] )
+        self.assertEqual( read_last_timestep( fname ), LINES[-1] )
+
+    def test_detect_codec(self):
+        self.assertIsNone( detect_codec( self.plain ))
+        for codec, fname in self.fnames.items():
+            self.assertEqual( detect_codec( fname ), codec )
+        return
+
+    def test_readers(self):
+        for codec, fname in self.fnames.items():
+            self.check_readers( fname )
+        return
+
+    def test_readers_stdlibOnly(self):
+        os.environ[NO_EXTERNAL_ENV] = "1"
+        try:
+            for codec, fname in self.fnames.items():
+                self.assertIsNone( find_external_decompressor( codec ))
+                self.check_readers( fname )
+        finally:
+            del os.environ[NO_EXTERNAL_ENV]
+        return
+
+    def test_close_before_end(self):
+        for codec, fname in self.fnames.items():
+            with open_input( fname, 'rb' ) as f:
+                self.assertEqual( f.read(3), DATA[:3] )
+        return
+
+    def test_glob_inputs(self):
+        gzName = self.plain + ".gz"
+        with open(gzName, 'wb') as f:
+            f.write( gzip.compress( DATA ))
+        self.assertEqual( glob_inputs( self.plain ), [self.plain] )  ## an archived copy next to the original is not a second input
+        os.remove( self.plain )
+        self.assertEqual( glob_inputs( self.plain ), [gzName] )
+        return
+
+if __name__ == "__main__":
+    unittest.main()
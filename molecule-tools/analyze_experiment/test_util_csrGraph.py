@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+
+import unittest
+
+import numpy as np
+
+from util_fullBindingSitesParser import Graph, parse_edges_from_str
+from util_edgeTimeline import EdgeTimeline
+from util_csrGraph import *
+from gen_popkinsForChains import which_singleton_type, count_numLigsBoundToIgE, initialize_histMappingDetailedSingletons
+from calc_stericHindrance import checkIfSiteXIsBound, checkIfBothSitesBound
+
+LINE = "[(21.4,1.1),(1.1,21.4)],[(0.1,20.4),(20.4,0.1),(0.0,22.3),(22.3,0.0)],[(2.0,23.1),(23.1,2.0),(2.1,24.0),(24.0,2.1),(3.0,24.2),(24.2,3.0)]"
+
+class TestCSRGraph(unittest.TestCase):
+    def setUp(self):
+        self.edges = parse_edges_from_str( LINE )
+        self.G = Graph( self.edges )
+        self.C = CSRGraph( EdgeTimeline.from_strs( [LINE] )[0] )
+
+    def test_adjDict_compatible(self):
+        self.assertEqual( list( self.C.adjDict.keys() ), list( self.G.adjDict.keys() ))
+        for m in self.G.adjDict.keys():
+            self.assertEqual( [ str(e) for e in self.C.adjDict[m] ], [ str(e) for e in self.G.adjDict[m] ] )
+            self.assertEqual( self.C.adjDict[m].bsite1.tolist(), [ e.bsite1 for e in self.G.adjDict[m] ] )
+        self.assertNotIn( 5, self.C.adjDict )
+        self.assertEqual( CSRGraph( self.edges ).vertices, self.C.vertices )  ## also built from BindingEdges
+        return
+
+    def test_analysis_functions_run_unchanged(self):
+        h = initialize_histMappingDetailedSingletons( 4 )
+        self.assertEqual( which_singleton_type( [1], self.C, h ), which_singleton_type( [1], self.G, h ))
+        for m in (0, 1, 2, 3):
+            self.assertEqual( count_numLigsBoundToIgE( m, self.C ), count_numLigsBoundToIgE( m, self.G ))
+            for site in (0, 1):
+                self.assertEqual( checkIfSiteXIsBound( m, self.C, site ), checkIfSiteXIsBound( m, self.edges, site ))
+        self.assertTrue( checkIfBothSitesBound( 0, self.C ))
+        self.assertFalse( checkIfBothSitesBound( 3, self.C ))
+        return
+
+    def test_connectedComponents(self):
+        expected = [ list(cc) for cc in self.G.get_connectedComponents() ]
+        self.assertEqual( self.C.get_connectedComponents(), expected )
+        self.assertEqual( self.C.degree( 2 ), 2 )
+        return
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from util_edgeTimeline import EdgeTimeline
+from util_edgeDeltas import *
+
+LINES = [ "[(0.1,20.4),(20.4,0.1)]",
+          "[(0.1,20.4),(20.4,0.1)]",
+          "",
+          "[(1.0,21.2),(1.1,22.3),(21.2,1.0),(22.3,1.1)],[(2.1,22.0),(22.0,2.1)]",
+          "[(2.1,22.0),(22.0,2.1)],[(1.0,21.2),(21.2,1.0)]" ]
+
+def sorted_rows(edges):
+    return sorted( tuple(row) for row in np.asarray(edges).tolist() )
+
+class TestEdgeDeltas(unittest.TestCase):
+    def setUp(self):
+        self.timeline = EdgeTimeline.from_strs( LINES )
+
+    def test_roundTrip(self):
+        for keyframeInterval in (1, 2, 1000):
+            deltas = DeltaTimeline.from_timeline( self.timeline, keyframeInterval )
+            self.assertEqual( len(deltas), len(LINES) )
+            expanded = deltas.to_timeline()
+            for t in range(0, len(LINES)):
+                self.assertEqual( sorted_rows( expanded[t] ), sorted_rows( self.timeline[t] ))
+                self.assertEqual( sorted_rows( deltas[t] ), sorted_rows( self.timeline[t] ))  ## via keyframes
+        return
+
+    def test_events(self):
+        deltas = DeltaTimeline.from_timeline( self.timeline, 2 )
+        self.assertEqual( deltas.num_events().tolist(), [2, 0, 2, 6, 2] )
+        t, removed, added = list( deltas.iter_events() )[4]
+        self.assertEqual( sorted_rows( removed ), [(1, 1, 22, 3), (22, 3, 1, 1)] )
+        self.assertEqual( len(added), 0 )
+        return
+
+    def test_save_load(self):
+        deltas = DeltaTimeline.from_timeline( self.timeline, 3 )
+        with tempfile.NamedTemporaryFile( suffix=DELTAS_SUFFIX, delete=False ) as f:
+            fname = f.name
+        try:
+            deltas.save( fname )
+            loaded = load_deltas( fname )
+        finally:
+            os.remove( fname )
+        self.assertEqual( loaded.keyframeInterval, 3 )
+        for t in range(0, len(LINES)):
+            self.assertTrue( np.array_equal( loaded[t], deltas[t] ))
+        return
+
+    def test_empty(self):
+        deltas = DeltaTimeline.from_timeline( EdgeTimeline.from_strs( ["", ""] ))
+        self.assertEqual( len(deltas), 2 )
+        self.assertEqual( deltas[1].shape, (0, 4) )
+        return
+
+if __name__ == "__main__":
+    unittest.main()
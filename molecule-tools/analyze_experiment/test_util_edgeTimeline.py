@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from util_fullBindingSitesParser import *
+from util_edgeTimeline import *
+
+LINES = [ "[(0.1,20.4),(20.4,0.1)]",
+          "",
+          "[(1.0,21.2),(1.1,22.3),(21.2,1.0),(22.3,1.1)],[(2.1,22.0),(22.0,2.1)]" ]
+
+class TestEdgeTimeline(unittest.TestCase):
+    def setUp(self):
+        with tempfile.NamedTemporaryFile( 'w', suffix='.data', delete=False ) as f:
+            f.write( "\n".join(LINES) + "\n" )
+            self.fname = f.name
+
+    def tearDown(self):
+        os.remove( self.fname )
+
+    def test_from_file_matchesBindingEdges(self):
+        T = EdgeTimeline.from_file( self.fname )
+        llist_edges = parse_edges_from_str_list( read_file(self.fname) )
+        self.assertEqual( len(T), len(llist_edges) )
+        self.assertEqual( T.num_edges().tolist(), [2, 0, 6] )
+        for t in range(0, len(T)):
+            expected = [ (e.mol1, e.bsite1, e.mol2, e.bsite2) for e in llist_edges[t] ]
+            self.assertEqual( [ tuple(row) for row in T[t].tolist() ], expected )
+        return
+
+    def test_from_edge_lists(self):
+        llist_edges = parse_edges_from_str_list( read_file(self.fname) )
+        T1 = EdgeTimeline.from_edge_lists( llist_edges )
+        T2 = EdgeTimeline.from_file( self.fname )
+        self.assertTrue( np.array_equal( T1.edges, T2.edges ))
+        self.assertTrue( np.array_equal( T1.offsets, T2.offsets ))
+        return
+
+    def test_views_are_zero_copy(self):
+        T = EdgeTimeline.from_file( self.fname )
+        self.assertTrue( np.shares_memory( T[2], T.edges ))
+        self.assertEqual( T.records(2).mol2.tolist(), [21, 22, 1, 1, 22, 2] )
+        self.assertEqual( T[-1].shape, (6, 4) )
+        return
+
+    def test_bulk_tokenizer_matches_regex_path(self):
+        T1 = EdgeTimeline.from_file( self.fname )
+        T2 = EdgeTimeline.from_strs( read_file(self.fname) )
+        T3 = EdgeTimeline.from_file( self.fname, chunkBytes=16 )  ## many small chunks
+        for T in (T2, T3):
+            self.assertTrue( np.array_equal( T1.edges, T.edges ))
+            self.assertTrue( np.array_equal( T1.offsets, T.offsets ))
+        return
+
+    def test_from_bytes(self):
+        T = EdgeTimeline.from_bytes( b"(123,4567,0,12345)\n\n(1.2,3.4)" )  ## no trailing newline
+        self.assertEqual( T.edges.tolist(), [[123, 4567, 0, 12345], [1, 2, 3, 4]] )
+        self.assertEqual( T.num_edges().tolist(), [1, 0, 1] )
+
+        T = EdgeTimeline.from_bytes( b"(1,2,3,4) 99\n" )  ## stray number: falls back to the regex parser
+        self.assertEqual( T.edges.tolist(), [[1, 2, 3, 4]] )
+        return
+
+    def test_dialect_of_first_recognizable_line(self):
+        lines = [ "[]", "(0, 20, 1, 4),(20, 0, 4, 1),", "(0, 21, 1, 2),(21, 0, 2, 1)," ]  ## graph format, empty t=0
+        with open(self.fname, 'w') as f:
+            f.write( "\n".join(lines) + "\n" )
+        T1 = EdgeTimeline.from_strs( lines )
+        T2 = EdgeTimeline.from_file( self.fname )
+        self.assertEqual( T1.num_edges().tolist(), [0, 2, 2] )
+        self.assertTrue( np.array_equal( T1.edges, T2.edges ))
+        self.assertEqual( T1[1][0].tolist(), [0, 1, 20, 4] )
+        return
+
+    def test_graph_accepts_timeline(self):
+        T = EdgeTimeline.from_file( self.fname )
+        llist_edges = parse_edges_from_str_list( read_file(self.fname) )
+        for t in range(0, len(T)):
+            ccFromTimeline = [ sorted(cc) for cc in Graph( T[t] ).get_connectedComponents() ]
+            ccFromEdges = [ sorted(cc) for cc in Graph( llist_edges[t] ).get_connectedComponents() ]
+            self.assertEqual( ccFromTimeline, ccFromEdges )
+        return
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import types
+import unittest
+
+from util_fullBindingSitesParser import *
+
+class TestUtilFullBindingSitesParser(unittest.TestCase):
+    def test_BindingEdge_commaForm(self):
+        e = BindingEdge( "(1,2,3,4)" )
+        self.assertEqual( (e.mol1, e.bsite1, e.mol2, e.bsite2), (1,2,3,4) )
+        return
+
+    def test_BindingEdge_dottedForm(self):
+        e = BindingEdge( "(10.1,22.3)" )
+        self.assertEqual( (e.mol1, e.bsite1, e.mol2, e.bsite2), (10,1,22,3) )
+        return
+
+    def test_parse_edges_from_str_sameForBothForms(self):
+        s_comma = "[(0,1,20,4),(20,4,0,1)],[(4,1,21,4),(21,4,4,1)]"
+        s_dotted = "[(0.1,20.4),(20.4,0.1)],[(4.1, 21.4),(21.4,4.1)]"
+        edges_comma = [ str(e) for e in parse_edges_from_str( s_comma ) ]
+        edges_dotted = [ str(e) for e in parse_edges_from_str( s_dotted ) ]
+        self.assertEqual( len(edges_comma), 4 )
+        self.assertEqual( edges_comma, edges_dotted )
+        return
+
+    def test_iter_edges_from_file(self):
+        lines = [ "[(0.1,20.4),(20.4,0.1)]", "", "[(1.0,21.2),(21.2,1.0)],[(2.1,22.0),(22.0,2.1)]" ]
+        with tempfile.NamedTemporaryFile( 'w', suffix='.data', delete=False ) as f:
+            f.write( "\n".join(lines) + "\n" )
+            fname = f.name
+        try:
+            lazy = iter_edges_from_file( fname )
+            self.assertIsInstance( lazy, types.GeneratorType )
+            actual = [ [str(e) for e in edges] for edges in lazy ]
+            expected = [ [str(e) for e in edges] for edges in parse_edges_from_str_list( read_file(fname) ) ]
+        finally:
+            os.remove( fname )
+        self.assertEqual( actual, expected )
+        self.assertEqual( [len(edges) for edges in actual], [2, 0, 4] )
+        return
+
+    def test_graph_dialect(self):
+        s_graph = "(0, 20, 1, 4),(20, 0, 4, 1),"  ## (mol1, mol2, b1, b2), as bindingSitesDataReader.py writes it
+        self.assertEqual( detect_dialect( s_graph ).name, DIALECT_GRAPH )
+        self.assertEqual( detect_dialect( "[(0.1,20.4)]" ).name, DIALECT_DOTTED )
+        self.assertEqual( detect_dialect( "(0,1,20,4)" ).name, DIALECT_COMMA )
+        edges = [ str(e) for e in parse_edges_from_str( s_graph, DIALECT_GRAPH ) ]
+        self.assertEqual( edges, ["(0,1,20,4)", "(20,4,0,1)"] )
+        return
+
+    def test_graph_dialect_roundTrip(self):
+        from bindingSitesDataReader import readBindingSitesData, writeBindingSitesDataAsGraphs
+        lines = [ "[(0.1,20.4),(20.4,0.1)]", "", "[(1.0,21.2),(21.2,1.0)],[(2.1,22.0),(22.0,2.1)]" ]
+        tmpDir = tempfile.mkdtemp()
+        ifname = os.path.join( tmpDir, "full_bindingsites.data" )
+        ofname = os.path.join( tmpDir, "graphs.data" )
+        with open(ifname, 'w') as f:
+            f.write( "\n".join(lines) + "\n" )
+        try:
+            writeBindingSitesDataAsGraphs( ofname, readBindingSitesData( ifname ))
+            expected = [ [str(e) for e in edges] for edges in iter_edges_from_file( ifname ) ]
+            actual = [ [str(e) for e in edges] for edges in iter_edges_from_file( ofname ) ]  ## detected as 'graph'
+        finally:
+            for fname in os.listdir( tmpDir ):
+                os.remove( os.path.join( tmpDir, fname ))
+            os.rmdir( tmpDir )
+        self.assertEqual( actual, expected )
+        return
+
+if __name__ == "__main__":
+    unittest.main()
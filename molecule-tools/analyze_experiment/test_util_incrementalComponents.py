@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+
+from util_testFixtures import gen_synthetic_file, LIGAND_FIRST_LINES, LIGAND_FIRST_ROWS, LIGAND_FIRST_ROWS_BY_RECEPTOR
+from util_edgeTimeline import EdgeTimeline
+from util_edgeDeltas import DeltaTimeline
+from util_fullBindingSitesParser import Graph
+from util_incrementalComponents import *
+from gen_popkinsForChains import iter_histograms_incremental, iter_histograms_perTimestep, histogramToString, \
+    SINGLETONS_BY_RECEPTOR
+
+class TestIncrementalComponents(unittest.TestCase):
+    def setUp(self):
+        with tempfile.NamedTemporaryFile( suffix='.data', delete=False ) as f:
+            self.fname = f.name
+        gen_synthetic_file( self.fname, numTimesteps=400, numRecs=6, numLigs=6, seed=3 )
+        self.timeline = EdgeTimeline.from_file( self.fname )
+
+    def tearDown(self):
+        os.remove( self.fname )
+
+    def test_matches_recomputed_components(self):
+        tracker = IncrementalComponents( 12 )
+        for t, removed, added in DeltaTimeline.from_timeline( self.timeline ).iter_event_lists():
+            tracker.apply( removed, added )
+            expected = sorted( sorted(cc) for cc in Graph( self.timeline[t] ).get_connectedComponents() )
+            actual = sorted( sorted(cc) for cc in tracker.components() )
+            self.assertEqual( actual, expected )
+        return
+
+    def test_apply_reports_touched_components(self):
+        tracker = IncrementalComponents( 4 )
+        vanished, appeared = tracker.apply( [], [(0, 0, 2, 1), (2, 1, 0, 0), (1, 0, 3, 0), (3, 0, 1, 0)] )
+        self.assertEqual( vanished, [] )
+        self.assertEqual( sorted( sorted(cc) for cc in appeared ), [[0, 2], [1, 3]] )
+        vanished, appeared = tracker.apply( [], [(0, 1, 3, 1), (3, 1, 0, 1)] )  ## merge
+        self.assertEqual( sorted( sorted(cc) for cc in vanished ), [[0, 2], [1, 3]] )
+        self.assertEqual( [ sorted(cc) for cc in appeared ], [[0, 1, 2, 3]] )
+        vanished, appeared = tracker.apply( [(1, 0, 3, 0), (3, 0, 1, 0)], [] )  ## 1 leaves
+        self.assertEqual( [ sorted(cc) for cc in appeared ], [[0, 2, 3]] )
+        self.assertIsNone( tracker.component_of( 1 ))
+        return
+
+    def test_popkins_histograms_match(self):
+        incremental = [ histogramToString( h, 6 ) for h in iter_histograms_incremental( self.timeline, 6, 6 ) ]
+        perTimestep = [ histogramToString( h, 6 ) for h in iter_histograms_perTimestep( self.timeline, 6, 6 ) ]
+        self.assertEqual( incremental, perTimestep )
+        return
+
+    def test_histograms_are_not_shared(self):
+        histograms = list( iter_histograms_incremental( self.timeline, 6, 6 ))
+        self.assertEqual( [ histogramToString( h, 6 ) for h in histograms ],
+                          [ histogramToString( h, 6 ) for h in iter_histograms_perTimestep( self.timeline, 6, 6 ) ] )
+        return
+
+    def test_ligand_first_singletons(self):
+        timeline = EdgeTimeline.from_strs( LIGAND_FIRST_LINES )
+        rows = lambda histograms: [ [ int(x) for x in histogramToString( h, 20 ).split(',')[:6] ] for h in histograms ]
+        self.assertEqual( rows( iter_histograms_incremental( timeline, 20, 20 )), LIGAND_FIRST_ROWS )
+        self.assertEqual( rows( iter_histograms_perTimestep( timeline, 20, 20 )), LIGAND_FIRST_ROWS )
+        self.assertEqual( rows( iter_histograms_incremental( timeline, 20, 20, singletonTyping=SINGLETONS_BY_RECEPTOR )),
+                          LIGAND_FIRST_ROWS_BY_RECEPTOR )
+        self.assertEqual( rows( iter_histograms_perTimestep( timeline, 20, 20, SINGLETONS_BY_RECEPTOR )), LIGAND_FIRST_ROWS_BY_RECEPTOR )
+        return
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from util_intCsv import *
+
+class TestIntCsv(unittest.TestCase):
+    def assertSameAsSavetxt(self, A):
+        f = io.BytesIO()
+        np.savetxt( f, A, fmt="%i", delimiter=',' )
+        self.assertEqual( format_int_csv( A ), f.getvalue() )
+
+    def test_matches_savetxt(self):
+        rng = np.random.default_rng( 1 )
+        self.assertSameAsSavetxt( rng.integers( 0, 100000, (500, 7) ))
+        self.assertSameAsSavetxt( np.array( [[0, 9, 10, 99, 100, 1000]] ))
+        self.assertSameAsSavetxt( np.zeros( (4, 1), dtype=np.int32 ))
+        self.assertSameAsSavetxt( np.array( [[-3, 4], [5, -60]] ))  ## falls back to str()
+        return
+
+    def test_blocks(self):
+        rng = np.random.default_rng( 2 )
+        A = rng.integers( 0, 1000, (10, 3) )
+        A[7, 1] = -5  ## only its block falls back to str()
+        f = io.BytesIO()
+        np.savetxt( f, A, fmt="%i", delimiter=',' )
+        self.assertEqual( format_int_csv( A, blockRows=3 ), f.getvalue() )
+        with tempfile.TemporaryDirectory() as tmpDir:
+            M = np.lib.format.open_memmap( os.path.join( tmpDir, "A.npy" ), mode='w+', dtype=np.int32, shape=A.shape )
+            M[...] = A
+            fname = write_int_csv( os.path.join( tmpDir, "A.csv" ), M, blockRows=4 )
+            with open(fname, 'rb') as csvFile:
+                self.assertEqual( csvFile.read(), f.getvalue() )
+            del M
+        return
+
+    def test_column_vector(self):
+        self.assertEqual( format_int_csv( np.array( [3, 12] )), b"3\n12\n" )
+        return
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+import io
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from util_lineIndex import *
+from util_fullBindingSitesParser import BindingEdge
+
+class TestLineIndex(unittest.TestCase):
+    def setUp(self):
+        self.lines = [ "[(0.1,20.4),(20.4,0.1)]", "", "[(1.0,21.2),(21.2,1.0)]", "[(2.1,22.0),(22.0,2.1)]" ]
+        with tempfile.NamedTemporaryFile( 'w', suffix='.data', delete=False ) as f:
+            f.write( "\n".join(self.lines) + "\n" )
+            self.fname = f.name
+
+    def tearDown(self):
+        for fname in [ self.fname ] + list( get_index_paths(self.fname) ):
+            if os.path.exists( fname ):
+                os.remove( fname )
+
+    def test_build_line_index(self):
+        index = build_line_index( self.fname )
+        self.assertEqual( len(index), len(self.lines) + 1 )
+        self.assertEqual( index[-1], os.path.getsize( self.fname ))
+        self.assertEqual( count_timesteps( self.fname ), len(self.lines) )
+        with open(self.fname, 'rb') as f:
+            data = f.read()
+        for d in (data, data.rstrip(b'\n'), b""):
+            self.assertEqual( build_line_index_of_stream( io.BytesIO( d ), chunkBytes=7 ).tolist(),
+                              build_line_index_of_bytes( d ).tolist() )
+        return
+
+    def test_read_timesteps_matches_slicing(self):
+        for (start, stop, step) in [ (0, None, 1), (1, 3, 1), (0, None, 2), (-1, None, 1), (3, 0, -1) ]:
+            expected = self.lines[ start:stop:step ]
+            self.assertEqual( read_timesteps( self.fname, start, stop, step ), expected )
+        return
+
+    def test_iter_timestep_edges_keeps_timestep_labels(self):
+        labels = [ t for t, edges in iter_timestep_edges( self.fname, 1, None, 2 ) ]
+        self.assertEqual( labels, [1, 3] )
+        return
+
+    def test_iter_timestep_edges_detects_dialect_of_file(self):
+        with open(self.fname, 'w') as f:
+            f.write( "[]\n(0, 20, 1, 4),(20, 0, 4, 1),\n" )  ## graph format
+        edges = [ [ str(e) for e in edges ] for t, edges in iter_timestep_edges( self.fname ) ]
+        self.assertEqual( edges, [ [], [ str( BindingEdge( "(0,1,20,4)" )), str( BindingEdge( "(20,4,0,1)" )) ] ] )
+        return
+
+    def test_read_last_timestep(self):
+        self.assertEqual( read_last_timestep( self.fname ), self.lines[-1] )
+        return
+
+    def test_index_saved_in_cache_dir(self):
+        index = load_line_index( self.fname )
+        indexPath, metaPath = get_index_paths( self.fname )
+        self.assertTrue( os.path.exists( indexPath ) and os.path.exists( metaPath ))
+        self.assertEqual( os.listdir( os.path.dirname( self.fname )).count( os.path.basename( self.fname ) + INDEX_SUFFIX + ".npy" ), 0 )
+        self.assertTrue( np.array_equal( load_line_index( self.fname ), index ))
+        return
+
+if __name__ == "__main__":
+    unittest.main()
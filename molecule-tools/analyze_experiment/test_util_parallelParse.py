@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from util_edgeTimeline import EdgeTimeline
+from util_parallelParse import *
+
+LINES = [ "[(0.1,20.4),(20.4,0.1)]",
+          "",
+          "[(1.0,21.2),(1.1,22.3),(21.2,1.0),(22.3,1.1)],[(2.1,22.0),(22.0,2.1)]",
+          "",
+          "[(3.0,23.1),(23.1,3.0)]" ]
+
+class TestParallelParse(unittest.TestCase):
+    def setUp(self):
+        with tempfile.NamedTemporaryFile( 'w', suffix='.data', delete=False ) as f:
+            f.write( "\n".join(LINES) + "\n" )
+            self.fname = f.name
+
+    def tearDown(self):
+        os.remove( self.fname )
+
+    def test_split_at_newlines(self):
+        buf = b"a\nbb\nccc\n"
+        self.assertEqual( split_at_newlines( buf, 5 ), [(0, 2), (2, 5), (5, 9)] )
+        self.assertEqual( split_at_newlines( b"abc", 3 ), [(0, 3)] )
+        return
+
+    def test_matches_serial(self):
+        expected = EdgeTimeline.from_file( self.fname )
+        for numWorkers in (1, 2, 3):
+            actual = parse_file_parallel( self.fname, numWorkers, minBytesPerWorker=1 )
+            self.assertTrue( np.array_equal( actual.edges, expected.edges ))
+            self.assertTrue( np.array_equal( actual.offsets, expected.offsets ))
+        return
+
+if __name__ == "__main__":
+    unittest.main()
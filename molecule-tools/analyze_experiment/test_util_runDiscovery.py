@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+import gzip
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from util_runDiscovery import *
+
+class TestRunDiscovery(unittest.TestCase):
+    def setUp(self):
+        self.tmpDir = tempfile.TemporaryDirectory()
+        self.expDir = self.tmpDir.name
+        for runID in (10, 2, 1, 9):
+            os.mkdir( os.path.join( self.expDir, "my_exp_{}".format( runID )))
+            with open( os.path.join( self.expDir, "my_exp_{}".format( runID ), "run.csv" ), 'w' ) as f:
+                f.write( "{}\n".format( runID ))
+        with gzip.open( os.path.join( self.expDir, "my_exp_2", "run.csv.gz" ), 'wt' ) as f:
+            f.write( "2\n" )  ## a compressed copy of run 2: only the plain file is used
+        os.mkdir( os.path.join( self.expDir, "other_3" ))
+        with gzip.open( os.path.join( self.expDir, "other_3", "run.csv.gz" ), 'wt' ) as f:
+            f.write( "3\n" )
+        os.mkdir( os.path.join( self.expDir, "notARun" ))
+        with open( os.path.join( self.expDir, "notARun", "run.csv" ), 'w' ) as f:
+            f.write( "0\n" )
+
+    def tearDown(self):
+        self.tmpDir.cleanup()
+
+    def test_parse_run_dir(self):
+        self.assertEqual( parse_run_dir( "my100GrpTwo20R10L10M_12" ), ("my100GrpTwo20R10L10M", 12) )
+        self.assertEqual( parse_run_dir( "/a/b/exp_3/" ), ("exp", 3) )
+        self.assertIsNone( parse_run_dir( "exp_3b" ))
+        self.assertIsNone( parse_run_dir( "exp" ))
+        self.assertEqual( run_of_path( "/a/exp_4/sub/full_bindingsites.data", "/a" ), ("exp", 4) )
+        self.assertIsNone( run_of_path( "/a/exp_4/sub/full_bindingsites.data", "/a/exp_4" ))  ## only the directory under root
+        self.assertIsNone( run_of_path( "/a/exp_4/full_bindingsites.data", "/a/exp_4" ))
+        self.assertEqual( run_of_path( "exp_5/run.csv", "" ), ("exp", 5) )
+        self.assertEqual( glob_root( "/data/exp_3/*/full_bindingsites.data" ), "/data/exp_3" )
+        self.assertEqual( glob_root( "**/run.csv" ), "" )
+        self.assertEqual( glob_root( "/*/run.csv" ), os.sep )
+        return
+
+    def test_root_named_like_a_run(self):
+        expDir = os.path.join( self.expDir, "exp_3" )
+        for name in ("exp_2", "notARun"):
+            os.makedirs( os.path.join( expDir, name ))
+            with open( os.path.join( expDir, name, "run.csv" ), 'w' ) as f:
+                f.write( "0\n" )
+        runs = [ (runID, os.path.relpath( f, expDir )) for runID, f in find_runs( os.path.join( expDir, '*', "run.csv" )) ]
+        self.assertEqual( runs, [ (2, os.path.join( "exp_2", "run.csv" )), (None, os.path.join( "notARun", "run.csv" )) ] )
+        return
+
+    def test_find_runs_sorts_numerically(self):
+        runs = [ (runID, os.path.relpath( f, self.expDir )) for runID, f in find_runs( os.path.join( self.expDir, '*', "run.csv" )) ]
+        self.assertEqual( runs, [ (1, os.path.join( "my_exp_1", "run.csv" )),
+                                  (2, os.path.join( "my_exp_2", "run.csv" )),
+                                  (3, os.path.join( "other_3", "run.csv.gz" )),
+                                  (9, os.path.join( "my_exp_9", "run.csv" )),
+                                  (10, os.path.join( "my_exp_10", "run.csv" )),
+                                  (None, os.path.join( "notARun", "run.csv" )) ] )
+        runIDs = [ runID for runID, f in find_runs( os.path.join( self.expDir, '*', "run.csv" ), expName="my_exp" ) ]
+        self.assertEqual( runIDs, [1, 2, 9, 10] )
+        return
+
+    def test_concurrent_loading_keeps_run_order(self):
+        fnames = [ f for runID, f in find_runs( os.path.join( self.expDir, '*', "run.csv" ), expName="my_exp" ) ]
+        def loader(fname):
+            with open(fname) as f:
+                value = int( f.read() )
+            time.sleep( 0.01 * (value % 3) )  ## finish out of order
+            return value
+        self.assertEqual( list( iter_loaded_runs( fnames, loader, numWorkers=3, maxPending=2 )), [1, 2, 9, 10] )
+
+        M = np.zeros( (1, len(fnames)) )
+        threadNames = set()
+        def store(slot, value):
+            threadNames.add( threading.current_thread().name )
+            M[0, slot] = value
+        load_runs_into( fnames, loader, store, numWorkers=3 )
+        self.assertEqual( M[0].tolist(), [1, 2, 9, 10] )
+        self.assertNotIn( threading.main_thread().name, threadNames )
+        with self.assertRaises( ValueError ):
+            load_runs_into( fnames + [ fnames[0] + ".missing" ], lambda f: int( "x" ), store, numWorkers=2 )
+        return
+
+if __name__ == "__main__":
+    unittest.main()
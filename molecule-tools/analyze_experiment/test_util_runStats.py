@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from util_runStats import *
+
+class TestRunStats(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng( 3 )
+        self.runs = [ rng.integers( 0, 40, (50, 2) ) for i in range(7) ]
+
+    def accumulate(self, runs):
+        return self.accumulate_named( runs, ['a', 'b'], numBins=64 )  ## values below 40: exact quantiles
+
+    def accumulate_named(self, runs, names, numBins=DEFAULT_NUM_BINS):
+        stats = RunStats( runs[0].shape[0] if runs else 50, names, numBins )
+        for series in runs:
+            stats.add_run( series )
+        return stats
+
+    def test_moments_and_quantiles_match_numpy(self):
+        stats = self.accumulate( self.runs )
+        cube = np.stack( self.runs )  ## runs x timesteps x series
+        self.assertEqual( stats.n, 7 )
+        self.assertTrue( np.allclose( stats.mean, cube.mean( axis=0 ).T ))
+        self.assertTrue( np.allclose( stats.variance(), cube.var( axis=0, ddof=1 ).T ))
+        for q in (0.0, 0.05, 0.5, 0.95, 1.0):
+            self.assertEqual( stats.quantile( q ).tolist(), np.quantile( cube, q, axis=0, method='lower' ).T.tolist() )
+        summary = stats.summary( 'b', quantiles=(0.5,) )
+        self.assertEqual( summary.shape, (50, 3) )
+        self.assertTrue( np.allclose( summary[:, 1], cube[:, :, 1].std( axis=0, ddof=1 )))
+        return
+
+    def test_merge_equals_one_pass(self):
+        merged = merge_run_stats( [ self.accumulate( self.runs[:3] ), self.accumulate( self.runs[3:] ), self.accumulate( [] ) ] )
+        whole = self.accumulate( self.runs )
+        self.assertEqual( merged.n, whole.n )
+        self.assertTrue( np.allclose( merged.mean, whole.mean ))
+        self.assertTrue( np.allclose( merged.m2, whole.m2 ))
+        self.assertTrue( np.array_equal( merged.hist, whole.hist ))
+        with self.assertRaises( ValueError ):
+            merged.merge( RunStats( 50, ['a'] ))
+        return
+
+    def test_short_run_padded_and_bins_coarsened(self):
+        stats = RunStats( 4, ['a'], numBins=8 )
+        stats.add_run( np.array( [ [1], [2] ] ))
+        stats.add_run( np.array( [ [100], [100], [100], [100] ] ))
+        self.assertEqual( stats.mean[0].tolist(), [50.5, 51.0, 51.0, 51.0] )
+        self.assertEqual( (stats.numBins, stats.binWidth.tolist(), stats.hist.shape), (8, [[16, 16, 16, 16]], (1, 4, 8)) )
+        self.assertEqual( stats.quantile( 1.0 )[0].tolist(), [96, 96, 96, 96] )  ## lower edge of the bin of 100
+        self.assertEqual( stats.quantile( 0.0 )[0].tolist(), [0, 0, 0, 0] )
+        self.assertTrue( np.isnan( RunStats( 4, ['a'] ).std() ).all() )
+        with self.assertRaises( ValueError ):
+            stats.add_run( np.zeros( (5, 1) ))
+        with self.assertRaises( ValueError ):
+            stats.add_run( np.array( [ [-1] ] ))
+        return
+
+    def test_values_past_the_bins(self):
+        runs = [ np.full( (3, 1), v ) for v in range(70, 111) ]
+        cube = np.stack( runs )
+        exact = [ np.quantile( cube, q, axis=0, method='lower' ).T.tolist() for q in DEFAULT_QUANTILES ]
+        self.assertEqual( [ x[0][0] for x in exact ], [72, 90, 108] )
+
+        stats = self.accumulate_named( runs, ['a'], numBins=128 )  ## every value below numBins: exact
+        self.assertEqual( [ stats.quantile( q ).tolist() for q in DEFAULT_QUANTILES ], exact )
+
+        stats = self.accumulate_named( runs, ['a'] )  ## 32 bins of width 4
+        self.assertEqual( (stats.hist.shape[-1], stats.binWidth.tolist()), (DEFAULT_NUM_BINS, [[4, 4, 4]]) )
+        for q, e in zip( DEFAULT_QUANTILES, exact ):
+            error = np.asarray( e ) - stats.quantile( q )
+            self.assertTrue( ((0 <= error) & (error < stats.binWidth)).all() )
+        self.assertEqual( stats.summary( 'a' )[0, 2:].tolist(), [72, 88, 108] )
+
+        ## runs of small values (width 1) merge with runs of large ones (width 4)
+        merged = merge_run_stats( [ self.accumulate_named( [ np.full( (3, 1), 5 ) ], ['a'] ),
+                                    self.accumulate_named( runs, ['a'] ) ] )
+        whole = self.accumulate_named( [ np.full( (3, 1), 5 ) ] + runs, ['a'] )
+        self.assertEqual( merged.binWidth.tolist(), whole.binWidth.tolist() )
+        self.assertTrue( np.array_equal( merged.hist, whole.hist ))
+        with self.assertRaises( ValueError ):
+            merged.merge( RunStats( 3, ['a'], numBins=16 ))
+        return
+
+    def test_bin_width_per_series_and_timestep(self):
+        stats = RunStats( 2, ['small', 'large'] )
+        for v in range(0, 10):
+            stats.add_run( np.array( [ [v, 3*v], [v, 100 + v] ] ))
+        self.assertEqual( stats.binWidth.tolist(), [ [1, 1], [1, 4] ] )
+        self.assertEqual( stats.summary( 'small' )[:, 3].tolist(), [4, 4] )  ## exact
+        self.assertEqual( stats.summary( 'large' )[:, 3].tolist(), [12, 104] )  ## 12 and 104 - 0
+        return
+
+    def test_counts_widen_past_uint16(self):
+        stats = RunStats( 1, ['a'], numBins=4 )
+        stats.add_run( np.array( [ [1] ] ))
+        stats.hist[0, 0, 1] = np.iinfo( np.uint16 ).max
+        stats.n = int( np.iinfo( np.uint16 ).max )
+        stats.add_run( np.array( [ [1] ] ))
+        self.assertEqual( stats.hist.dtype, np.uint32 )
+        self.assertEqual( int( stats.hist[0, 0, 1] ), np.iinfo( np.uint16 ).max + 1 )
+        return
+
+    def test_pop_bins_arg(self):
+        self.assertEqual( pop_bins_arg( [ "prog", "--bins=64", "exp" ] ), (64, [ "prog", "exp" ]) )
+        self.assertEqual( pop_bins_arg( [ "prog" ] ), (DEFAULT_NUM_BINS, [ "prog" ]) )
+        return
+
+    def test_save_load(self):
+        stats = self.accumulate( self.runs )
+        with tempfile.TemporaryDirectory() as d:
+            fname = os.path.join( d, "stats.npz" )
+            save_run_stats( fname, stats )
+            loaded = load_run_stats( fname )
+        self.assertEqual( (loaded.names, loaded.n, loaded.binWidth.tolist()), (stats.names, stats.n, stats.binWidth.tolist()) )
+        self.assertTrue( np.array_equal( loaded.summary( 'a' ), stats.summary( 'a' ), equal_nan=True ))
+        return
+
+if __name__ == "__main__":
+    unittest.main()
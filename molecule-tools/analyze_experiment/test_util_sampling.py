@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+import gzip
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from util_sampling import *
+from util_lineIndex import get_index_paths
+from util_edgeTimeline import EdgeTimeline
+
+class TestSampling(unittest.TestCase):
+    def setUp(self):
+        self.lines = [ "[(0.1,20.4),(20.4,0.1)]", "", "[(1.0,21.2),(21.2,1.0)]",
+                       "[(2.1,22.0),(22.0,2.1),(1.0,21.2),(21.2,1.0)]", "[(3.1,23.0),(23.0,3.1)]" ]
+        with tempfile.NamedTemporaryFile( 'w', suffix='.data', delete=False ) as f:
+            f.write( "\n".join(self.lines) + "\n" )
+            self.fname = f.name
+
+    def tearDown(self):
+        for fname in [ self.fname ] + list( get_index_paths(self.fname) ):
+            if os.path.exists( fname ):
+                os.remove( fname )
+
+    def test_parse_sampling(self):
+        s = parse_sampling( "window:10:,stride:5,average:3" )
+        self.assertEqual( (s.start, s.stop, s.stride, s.average), (10, None, 5, 3) )
+        self.assertEqual( list( s.timesteps( 30 )), [10, 15, 20, 25] )
+        for spec in [ "stride:0", "stride", "window:1", "every:2", "average:x" ]:
+            with self.assertRaises( ValueError ):
+                parse_sampling( spec )
+        return
+
+    def test_pop_sampling_arg(self):
+        sampling, argv = pop_sampling_arg( [ "prog", "in.data", "--sample=stride:2", "out.csv" ] )
+        self.assertEqual( sampling.stride, 2 )
+        self.assertEqual( argv, [ "prog", "in.data", "out.csv" ] )
+        self.assertEqual( pop_sampling_arg( [ "prog" ] ), (None, [ "prog" ]) )
+        return
+
+    def test_sampled_timeline_matches_full_timeline(self):
+        full = EdgeTimeline.from_strs( self.lines )
+        for spec in [ "stride:2", "window:1:4", "window:3:,stride:1", "window:5:" ]:
+            timeline, timesteps = load_sampled_timeline( self.fname, parse_sampling( spec ))
+            self.assertEqual( len(timeline), len(timesteps) )
+            for i, t in enumerate( timesteps.tolist() ):
+                self.assertEqual( np.asarray( timeline.edges[ timeline.offsets[i] : timeline.offsets[i+1] ] ).tolist(),
+                                  np.asarray( full.edges[ full.offsets[t] : full.offsets[t+1] ] ).tolist() )
+        return
+
+    def test_sampled_timeline_of_compressed_file(self):
+        gzName = self.fname + ".gz"
+        with gzip.open( gzName, 'wt' ) as f:
+            f.write( "\n".join(self.lines) + "\n" )
+        try:
+            for spec in [ "stride:2", "window:1:3", "window:5:" ]:
+                expected, expectedTimesteps = load_sampled_timeline( self.fname, parse_sampling( spec ))
+                timeline, timesteps = load_sampled_timeline( gzName, parse_sampling( spec ))
+                self.assertEqual( timesteps.tolist(), expectedTimesteps.tolist() )
+                self.assertEqual( np.asarray( timeline.edges ).tolist(), np.asarray( expected.edges ).tolist() )
+                self.assertEqual( np.asarray( timeline.offsets ).tolist(), np.asarray( expected.offsets ).tolist() )
+        finally:
+            for fname in [ gzName ] + list( get_index_paths( gzName )):
+                if os.path.exists( fname ):
+                    os.remove( fname )
+        return
+
+    def test_reduce_averages_groups(self):
+        rows = np.array( [ [0, 2], [2, 4], [4, 6], [7, 9] ] )
+        averaged, labels = Sampling( stride=10, average=3 ).reduce( rows, [ 0, 10, 20, 30 ] )
+        self.assertEqual( averaged.tolist(), [ [2.0, 4.0], [7.0, 9.0] ] )  ## the last group has one row
+        self.assertEqual( labels.tolist(), [0, 30] )
+        same, labels = Sampling( stride=10 ).reduce( rows, [ 0, 10, 20, 30 ] )
+        self.assertIs( same, rows )
+        return
+
+    def test_format_labelled_rows(self):
+        self.assertEqual( format_labelled_rows( [0, 10], np.array( [ [1, 2], [3, 4] ] )), "0,1,2\n10,3,4\n" )
+        self.assertEqual( format_labelled_rows( [0], np.array( [ [1.5, 2.0] ] ), separator=', ' ), "0, 1.5, 2\n" )
+        return
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from util_testFixtures import gen_synthetic_file
+from util_edgeTimeline import EdgeTimeline
+from util_csrGraph import CSRGraph
+from util_siteOccupancy import *
+from calc_stericHindrance import populate_stericHindranceTable, bindEventTable_of_timestep, update_grand_table
+from calc_bindsites_stats import gen_finalReport2Valency, SingleStateCountReport2Valency, MOLTYPE_MB4N
+
+class TestSiteOccupancy(unittest.TestCase):
+    def setUp(self):
+        self.tmpDir = tempfile.TemporaryDirectory()
+        self.fname = os.path.join( self.tmpDir.name, 'full_bindingsites.data' )
+        gen_synthetic_file( self.fname, numTimesteps=300, numRecs=20, numLigs=20, seed=4 )
+        self.timeline = EdgeTimeline.from_file( self.fname )
+
+    def tearDown(self):
+        self.tmpDir.cleanup()
+
+    def test_matches_site_masks(self):
+        occupancy = build_occupancy( self.timeline, 40, blockTimesteps=64 )
+        self.assertEqual( occupancy.shape, (300, 40) )
+        for t in range(0, len(self.timeline)):
+            G = CSRGraph( self.timeline[t], 40 )
+            self.assertEqual( occupancy[t].tolist(), G.siteMask.tolist() )
+            self.assertEqual( num_sites_bound( occupancy[t] ).tolist(), [ G.degree(m) for m in range(0, 40) ] )
+        self.assertTrue( np.array_equal( all_sites_bound( occupancy, (0, 1) ), site_bound( occupancy, 0 ) & site_bound( occupancy, 1 )))
+        return
+
+    def test_memmapped_runs(self):
+        ofname = os.path.join( self.tmpDir.name, 'runs.occupancy.npy' )
+        runs = open_occupancy_file( ofname, (2, len(self.timeline), 40) )
+        build_occupancy( self.timeline, out=runs[1] )
+        runs.flush()
+        loaded = load_occupancy( ofname )
+        self.assertIsInstance( loaded, np.memmap )
+        self.assertFalse( loaded[0].any() )
+        self.assertTrue( np.array_equal( loaded[1], build_occupancy( self.timeline, 40 )))
+        return
+
+    def test_steric_table_unchanged(self):
+        startIdxList = [0, 20, 30]
+        expected = {}
+        for t in range(0, len(self.timeline)):
+            update_grand_table( expected, bindEventTable_of_timestep( self.timeline[t], 20, startIdxList ))
+        actual = populate_stericHindranceTable( None, self.timeline, 20, startIdxList )
+        self.assertEqual( actual, expected )
+        return
+
+    def test_steric_table_order(self):
+        ## by first timestep, site keys before "both" keys, then by lowest ligand ID and site
+        timeline = EdgeTimeline.from_strs( [ "[(0.0,31.1),(31.1,0.0),(1.0,22.1),(22.1,1.0)]",
+                                             "[(2.0,22.0),(22.0,2.0),(1.0,22.1),(22.1,1.0),(3.0,31.0),(31.0,3.0)]" ] )
+        actual = populate_stericHindranceTable( None, timeline, 20, [0, 20, 30] )
+        self.assertEqual( list( actual.items() ), [ ((1, 1), 2), ((2, 1), 1), ((1, 0), 1), ((2, 0), 1), ((1, "both"), 1) ] )
+        return
+
+    def test_bindsites_report_unchanged(self):
+        ofname = os.path.join( self.tmpDir.name, 'bs.csv' )
+        gen_finalReport2Valency( self.fname, ofname, MOLTYPE_MB4N, 20, 20, self.timeline )
+        with open(ofname) as f:
+            actual = f.read()
+        expected = "".join( str( SingleStateCountReport2Valency( MOLTYPE_MB4N, 20, 20, edges )) for edges in self.timeline )
+        self.assertEqual( actual, expected )
+        return
+
+if __name__ == "__main__":
+    unittest.main()
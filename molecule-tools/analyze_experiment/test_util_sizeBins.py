@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+import io
+import unittest
+from contextlib import redirect_stderr
+
+import numpy as np
+
+from util_sizeBins import *
+
+class TestSizeBins(unittest.TestCase):
+    def test_parse_bin_spec(self):
+        self.assertEqual( parse_bin_spec( "2,3,6-9,10+" ),
+                          [ ('2mer', 4, 5), ('3mer', 5, 6), ('6-9mer', 8, 12), ('10+mer', 12, None) ] )
+        self.assertEqual( parse_bin_spec( "1, 1-2=small" ), [ ('1mer', 1, 4), ('small', 1, 5) ] )
+        for bad in ("x", "5-3", "0"):
+            with self.assertRaises( ValueError ):
+                parse_bin_spec( bad )
+        return
+
+    def test_default_spec_is_previous_layout(self):
+        self.assertEqual( classes_of_bin_specs( DEFAULT_BIN_SPEC ),
+                          BASE_CLASSES + [ ('2mer', 4, 5), ('3mer', 5, 6), ('4mer', 6, 7), ('5mer', 7, 8), ('6mer', 8, 12) ] )
+        return
+
+    def test_several_binnings_in_one_pass(self):
+        rng = np.random.default_rng( 3 )
+        matrix = rng.integers( 0, 10, (50, 22) )  ## 20 receptors: Free, A, B, AB, 2mer..19mer
+        classes = classes_of_bin_specs( "2,3,4,5,6-9,10+;2-4,5+" )
+        self.assertEqual( len(classes), len(BASE_CLASSES) + 6 + 2 )
+        binned = bin_columns( matrix, classes )
+        for c, (name, startCol, stopCol) in enumerate(classes):
+            self.assertEqual( binned[:, c].tolist(), matrix[:, startCol:stopCol].sum( axis=1 ).tolist() )
+        ## the bins of one spec plus the base classes cover every receptor
+        self.assertEqual( binned[:, :len(BASE_CLASSES) + 6].sum( axis=1 ).tolist(), matrix.sum( axis=1 ).tolist() )
+        with self.assertRaises( ValueError ):
+            classes_of_bin_specs( "2-3=x;4=x" )
+        return
+
+    def test_bins_past_the_last_column(self):
+        matrix = np.arange( 20 ).reshape( 2, 10 )  ## 8 receptors: Free, A, B, AB, 2mer..7mer
+        with self.assertRaises( ValueError ) as cm:
+            bin_columns( matrix, classes_of_bin_specs( "2,90" ))
+        self.assertIn( "'90mer'", str(cm.exception) )
+        self.assertIn( "10 columns", str(cm.exception) )
+
+        err = io.StringIO()
+        with redirect_stderr( err ):
+            binned = bin_columns( matrix, classes_of_bin_specs( "6-90" ))
+        self.assertIn( "'6-90mer'", err.getvalue() )
+        self.assertEqual( binned[:, -1].tolist(), matrix[:, 8:].sum( axis=1 ).tolist() )
+        return
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+import os
+import glob
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from util_timelineCache import *
+
+class TestTimelineCache(unittest.TestCase):
+    def setUp(self):
+        self.tmpDir = tempfile.mkdtemp()
+        self.fname = os.path.join( self.tmpDir, "full_bindingsites.data" )
+        self.write_data( ["[(0.1,20.4),(20.4,0.1)]", "[(1.0,21.2),(21.2,1.0)]"] )
+        self.savedCacheDir = os.environ.get( CACHE_DIR_ENV )
+        self.defaultCacheDir = os.path.join( self.tmpDir, "defaultCache" )
+        os.environ[ CACHE_DIR_ENV ] = self.defaultCacheDir
+
+    def tearDown(self):
+        if self.savedCacheDir is None:
+            del os.environ[ CACHE_DIR_ENV ]
+        else:
+            os.environ[ CACHE_DIR_ENV ] = self.savedCacheDir
+        shutil.rmtree( self.tmpDir )
+
+    def write_data(self, lines):
+        with open(self.fname, 'w') as f:
+            f.write( "\n".join(lines) + "\n" )
+
+    def test_miss_then_hit(self):
+        T1 = load_timeline( self.fname )
+        self.assertTrue( os.path.exists( get_cache_base( self.fname ) + ".meta.json" ))
+        self.assertEqual( sorted( os.listdir( self.tmpDir )), [ "defaultCache", "full_bindingsites.data" ] )  ## no sidecar files
+        T2 = load_timeline( self.fname )
+        self.assertIsInstance( T2.edges, np.memmap )
+        self.assertTrue( np.array_equal( T1.edges, T2.edges ))
+        self.assertTrue( np.array_equal( T1.offsets, T2.offsets ))
+        return
+
+    def test_touch_keeps_entry_but_new_content_invalidates(self):
+        load_timeline( self.fname )
+        st = os.stat( self.fname )
+        os.utime( self.fname, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9) )
+        self.assertIsInstance( load_timeline( self.fname ).edges, np.memmap )
+
+        self.write_data( ["[(0.1,20.4),(20.4,0.1)]", "[(2.0,21.2),(21.2,2.0)]"] )  ## same size
+        os.utime( self.fname, ns=(st.st_atime_ns, st.st_mtime_ns + 2*10**9) )
+        T = load_timeline( self.fname )
+        self.assertEqual( T[1][0].tolist(), [2, 0, 21, 2] )
+        return
+
+    def test_cacheDir_and_lru_eviction(self):
+        cacheDir = os.path.join( self.tmpDir, "cache" )
+        load_timeline( self.fname, cacheDir=cacheDir )
+        entries = glob.glob( os.path.join( cacheDir, "*.meta.json" ))
+        self.assertEqual( len(entries), 1 )
+        self.assertFalse( os.path.exists( self.defaultCacheDir ))
+
+        fname2 = os.path.join( self.tmpDir, "other.data" )
+        shutil.copy( self.fname, fname2 )
+        load_timeline( fname2, cacheDir=cacheDir )
+        metaPaths = glob.glob( os.path.join( cacheDir, "*.meta.json" ))
+        self.assertEqual( len(metaPaths), 2 )
+
+        ## make the entry of fname2 the least recently used one, then shrink the cap below the total.
+        for metaPath in metaPaths:
+            lastUsed = 1000 if os.path.basename(metaPath).startswith("other.data.") else 2000
+            os.utime( metaPath, (lastUsed, lastUsed) )
+        totalBytes = sum( os.path.getsize(f) for f in glob.glob( os.path.join( cacheDir, "*" )))
+        evict_lru( cacheDir, totalBytes - 1 )
+        remaining = [ os.path.basename(f) for f in glob.glob( os.path.join( cacheDir, "*.meta.json" )) ]
+        self.assertEqual( len(remaining), 1 )
+        self.assertTrue( remaining[0].startswith( "full_bindingsites.data." ))
+        return
+
+    def test_default_cache_dir_is_capped(self):
+        load_timeline( self.fname, maxCacheBytes=1 )  ## the only entry is over the cap
+        self.assertEqual( glob.glob( os.path.join( self.defaultCacheDir, "*" )), [] )
+        return
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+# filename: util_aggregateEvents.py
+# description:
+#   Follows aggregates (connected components) across timesteps and
+#   records how they form, change and disappear.
+#
+#   Components are maintained with IncrementalComponents, so only the
+#   components touched by a timestep's added/removed edges are looked
+#   at. The components that vanished are matched to the ones that
+#   appeared by maximum overlap of their molecule sets (greedily, the
+#   largest overlap first); a matched component keeps its aggregate ID.
+#   Each timestep then yields events:
+#     BIRTH   an unmatched new component sharing no molecule with the
+#             vanished ones (formed from molecules without edges),
+#     GROW,   a matched component that gained or lost molecules,
+#     SHRINK
+#     MERGE   an unmatched vanished component whose molecules went
+#             (mostly) into another aggregate; other = the absorbed ID,
+#     SPLIT   an unmatched new component made of molecules of a
+#             vanished one; other = the aggregate it split from,
+#     DEATH   an unmatched vanished component none of whose molecules
+#             still have edges.
+#   A component whose edges changed but whose members did not yields no
+#   event. Aggregate IDs are 0,1,2,... in order of BIRTH/SPLIT.
+#
+#   The events are a structured array (EVENT_DTYPE) saved with np.save:
+#     timestep, kind, aggregate, other (-1 if none),
+#     size, prevSize (molecules after/before; 0 if none),
+#     numRecs (receptors of the aggregate after, or before for DEATH)
+#--------------------------------------------------------------------
+# usage:
+#   util_aggregateEvents.py <ifname> <numRecs> [<ofname>]
+#
+#   Writes the events of full_bindingsites.data <ifname> to <ofname>
+#   (default: <ifname>.events.npy) and prints a summary.
+#--------------------------------------------------------------------
+
+import sys
+
+import numpy as np
+
+from util_timelineCache import load_timeline
+from util_edgeDeltas import DeltaTimeline
+from util_incrementalComponents import IncrementalComponents
+
+
+EVENTS_SUFFIX = ".events.npy"
+
+BIRTH, GROW, SHRINK, MERGE, SPLIT, DEATH = range(6)
+EVENT_NAMES = ['birth', 'grow', 'shrink', 'merge', 'split', 'death']
+
+EVENT_DTYPE = np.dtype( [ ('timestep', np.int32), ('kind', np.int8), ('aggregate', np.int32), ('other', np.int32),
+                          ('size', np.int32), ('prevSize', np.int32), ('numRecs', np.int32) ] )
+
+LIFETIME_DTYPE = np.dtype( [ ('aggregate', np.int32), ('start', np.int32), ('end', np.int32), ('ended', np.bool_) ] )
+
+USAGE_STR = """
+ Usage:
+   util_aggregateEvents.py <ifname> <numRecs> [<ofname>]
+
+   where, <ifname> = (string) name of input bindingsite data file,
+          <numRecs> = (int) number of receptors (molecule IDs 0..numRecs-1),
+          <ofname> = (string) name of output event file (default: <ifname>{})
+""".format( EVENTS_SUFFIX )
+
+
+class AggregateTracker:
+    def __init__(self, numMolecules, numRecs):
+        self.components = IncrementalComponents( numMolecules )
+        self.numRecs = numRecs
+        self.idOf = {}  ## frozenset of members -> aggregate ID, for every live component
+        self.nextID = 0
+        self.events = []  ## (timestep, kind, aggregate, other, size, prevSize, numRecs)
+
+    def _count_recs(self, members):
+        return sum( 1 for m in members if m < self.numRecs )
+
+    def _new_id(self):
+        self.nextID = self.nextID + 1
+        return self.nextID - 1
+
+    def apply(self, t, removed, added):
+        """Applies timestep t's removed/added edges (see IncrementalComponents.apply)
+        and records its events."""
+        vanished, appeared = self.components.apply( removed, added )
+        vanishedIDs = [ self.idOf.pop( cc ) for cc in vanished ]
+
+        owner = {}  ## moleculeID -> index into vanished
+        for i, cc in enumerate(vanished):
+            for m in cc:
+                owner[m] = i
+        overlap = {}  ## (i, j) -> number of molecules vanished[i] and appeared[j] share
+        for j, cc in enumerate(appeared):
+            for m in cc:
+                i = owner.get( m )
+                if i is not None:
+                    overlap[(i, j)] = overlap.get( (i, j), 0 ) + 1
+
+        ## greedy maximum-overlap matching; ties go to the older aggregate
+        matchOfVanished = {}
+        matchOfAppeared = {}
+        for (i, j), n in sorted( overlap.items(), key=lambda item: (-item[1], vanishedIDs[item[0][0]], item[0][1]) ):
+            if (i not in matchOfVanished) and (j not in matchOfAppeared):
+                matchOfVanished[i] = j
+                matchOfAppeared[j] = i
+        bestParent = {}  ## j -> i with the largest overlap
+        bestChild = {}   ## i -> j with the largest overlap
+        for (i, j), n in overlap.items():
+            if (j not in bestParent) or (n > overlap[(bestParent[j], j)]):
+                bestParent[j] = i
+            if (i not in bestChild) or (n > overlap[(i, bestChild[i])]):
+                bestChild[i] = j
+
+        appearedIDs = []
+        for j, cc in enumerate(appeared):
+            if j in matchOfAppeared:
+                aggID = vanishedIDs[ matchOfAppeared[j] ]
+            else:
+                aggID = self._new_id()
+                if j in bestParent:
+                    i = bestParent[j]
+                    self.events.append( (t, SPLIT, aggID, vanishedIDs[i], len(cc), len(vanished[i]), self._count_recs(cc)) )
+                else:
+                    self.events.append( (t, BIRTH, aggID, -1, len(cc), 0, self._count_recs(cc)) )
+            self.idOf[cc] = aggID
+            appearedIDs.append( aggID )
+
+        mergedInto = set()
+        for i, cc in enumerate(vanished):
+            if i in matchOfVanished:
+                continue
+            if i in bestChild:
+                j = bestChild[i]
+                mergedInto.add( j )
+                self.events.append( (t, MERGE, appearedIDs[j], vanishedIDs[i], len(appeared[j]), len(cc), self._count_recs(appeared[j])) )
+            else:
+                self.events.append( (t, DEATH, vanishedIDs[i], -1, 0, len(cc), self._count_recs(cc)) )
+
+        for j, i in matchOfAppeared.items():
+            size = len(appeared[j])
+            prevSize = len(vanished[i])
+            if (j not in mergedInto) and (size != prevSize):
+                kind = GROW if (size > prevSize) else SHRINK
+                self.events.append( (t, kind, appearedIDs[j], -1, size, prevSize, self._count_recs(appeared[j])) )
+        return
+
+    def events_array(self):
+        return np.array( self.events, dtype=EVENT_DTYPE )
+
+## end class AggregateTracker
+
+
+def track_aggregates(timeline, numRecs, numMolecules=None):
+    """Returns the events (EVENT_DTYPE array) of an EdgeTimeline."""
+    deltas = DeltaTimeline.from_timeline( timeline )
+    if numMolecules is None:
+        numMolecules = 1 + int( deltas.edgeTable[:, [0, 2]].max() ) if len(deltas.edgeTable) else 0
+    tracker = AggregateTracker( numMolecules, numRecs )
+    for t, removed, added in deltas.iter_event_lists():
+        tracker.apply( t, removed, added )
+    return tracker.events_array()
+
+def save_events(fname, events):
+    np.save( fname, events )
+
+def load_events(fname, mmap_mode=None):
+    return np.load( fname, mmap_mode=mmap_mode )
+
+def aggregate_lifetimes(events, numTimesteps):
+    """Returns one LIFETIME_DTYPE row per aggregate ID: the timestep of its BIRTH/SPLIT and
+    of its DEATH/MERGE into another (end - start is its lifetime). An aggregate still alive
+    at the end has ended=False and end=numTimesteps."""
+    events = np.asarray( events )
+    started = np.isin( events['kind'], (BIRTH, SPLIT) )
+    numAggregates = int( events['aggregate'][started].max() ) + 1 if started.any() else 0
+    lifetimes = np.zeros( numAggregates, dtype=LIFETIME_DTYPE )
+    lifetimes['aggregate'] = np.arange( numAggregates )
+    lifetimes['start'][ events['aggregate'][started] ] = events['timestep'][started]
+    lifetimes['end'] = numTimesteps
+    for kind, field in ((DEATH, 'aggregate'), (MERGE, 'other')):
+        ended = events['kind'] == kind
+        lifetimes['end'][ events[field][ended] ] = events['timestep'][ended]
+        lifetimes['ended'][ events[field][ended] ] = True
+    return lifetimes
+
+
+def main():
+    if (len(sys.argv) < 3) or (len(sys.argv) > 4):
+        print( USAGE_STR )
+        sys.exit( "Incorrect number of arguments." )
+    ifname = sys.argv[1]
+    numRecs = int(sys.argv[2])
+    ofname = sys.argv[3] if len(sys.argv) > 3 else ifname + EVENTS_SUFFIX
+
+    timeline = load_timeline( ifname )
+    events = track_aggregates( timeline, numRecs )
+    save_events( ofname, events )
+    print( "Wrote {} events to {}".format( len(events), ofname ))
+    counts = np.bincount( events['kind'], minlength=len(EVENT_NAMES) )
+    print( ", ".join( "{}: {}".format( name, n ) for name, n in zip( EVENT_NAMES, counts.tolist() )))
+    lifetimes = aggregate_lifetimes( events, len(timeline) )
+    ended = lifetimes[ lifetimes['ended'] ]
+    if len(ended):
+        durations = ended['end'] - ended['start']
+        print( "{} aggregates, {} ended; lifetime of ended: mean {:.1f}, max {} timesteps".format(
+            len(lifetimes), len(ended), durations.mean(), durations.max() ))
+    return
+
+if __name__ == "__main__":
+    main()
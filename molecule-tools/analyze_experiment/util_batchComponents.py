@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# filename: util_batchComponents.py
+# description:
+#   Connected components of thousands of timesteps at once.
+#
+#   A block of timesteps is packed into one block-diagonal sparse
+#   adjacency matrix, where molecule m of the block's timestep t is
+#   vertex t*numMolecules + m, and scipy.sparse.csgraph labels all of
+#   them in a single compiled call. The result is a
+#   (numTimesteps x numMolecules) label matrix:
+#
+#     labels[t, m] = component of molecule m at timestep t
+#
+#   Labels are dense per timestep (0,1,2,...), numbered by the smallest
+#   molecule ID in each component, and a molecule with no edges is a
+#   component of its own (the same numbering as component_labels).
+#--------------------------------------------------------------------
+
+import numpy as np
+from scipy.sparse import coo_matrix
+from scipy.sparse.csgraph import connected_components
+
+
+DEFAULT_BLOCK_TIMESTEPS = 4096
+
+
+def label_block(timeline, start, stop, numMolecules):
+    """Returns the (stop-start x numMolecules) label matrix of timesteps [start, stop) of timeline."""
+    numTimesteps = stop - start
+    edges = np.asarray( timeline.edges[ timeline.offsets[start] : timeline.offsets[stop] ] )
+    counts = np.diff( np.asarray( timeline.offsets[ start : stop+1 ] ))
+    base = np.repeat( np.arange( numTimesteps, dtype=np.int64 ) * numMolecules, counts )
+    numVertices = numTimesteps * numMolecules
+    A = coo_matrix( (np.ones( len(edges), dtype=np.int8 ), (base + edges[:, 0], base + edges[:, 2])),
+                    shape=(numVertices, numVertices) ).tocsr()
+    numComponents, labels = connected_components( A, directed=False )
+    labels = labels.reshape( numTimesteps, numMolecules )
+    ## vertices are labelled in index order, so each timestep's smallest label is that of molecule 0
+    return (labels - labels[:, :1]).astype( np.int32 )
+
+def iter_label_blocks(timeline, numMolecules=None, blockTimesteps=DEFAULT_BLOCK_TIMESTEPS):
+    """Yields (start, labels) for consecutive blocks of blockTimesteps timesteps."""
+    if numMolecules is None:
+        numMolecules = 1 + int( timeline.edges[:, [0, 2]].max() ) if len(timeline.edges) else 0
+    for start in range(0, len(timeline), blockTimesteps):
+        stop = min( start + blockTimesteps, len(timeline) )
+        yield start, label_block( timeline, start, stop, numMolecules )
+
+def label_timesteps(timeline, numMolecules=None, blockTimesteps=DEFAULT_BLOCK_TIMESTEPS):
+    """Returns the (numTimesteps x numMolecules) label matrix of a whole EdgeTimeline."""
+    if numMolecules is None:
+        numMolecules = 1 + int( timeline.edges[:, [0, 2]].max() ) if len(timeline.edges) else 0
+    labels = np.empty( (len(timeline), numMolecules), dtype=np.int32 )
+    for start, block in iter_label_blocks( timeline, numMolecules, blockTimesteps ):
+        labels[ start : start+len(block) ] = block
+    return labels
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# filename: util_bindingSitesEngine.py
+# description:
+#   The single entry point for reading binding site data. Every script
+#   that reads full_bindingsites.data (or a file derived from it)
+#   imports its parsing from here instead of keeping its own copy of
+#   the regex, BindingEdge, Graph and read_file.
+#
+#   Input formats are pluggable dialects (util_fullBindingSitesParser):
+#     * 'dotted' : [(0.1,20.4),(20.4,0.1)],[...]   (simulator output)
+#     * 'comma'  : (0,1,20,4),(20,4,0,1)           (periods replaced)
+#     * 'graph'  : (0, 20, 1, 4),(20, 0, 4, 1),    (bindingSitesDataReader.py
+#                                                  output: mol1, mol2, b1, b2)
+#   Readers detect the dialect from the data unless one is given.
+#   New formats are added with register_dialect( Dialect(...) ).
+#
+#   Whichever the dialect, edges come out as (mol1, bsite1, mol2, bsite2):
+#     * per line    : parse_edges_from_str, iter_edges_from_file, read_file
+#     * whole file  : load_timeline -> EdgeTimeline (cached, array-backed)
+#     * random lines: read_timesteps, iter_timestep_edges (line index)
+#     * add/remove  : DeltaTimeline, load_deltas (delta-encoded runs)
+#
+#   gzip/bz2/xz input is decompressed transparently (util_compressedInput).
+#--------------------------------------------------------------------
+
+from util_fullBindingSitesParser import \
+    MOLTYPE_UNKNOWN, MOLTYPE_IGE, MOLTYPE_LIGAND, \
+    getMoleculeType, isMoltypeIge, isMoltypeMb4n, isMoltype, \
+    Dialect, DIALECT_GRAPH, DIALECT_DOTTED, DIALECT_COMMA, DIALECTS, \
+    register_dialect, get_dialect, detect_dialect, detect_dialect_of_lines, \
+    BindingEdge, BindingEdgeTuple, as_binding_edges, Graph, \
+    read_file, iter_file, parse_edges_from_str, parse_edges_from_str_list, \
+    iter_edges_from_str_iter, iter_edges_from_file
+from util_compressedInput import open_input, detect_codec, glob_inputs
+from util_edgeTimeline import EdgeTimeline, detect_dialect_of_file
+from util_timelineCache import load_timeline
+from util_lineIndex import load_line_index, count_timesteps, read_timesteps, \
+    iter_timestep_edges, read_last_timestep
+from util_edgeDeltas import DeltaTimeline, convert_to_deltas, load_deltas, EVENT_ADD, EVENT_REMOVE
+from util_parallelParse import parse_file_parallel, split_at_newlines
+from util_components import DisjointSet, component_labels, components_in_order
+from util_incrementalComponents import IncrementalComponents
+from util_batchComponents import label_timesteps, iter_label_blocks, label_block
+from util_classificationCache import ClassificationCache, component_signature, site_mask
+from util_csrGraph import CSRGraph
+from util_aggregateEvents import AggregateTracker, track_aggregates, save_events, load_events, aggregate_lifetimes
+from util_siteOccupancy import build_occupancy, occupancy_block, load_occupancy, save_occupancy, open_occupancy_file, \
+    site_bound, all_sites_bound, num_sites_bound, count_sites_bound
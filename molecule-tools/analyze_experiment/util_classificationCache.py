@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# filename: util_classificationCache.py
+# description:
+#   A bounded cache of aggregate classifications.
+#
+#   The same small aggregates (SingletonA, 2mers, ...) recur over and
+#   over across timesteps and runs. A component is reduced to a cheap
+#   canonical signature,
+#
+#     ( (mol_1, mol_2, ..., mol_k),       <- sorted molecule IDs
+#       (mask_1, mask_2, ..., mask_k) )   <- bound sites of each, as bits
+#
+#   and its classification is computed once per distinct signature.
+#   The cache keeps at most maxEntries signatures, evicting the least
+#   recently used, and counts hits, misses and evictions.
+#--------------------------------------------------------------------
+
+from collections import OrderedDict
+
+
+DEFAULT_MAX_ENTRIES = 1 << 16
+
+
+def site_mask(bsites):
+    """Returns the bitmask with bit b set for every bound site b in bsites."""
+    mask = 0
+    for b in bsites:
+        mask = mask | (1 << b)
+    return mask
+
+def component_signature(members, boundSitesOf):
+    """Returns the canonical signature of a component (see header).
+    boundSitesOf(moleculeID) returns the bound site IDs of that molecule."""
+    sortedMembers = tuple( sorted( members ))
+    return (sortedMembers, tuple( site_mask( boundSitesOf(m) ) for m in sortedMembers ))
+
+
+class ClassificationCache:
+    def __init__(self, classify, maxEntries=DEFAULT_MAX_ENTRIES):
+        """classify(signature) computes the classification of a signature on a miss."""
+        self.classify = classify
+        self.maxEntries = maxEntries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, signature):
+        """Returns the classification of signature, computing it on a miss."""
+        value = self.entries.get( signature )
+        if value is not None:
+            self.hits = self.hits + 1
+            self.entries.move_to_end( signature )
+            return value
+        self.misses = self.misses + 1
+        value = self.classify( signature )
+        self.entries[signature] = value
+        if len(self.entries) > self.maxEntries:
+            self.entries.popitem( last=False )
+            self.evictions = self.evictions + 1
+        return value
+
+    def __len__(self):
+        return len(self.entries)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def stats(self):
+        """Returns a one-line summary of the counters."""
+        lookups = self.hits + self.misses
+        hitRate = (100.0 * self.hits / lookups) if lookups else 0.0
+        return "classification cache: {} hits, {} misses ({:.1f}% hit rate), {} entries, {} evictions".format(
+            self.hits, self.misses, hitRate, len(self.entries), self.evictions )
+
+## end class ClassificationCache
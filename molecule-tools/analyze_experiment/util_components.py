@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# filename: util_components.py
+# description:
+#   Connected components of a binding site graph with a disjoint-set
+#   (union-find) forest: path compression plus union by rank, so a whole
+#   timestep is labelled in near-linear time and without recursion,
+#   however large its aggregates are.
+#
+#   Molecules are integer IDs. component_labels() returns a dense label
+#   array: labels[m] is the component of molecule m, numbered 0,1,2,...
+#   in order of first appearance; molecules with no edges get their own
+#   (singleton) label.
+#--------------------------------------------------------------------
+
+import numpy as np
+
+
+class DisjointSet:
+    def __init__(self, n):
+        """n singleton sets {0}, {1}, ..., {n-1}."""
+        self.parent = list( range(n) )
+        self.rank = [0] * n
+
+    def find(self, x):
+        """Returns the root of x's set, compressing the path to it."""
+        root = x
+        parent = self.parent
+        while parent[root] != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    def union(self, a, b):
+        """Merges the sets of a and b; returns the root of the merged set."""
+        rootA = self.find(a)
+        rootB = self.find(b)
+        if rootA == rootB:
+            return rootA
+        if self.rank[rootA] < self.rank[rootB]:
+            rootA, rootB = rootB, rootA
+        self.parent[rootB] = rootA
+        if self.rank[rootA] == self.rank[rootB]:
+            self.rank[rootA] = self.rank[rootA] + 1
+        return rootA
+
+    def labels(self, order=None):
+        """Returns a dense label per element; sets are numbered by first appearance in order
+        (default: 0..n-1), then any elements not in order by index."""
+        n = len(self.parent)
+        labels = np.full( n, -1, dtype=np.int32 )
+        rootLabel = {}
+        for x in (range(n) if order is None else list(order) + list(range(n))):
+            if labels[x] >= 0:
+                continue
+            root = self.find(x)
+            if root not in rootLabel:
+                rootLabel[root] = len(rootLabel)
+            labels[x] = rootLabel[root]
+        return labels
+
+## end class DisjointSet
+
+
+def component_labels(edges, numMolecules=None):
+    """Returns the dense component label of every molecule 0..numMolecules-1.
+    edges is a (numEdges x 4) array of (mol1,bsite1,mol2,bsite2) rows, e.g. a timestep of
+    an EdgeTimeline, or a list of BindingEdges."""
+    if isinstance(edges, np.ndarray):
+        pairs = edges[:, [0, 2]].tolist()
+    else:
+        pairs = [ (e.mol1, e.mol2) for e in edges ]
+    if numMolecules is None:
+        numMolecules = 1 + max( [ max(a, b) for a, b in pairs ], default=-1 )
+    ds = DisjointSet( numMolecules )
+    for a, b in pairs:
+        ds.union( a, b )
+    return ds.labels()
+
+def components_in_order(vertices, pairs):
+    """Groups vertices into connected components, given the (mol1, mol2) pairs of the edges.
+    Components are listed in order of first appearance in vertices (then any vertex seen only
+    in pairs), and so are the molecules in each component."""
+    index = {}
+    for v in vertices:
+        if v not in index:
+            index[v] = len(index)
+    for a, b in pairs:
+        for v in (a, b):
+            if v not in index:
+                index[v] = len(index)
+    ds = DisjointSet( len(index) )
+    for a, b in pairs:
+        ds.union( index[a], index[b] )
+    labels = ds.labels()  ## index order is first-appearance order
+    components = [ [] for i in range( int(labels.max()) + 1 if len(labels) else 0 ) ]
+    for v, i in index.items():
+        components[ labels[i] ].append( v )
+    return components
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# filename: util_compressedInput.py
+# description:
+#   Transparent reading of compressed run outputs (gzip, bz2, xz), so
+#   archived full_bindingsites.data and CSV files can be analyzed
+#   without decompressing them to scratch first.
+#
+#   The codec is detected from the file's magic bytes, not its name.
+#   Where a multithreaded decompressor is on the PATH (pigz, lbzip2 or
+#   pbzip2, xz -T0) it is run as a subprocess and its output streamed;
+#   otherwise the stdlib gzip/bz2/lzma modules are used. Set
+#   BINDINGSITES_NO_EXTERNAL_DECOMPRESSOR=1 to always use the stdlib.
+#
+#   open_input(fname) works like open(fname) for plain files too.
+#--------------------------------------------------------------------
+
+import io
+import os
+import bz2
+import gzip
+import glob
+import lzma
+import shutil
+import subprocess
+
+
+CODEC_GZIP = 'gzip'
+CODEC_BZ2 = 'bz2'
+CODEC_XZ = 'xz'
+
+MAGIC_BYTES = { CODEC_GZIP: b'\x1f\x8b',
+                CODEC_BZ2: b'BZh',
+                CODEC_XZ: b'\xfd7zXZ\x00' }
+
+COMPRESSED_SUFFIXES = ('.gz', '.bz2', '.xz')
+
+## multithreaded decompressors, in order of preference; each writes the data to stdout.
+EXTERNAL_DECOMPRESSORS = { CODEC_GZIP: [ ['pigz', '-dc'] ],
+                           CODEC_BZ2: [ ['lbzip2', '-dc'], ['pbzip2', '-dc'] ],
+                           CODEC_XZ: [ ['xz', '-T0', '-dc'] ] }
+NO_EXTERNAL_ENV = "BINDINGSITES_NO_EXTERNAL_DECOMPRESSOR"
+
+_STDLIB_OPENERS = { CODEC_GZIP: gzip.open, CODEC_BZ2: bz2.open, CODEC_XZ: lzma.open }
+
+
+def detect_codec(fname):
+    """Returns CODEC_GZIP, CODEC_BZ2 or CODEC_XZ from the magic bytes of fname, or None if uncompressed."""
+    with open(fname, 'rb') as f:
+        head = f.read( max( len(m) for m in MAGIC_BYTES.values() ))
+    for codec, magic in MAGIC_BYTES.items():
+        if head.startswith( magic ):
+            return codec
+    return None
+
+def is_compressed(fname):
+    return detect_codec( fname ) is not None
+
+def find_external_decompressor(codec):
+    """Returns the command line of a multithreaded decompressor for codec, or None."""
+    if os.environ.get( NO_EXTERNAL_ENV ):
+        return None
+    for cmd in EXTERNAL_DECOMPRESSORS.get( codec, [] ):
+        if shutil.which( cmd[0] ):
+            return cmd
+    return None
+
+
+class _DecompressorPipe(io.RawIOBase):
+    """Raw binary stream over the stdout of a decompressor subprocess."""
+    def __init__(self, cmd, fname):
+        self.fname = fname
+        self.atEOF = False
+        self.proc = subprocess.Popen( cmd + [fname], stdout=subprocess.PIPE, stderr=subprocess.PIPE )
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        n = self.proc.stdout.readinto( b )
+        if n == 0:
+            self.atEOF = True
+        return n
+
+    def close(self):
+        if not self.closed:
+            if not self.atEOF:
+                self.proc.kill()  ## closed early (e.g. only the head was read): not an error
+            self.proc.stdout.close()
+            err = self.proc.stderr.read()
+            self.proc.stderr.close()
+            if (self.proc.wait() != 0) and self.atEOF:
+                super().close()
+                raise OSError( "decompressing {} failed: {}".format( self.fname, err.decode( errors='replace' ).strip() ))
+        super().close()
+
+## end class _DecompressorPipe
+
+
+def open_input(fname, mode='rt'):
+    """Opens fname for reading ('rt' or 'rb'), decompressing it on the fly if needed."""
+    if mode not in ('r', 'rt', 'rb'):
+        raise ValueError( "open_input only reads; got mode '{}'".format( mode ))
+    codec = detect_codec( fname )
+    if codec is None:
+        return open( fname, mode )
+    cmd = find_external_decompressor( codec )
+    if cmd is not None:
+        stream = io.BufferedReader( _DecompressorPipe( cmd, fname ))
+    else:
+        stream = _STDLIB_OPENERS[codec]( fname, 'rb' )
+    if mode == 'rb':
+        return stream
+    return io.TextIOWrapper( stream )
+
+def read_input_bytes(fname):
+    """Returns the whole (decompressed) content of fname as bytes."""
+    with open_input( fname, 'rb' ) as f:
+        return f.read()
+
+def strip_compressed_suffix(fname):
+    """fname without its .gz/.bz2/.xz suffix, if it has one."""
+    for suffix in COMPRESSED_SUFFIXES:
+        if fname.endswith( suffix ):
+            return fname[ : -len(suffix) ]
+    return fname
+
+def glob_inputs(pattern):
+    """Like glob.glob(pattern), but also matches compressed copies (pattern + .gz/.bz2/.xz).
+    Returns one file per input: the plain file if there is one, else its first compressed copy."""
+    byInput = {}
+    for p in [ pattern ] + [ pattern + suffix for suffix in COMPRESSED_SUFFIXES ]:
+        for fname in glob.glob( p ):
+            byInput.setdefault( strip_compressed_suffix( fname ), fname )
+    return list( byInput.values() )
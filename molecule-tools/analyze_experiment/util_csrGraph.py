@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# filename: util_csrGraph.py
+# description:
+#   A compact, array-backed alternative to Graph for one timestep.
+#
+#   Graph.initialize builds a dict of Python lists of edge objects.
+#   CSRGraph instead sorts the timestep's (mol1,bsite1,mol2,bsite2)
+#   rows by mol1 in one vectorized pass (CSR layout):
+#
+#     rows indptr[m] : indptr[m+1]   ## the edges of molecule m
+#
+#   with the columns kept as parallel int arrays (mol1, bsite1, mol2,
+#   bsite2) and a per-molecule bound-site bitmask.
+#
+#   CSRGraph.adjDict is a read-only mapping compatible with
+#   Graph.adjDict: adjDict[m] supports len(), indexing and iteration,
+#   yielding edges with mol1/bsite1/mol2/bsite2 attributes that are
+#   only created when accessed. So which_singleton_type,
+#   count_numLigsBoundToIgE and classify_aggregate run on it unchanged.
+#--------------------------------------------------------------------
+
+from collections.abc import Mapping
+
+import numpy as np
+
+from util_fullBindingSitesParser import BindingEdgeTuple
+from util_components import components_in_order
+
+
+class EdgeSlice:
+    """The edges of one molecule in a CSRGraph, like one list in Graph.adjDict."""
+    __slots__ = ('graph', 'start', 'stop')
+
+    def __init__(self, graph, start, stop):
+        self.graph = graph
+        self.start = start
+        self.stop = stop
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getitem__(self, i):
+        n = self.stop - self.start
+        if i < 0:
+            i = n + i
+        if (i < 0) or (i >= n):
+            raise IndexError( "edge index {} out of range [0,{})".format( i, n ))
+        return self.graph.edge( self.start + i )
+
+    def __iter__(self):
+        for row in range(self.start, self.stop):
+            yield self.graph.edge( row )
+
+    @property
+    def bsite1(self):
+        """The bound sites of this molecule, as an array (no per-edge objects)."""
+        return self.graph.bsite1[ self.start : self.stop ]
+
+    @property
+    def mol2(self):
+        return self.graph.mol2[ self.start : self.stop ]
+
+## end class EdgeSlice
+
+
+class CSRAdjacency(Mapping):
+    """Read-only mapping moleculeID -> EdgeSlice, in the key order of Graph.adjDict."""
+    __slots__ = ('graph',)
+
+    def __init__(self, graph):
+        self.graph = graph
+
+    def __getitem__(self, moleculeID):
+        g = self.graph
+        if (moleculeID < 0) or (moleculeID >= g.numMolecules) or (g.indptr[moleculeID] == g.indptr[moleculeID+1]):
+            raise KeyError( moleculeID )
+        return EdgeSlice( g, int( g.indptr[moleculeID] ), int( g.indptr[moleculeID+1] ))
+
+    def __iter__(self):
+        return iter( self.graph.vertices )
+
+    def __len__(self):
+        return len( self.graph.vertices )
+
+    def __contains__(self, moleculeID):
+        g = self.graph
+        return (0 <= moleculeID < g.numMolecules) and (g.indptr[moleculeID] != g.indptr[moleculeID+1])
+
+## end class CSRAdjacency
+
+
+class CSRGraph:
+    __slots__ = ('mol1', 'bsite1', 'mol2', 'bsite2', 'indptr', 'siteMask', 'vertices', 'numMolecules', 'adjDict')
+
+    def __init__(self, edges, numMolecules=None):
+        """edges is a (numEdges x 4) array of (mol1,bsite1,mol2,bsite2) rows (e.g. a timestep
+        of an EdgeTimeline) or a list of BindingEdges."""
+        if not isinstance(edges, np.ndarray):
+            edges = [ (e.mol1, e.bsite1, e.mol2, e.bsite2) for e in edges ]
+        edges = np.asarray( edges, dtype=np.int64 ).reshape( -1, 4 )
+        if numMolecules is None:
+            numMolecules = 1 + int( edges[:, [0, 2]].max() ) if len(edges) else 0
+        order = np.argsort( edges[:, 0], kind='stable' )  ## stable: a molecule's edges keep their order
+        sortedEdges = edges[order]
+        self.mol1 = sortedEdges[:, 0]
+        self.bsite1 = sortedEdges[:, 1]
+        self.mol2 = sortedEdges[:, 2]
+        self.bsite2 = sortedEdges[:, 3]
+        self.numMolecules = numMolecules
+        self.indptr = np.zeros( numMolecules + 1, dtype=np.int64 )
+        np.cumsum( np.bincount( self.mol1, minlength=numMolecules ), out=self.indptr[1:] )
+        self.siteMask = np.zeros( numMolecules, dtype=np.int64 )
+        np.bitwise_or.at( self.siteMask, self.mol1, np.left_shift( 1, self.bsite1 ))
+        ## vertices in order of first appearance as mol1, like the keys of Graph.adjDict
+        uniqueMols, firstRows = np.unique( edges[:, 0], return_index=True )
+        self.vertices = uniqueMols[ np.argsort( firstRows ) ].tolist()
+        self.adjDict = CSRAdjacency( self )
+
+    def edge(self, row):
+        """Returns row (in mol1-sorted order) as a BindingEdgeTuple."""
+        return BindingEdgeTuple( int(self.mol1[row]), int(self.bsite1[row]), int(self.mol2[row]), int(self.bsite2[row]) )
+
+    def degree(self, moleculeID):
+        return int( self.indptr[moleculeID+1] - self.indptr[moleculeID] )
+
+    def is_site_bound(self, moleculeID, bsite):
+        return (0 <= moleculeID < self.numMolecules) and bool( (self.siteMask[moleculeID] >> bsite) & 1 )
+
+    def get_connectedComponents(self):
+        """Returns the connected components as Graph.get_connectedComponents does."""
+        return components_in_order( self.vertices, list( zip( self.mol1.tolist(), self.mol2.tolist() )))
+
+    def print_me(self):
+        print("Graph contents:")
+        print( "len(adjDidct.keys()): {}".format( len(self.vertices) ))
+        for key in self.vertices:
+            print("[{}]: ".format(key), end='')
+            for edge in self.adjDict[key]:
+                print("{}, ".format(edge), end='')
+            print()
+
+## end class CSRGraph
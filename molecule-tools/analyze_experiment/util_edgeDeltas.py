@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# filename: util_edgeDeltas.py
+# description:
+#   A delta-encoded storage format for binding site timelines.
+#
+#   Consecutive timesteps of full_bindingsites.data usually differ by
+#   zero to a few edges, yet every line repeats the whole edge list.
+#   A DeltaTimeline stores a run as:
+#     * edgeTable    : every distinct edge (mol1,bsite1,mol2,bsite2)
+#                      once, sorted; edges are referred to by row id,
+#     * events       : per timestep, the ids of the edges removed and
+#                      added since the previous timestep (timestep 0
+#                      is all adds), with eventKinds = EVENT_REMOVE or
+#                      EVENT_ADD and eventOffsets in CSR layout,
+#     * keyframes    : the full state (edge ids) every keyframeInterval
+#                      timesteps, so any timestep is rebuilt from the
+#                      nearest keyframe plus at most keyframeInterval-1
+#                      timesteps of events.
+#
+#   A timestep is a set of edges: reconstructed timesteps hold the same
+#   edges as the original line, in edgeTable (sorted) order.
+#
+#   Files are saved as a single .npz (<fname>.deltas.npz by default).
+#--------------------------------------------------------------------
+# usage:
+#   util_edgeDeltas.py <ifname> [<ofname>] [<keyframeInterval>]
+#
+#   Converts full_bindingsites.data <ifname> into a delta file.
+#--------------------------------------------------------------------
+
+import os
+import sys
+
+import numpy as np
+
+from util_edgeTimeline import EdgeTimeline
+from util_timelineCache import load_timeline
+
+
+DELTAS_SUFFIX = ".deltas.npz"
+DEFAULT_KEYFRAME_INTERVAL = 1000
+DENSE_KEY_LIMIT = 1 << 24  ## edge key spaces up to this size are mapped with a lookup table
+
+EVENT_REMOVE = -1
+EVENT_ADD = 1
+
+USAGE_STR = """
+ Usage:
+   util_edgeDeltas.py <ifname> [<ofname>] [<keyframeInterval>]
+
+   where, <ifname> = (string) name of input bindingsite data file,
+          <ofname> = (string) name of output delta file (default: <ifname>{}),
+          <keyframeInterval> = (int) timesteps between full states (default: {})
+""".format( DELTAS_SUFFIX, DEFAULT_KEYFRAME_INTERVAL )
+
+
+def _edge_keys(edges):
+    """Encodes (n x 4) edge rows as int64 keys that sort like the rows themselves."""
+    edges = np.asarray( edges, dtype=np.int64 )
+    if len(edges) == 0:
+        return np.zeros( 0, dtype=np.int64 ), (1, 1)
+    numMols = int( max( edges[:, 0].max(), edges[:, 2].max() )) + 1
+    numSites = int( max( edges[:, 1].max(), edges[:, 3].max() )) + 1
+    keys = ((edges[:, 0] * numSites + edges[:, 1]) * numMols + edges[:, 2]) * numSites + edges[:, 3]
+    return keys, (numMols, numSites)
+
+def _decode_keys(keys, numMols, numSites):
+    """Inverse of _edge_keys."""
+    edges = np.empty( (len(keys), 4), dtype=np.int32 )
+    keys, edges[:, 3] = np.divmod( keys, numSites )
+    keys, edges[:, 2] = np.divmod( keys, numMols )
+    edges[:, 0], edges[:, 1] = np.divmod( keys, numSites )
+    return edges
+
+
+class DeltaTimeline:
+    def __init__(self, edgeTable, eventIDs, eventKinds, eventOffsets,
+                 keyframeIDs, keyframeOffsets, keyframeInterval):
+        """See the header for the layout. keyframeOffsets has one entry per keyframe plus one."""
+        self.edgeTable = np.asarray( edgeTable, dtype=np.int32 ).reshape( -1, 4 )
+        self.eventIDs = np.asarray( eventIDs, dtype=np.int32 )
+        self.eventKinds = np.asarray( eventKinds, dtype=np.int8 )
+        self.eventOffsets = np.asarray( eventOffsets, dtype=np.int64 )
+        self.keyframeIDs = np.asarray( keyframeIDs, dtype=np.int32 )
+        self.keyframeOffsets = np.asarray( keyframeOffsets, dtype=np.int64 )
+        self.keyframeInterval = int( keyframeInterval )
+        if self.keyframeInterval < 1:
+            raise ValueError( "keyframeInterval must be >= 1, got {}".format( keyframeInterval ))
+
+    @classmethod
+    def from_timeline(cls, timeline, keyframeInterval=DEFAULT_KEYFRAME_INTERVAL):
+        """Delta-encodes an EdgeTimeline in a few vectorized passes."""
+        numTimesteps = len(timeline)
+        keys, (numMols, numSites) = _edge_keys( timeline.edges )
+        numKeys = numMols * numSites * numMols * numSites
+        if numKeys <= DENSE_KEY_LIMIT:
+            ## small key space: a lookup table replaces sorting every edge
+            isUsed = np.zeros( numKeys, dtype=bool )
+            isUsed[keys] = True
+            uniqueKeys = np.flatnonzero( isUsed )
+            lookup = np.cumsum( isUsed, dtype=np.int64 ) - 1
+            ids = lookup[keys]
+        else:
+            uniqueKeys, ids = np.unique( keys, return_inverse=True )
+        edgeTable = _decode_keys( uniqueKeys, numMols, numSites )
+        K = max( len(uniqueKeys), 1 )
+
+        ## every (timestep, edge id) present in the run, as one sorted int64 each.
+        present = timeline.timestep_of_edges() * K + ids.reshape(-1)
+        present.sort()
+        if len(present):
+            present = present[ np.concatenate( ([True], present[1:] != present[:-1]) ) ]
+        carried = present + K  ## what timestep t+1 would hold if nothing changed
+        carried = carried[ carried < numTimesteps * K ]
+        added = present[ ~np.isin( present, carried, assume_unique=True ) ]
+        removed = carried[ ~np.isin( carried, present, assume_unique=True ) ]
+
+        ## per timestep: removals first, then additions, each in edge id order.
+        order = np.concatenate( ( (removed // K) * 2 * K + (removed % K),
+                                  (added // K) * 2 * K + K + (added % K) ))
+        order.sort()
+        eventT = order // (2 * K)
+        isAdd = (order % (2 * K)) >= K
+        eventIDs = order % K
+        eventKinds = np.where( isAdd, EVENT_ADD, EVENT_REMOVE )
+        eventOffsets = np.searchsorted( eventT, np.arange( numTimesteps + 1 ))
+
+        presentT = present // K
+        isKeyframe = (presentT % keyframeInterval) == 0
+        keyframeIDs = present[isKeyframe] % K
+        numKeyframes = (numTimesteps + keyframeInterval - 1) // keyframeInterval
+        keyframeOffsets = np.searchsorted( presentT[isKeyframe] // keyframeInterval, np.arange( numKeyframes + 1 ))
+        return cls( edgeTable, eventIDs, eventKinds, eventOffsets, keyframeIDs, keyframeOffsets, keyframeInterval )
+
+    @classmethod
+    def load(cls, fname):
+        with np.load( fname ) as z:
+            return cls( z['edgeTable'], z['eventIDs'], z['eventKinds'], z['eventOffsets'],
+                        z['keyframeIDs'], z['keyframeOffsets'], int( z['keyframeInterval'] ))
+
+    def save(self, fname):
+        """Writes this DeltaTimeline to fname (.npz)."""
+        with open(fname, 'wb') as f:
+            np.savez( f, edgeTable=self.edgeTable, eventIDs=self.eventIDs, eventKinds=self.eventKinds,
+                      eventOffsets=self.eventOffsets, keyframeIDs=self.keyframeIDs,
+                      keyframeOffsets=self.keyframeOffsets, keyframeInterval=np.int64( self.keyframeInterval ))
+        return
+
+    def __len__(self):
+        """Number of timesteps."""
+        return len(self.eventOffsets) - 1
+
+    def num_events(self):
+        """Returns an array with the number of add/remove events of each timestep."""
+        return np.diff( self.eventOffsets )
+
+    def events(self, t):
+        """Returns (removedIDs, addedIDs): the edge ids removed and added going into timestep t."""
+        ids = self.eventIDs[ self.eventOffsets[t] : self.eventOffsets[t+1] ]
+        kinds = self.eventKinds[ self.eventOffsets[t] : self.eventOffsets[t+1] ]
+        numRemoved = int( np.count_nonzero( kinds == EVENT_REMOVE ))  ## removals come first
+        return ids[:numRemoved], ids[numRemoved:]
+
+    def iter_events(self):
+        """Yields (t, removedEdges, addedEdges) as (n x 4) arrays, for analyses that work incrementally."""
+        for t in range(0, len(self)):
+            removedIDs, addedIDs = self.events(t)
+            yield t, self.edgeTable[removedIDs], self.edgeTable[addedIDs]
+
+    def iter_event_lists(self):
+        """Like iter_events, but yields lists of (mol1,bsite1,mol2,bsite2) tuples; converted
+        once up front, so replaying a whole run stays in plain Python."""
+        edgeRows = [ tuple(row) for row in self.edgeTable.tolist() ]
+        eventIDs = self.eventIDs.tolist()
+        isRemove = (self.eventKinds == EVENT_REMOVE).tolist()
+        offsets = self.eventOffsets.tolist()
+        for t in range(0, len(self)):
+            removed = []
+            added = []
+            for k in range( offsets[t], offsets[t+1] ):
+                (removed if isRemove[k] else added).append( edgeRows[ eventIDs[k] ] )
+            yield t, removed, added
+
+    def state_ids(self, t):
+        """Returns the sorted edge ids of timestep t, rebuilt from the nearest keyframe."""
+        numTimesteps = len(self)
+        if t < 0:
+            t = numTimesteps + t
+        if (t < 0) or (t >= numTimesteps):
+            raise IndexError( "timestep {} out of range [0,{})".format( t, numTimesteps ))
+        k = t // self.keyframeInterval
+        K = len(self.edgeTable)
+        counts = np.bincount( self.keyframeIDs[ self.keyframeOffsets[k] : self.keyframeOffsets[k+1] ],
+                              minlength=K ).astype( np.int64 )
+        start = self.eventOffsets[ k * self.keyframeInterval + 1 ]
+        stop = self.eventOffsets[ t + 1 ]
+        if stop > start:
+            counts = counts + np.bincount( self.eventIDs[start:stop], weights=self.eventKinds[start:stop],
+                                           minlength=K ).astype( np.int64 )
+        return np.flatnonzero( counts > 0 )
+
+    def __getitem__(self, t):
+        """Returns the edges of timestep t as a (numEdges x 4) array."""
+        return self.edgeTable[ self.state_ids(t) ]
+
+    def __iter__(self):
+        """Yields the edges of every timestep, replaying the events once from the start."""
+        isPresent = np.zeros( len(self.edgeTable), dtype=bool )
+        for t in range(0, len(self)):
+            removedIDs, addedIDs = self.events(t)
+            isPresent[removedIDs] = False
+            isPresent[addedIDs] = True
+            yield self.edgeTable[ np.flatnonzero( isPresent ) ]
+
+    def to_timeline(self):
+        """Expands back into an EdgeTimeline (edges of each timestep in sorted order)."""
+        edgesList = list( self )
+        offsets = np.zeros( len(edgesList) + 1, dtype=np.int64 )
+        np.cumsum( [ len(edges) for edges in edgesList ], out=offsets[1:] )
+        edges = np.concatenate( edgesList ) if edgesList else np.zeros( (0, 4), dtype=np.int32 )
+        return EdgeTimeline( edges, offsets )
+
+    def nbytes(self):
+        return sum( a.nbytes for a in (self.edgeTable, self.eventIDs, self.eventKinds, self.eventOffsets,
+                                       self.keyframeIDs, self.keyframeOffsets) )
+
+## end class DeltaTimeline
+
+
+def convert_to_deltas(ifname, ofname=None, keyframeInterval=DEFAULT_KEYFRAME_INTERVAL, dialect=None):
+    """Converts binding sites file ifname into a delta file; returns (ofname, DeltaTimeline)."""
+    if ofname is None:
+        ofname = ifname + DELTAS_SUFFIX
+    deltas = DeltaTimeline.from_timeline( load_timeline( ifname, dialect ), keyframeInterval )
+    deltas.save( ofname )
+    return ofname, deltas
+
+def load_deltas(fname):
+    return DeltaTimeline.load( fname )
+
+
+def main():
+    if (len(sys.argv) < 2) or (len(sys.argv) > 4):
+        print( USAGE_STR )
+        sys.exit( "Incorrect number of arguments." )
+    ifname = sys.argv[1]
+    ofname = sys.argv[2] if len(sys.argv) > 2 else None
+    keyframeInterval = int(sys.argv[3]) if len(sys.argv) > 3 else DEFAULT_KEYFRAME_INTERVAL
+
+    ofname, deltas = convert_to_deltas( ifname, ofname, keyframeInterval )
+    inBytes = os.path.getsize( ifname )
+    outBytes = os.path.getsize( ofname )
+    print( "(input)  {}: {} bytes, {} timesteps".format( ifname, inBytes, len(deltas) ))
+    print( "(output) {}: {} bytes, {} events, {} distinct edges ({:.1f}x smaller)".format(
+        ofname, outBytes, len(deltas.eventIDs), len(deltas.edgeTable), inBytes / max(outBytes, 1) ))
+    return
+
+if __name__ == "__main__":
+    main()
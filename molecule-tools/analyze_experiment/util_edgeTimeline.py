@@ -0,0 +1,216 @@
+#!/usr/bin/env python3
+# filename: util_edgeTimeline.py
+# description:
+#   An array-backed container for a whole run of binding site data
+#   (e.g. full_bindingsites.data).
+#
+#   Instead of one BindingEdge object per edge, every edge of every
+#   timestep is a row (mol1, bsite1, mol2, bsite2) of a single int32
+#   array, and a second array holds per-timestep offsets into it
+#   (CSR layout):
+#
+#     edges[ offsets[t] : offsets[t+1] ]  ## the edges of timestep t
+#--------------------------------------------------------------------
+
+import os
+import mmap
+from array import array
+
+import numpy as np
+
+from util_compressedInput import open_input, is_compressed, read_input_bytes
+from util_fullBindingSitesParser import p2, iter_file, get_dialect, detect_dialect, detect_dialect_of_lines
+
+
+## a structured view of a row, so edges can be addressed by field name.
+EDGE_DTYPE = np.dtype( [('mol1', np.int32), ('bsite1', np.int32),
+                        ('mol2', np.int32), ('bsite2', np.int32)] )
+
+COL_MOL1 = 0
+COL_BSITE1 = 1
+COL_MOL2 = 2
+COL_BSITE2 = 3
+
+PARSE_CHUNK_BYTES = 1 << 20  ## 1 MiB; the bulk tokenizer works on cache-sized chunks of whole lines
+DETECT_DIALECT_BYTES = 1 << 16  ## the dialect of a buffer is detected from its first 64 KiB
+
+_ORD_ZERO = np.uint8( ord('0') )
+_ORD_NEWLINE = ord('\n')
+_ORD_OPEN_PAREN = ord('(')
+
+
+def tokenize_bytes(buf):
+    """Bulk tokenizer: turns a buffer of whole lines into an int array in one vectorized pass.
+
+    Every maximal run of digits is a number; separators ('.', ',', spaces, brackets) are all
+    treated alike. Returns (numbers, numbersPerLine, edgesPerLine), where numbers is an int32
+    array of every number in buf, and the two per-line arrays count numbers and '(' per line."""
+    b = np.frombuffer( buf, dtype=np.uint8 )
+    n = len(b)
+    if n == 0:
+        empty = np.zeros( 0, dtype=np.int64 )
+        return empty.astype( np.int32 ), empty, empty
+    newlines = np.flatnonzero( b == _ORD_NEWLINE )
+    lineEnds = newlines if (b[-1] == _ORD_NEWLINE) else np.append( newlines, n )
+
+    isDigitPadded = np.zeros( n+1, dtype=bool )  ## one trailing False, so isDigit[pos+1] is always valid
+    isDigit = isDigitPadded[:n]
+    np.less( b - _ORD_ZERO, 10, out=isDigit )    ## uint8 wrap-around: only '0'..'9' are < 10
+    isStart = isDigit.copy()
+    isStart[1:] &= ~isDigit[:-1]
+    starts = np.flatnonzero( isStart )
+
+    ## first digit of every number, then extend the (few) longer numbers one digit at a time.
+    numbers = b[starts].astype( np.int32 ) - ord('0')
+    j = 1
+    longer = np.flatnonzero( isDigitPadded[ starts+1 ] )
+    while len(longer):
+        pos = starts[longer] + j
+        numbers[longer] = numbers[longer] * 10 + (b[pos] - _ORD_ZERO)
+        j = j + 1
+        longer = longer[ isDigitPadded[ pos+1 ] ]
+
+    numbersPerLine = np.diff( np.searchsorted( starts, lineEnds ), prepend=0 )
+    parens = np.flatnonzero( b == _ORD_OPEN_PAREN )
+    edgesPerLine = np.diff( np.searchsorted( parens, lineEnds ), prepend=0 )
+    return numbers, numbersPerLine, edgesPerLine
+
+def detect_dialect_of_file(fname):
+    """Returns the Dialect of fname, detected from its first lines."""
+    with open_input(fname, 'rb') as f:
+        head = f.read( DETECT_DIALECT_BYTES ).decode( errors='ignore' )
+    return detect_dialect_of_lines( head.splitlines() )
+
+def _iter_line_chunks(buf, chunkBytes):
+    """Yields consecutive slices of buf, each ending on a newline (except possibly the last)."""
+    size = len(buf)
+    start = 0
+    while start < size:
+        stop = min( start + chunkBytes, size )
+        if stop < size:
+            cut = buf.rfind( b'\n', start, stop )
+            stop = (cut + 1) if (cut >= start) else (buf.find( b'\n', stop ) + 1 or size)
+        yield start, stop
+        start = stop
+
+
+class EdgeTimeline:
+    def __init__(self, edges, offsets):
+        """edges is a (numEdges x 4) int32 array of (mol1,bsite1,mol2,bsite2) rows;
+        offsets is a (numTimesteps+1) int64 array, where offsets[t] is the row of
+        the first edge of timestep t."""
+        self.edges = np.asanyarray( edges, dtype=np.int32 ).reshape( -1, 4 )
+        self.offsets = np.asanyarray( offsets, dtype=np.int64 )
+        if (self.offsets.ndim != 1) or (len(self.offsets) == 0):
+            raise ValueError( "offsets must be a non-empty 1D array." )
+        if self.offsets[-1] != len(self.edges):
+            raise ValueError( "offsets[-1] ({}) does not match the number of edges ({}).".format(
+                self.offsets[-1], len(self.edges) ))
+
+    @classmethod
+    def from_edge_lists(cls, llist_edges):
+        """Builds an EdgeTimeline from an iterable of lists of BindingEdges (one list per timestep)."""
+        values = array('i')
+        offsets = array('q', [0])
+        for listOfEdges in llist_edges:
+            for e in listOfEdges:
+                values.extend( (e.mol1, e.bsite1, e.mol2, e.bsite2) )
+            offsets.append( offsets[-1] + len(listOfEdges) )
+        return cls( np.frombuffer(values, dtype=np.int32), np.frombuffer(offsets, dtype=np.int64) )
+
+    @classmethod
+    def from_file(cls, fname, dialect=None, chunkBytes=PARSE_CHUNK_BYTES):
+        """Parses an aggregated binding sites file into an EdgeTimeline.
+        dialect is a name in DIALECTS (or a Dialect); if None it is detected from the data.
+        Compressed (gzip/bz2/xz) files are decompressed in memory instead of memory-mapped."""
+        if is_compressed( fname ):
+            return cls.from_bytes( read_input_bytes( fname ), dialect, chunkBytes )
+        with open(fname, 'rb') as f:
+            if os.fstat( f.fileno() ).st_size == 0:
+                return cls.from_strs( [], dialect )
+            with mmap.mmap( f.fileno(), 0, access=mmap.ACCESS_READ ) as mm:
+                return cls.from_bytes( mm, dialect, chunkBytes )
+
+    @classmethod
+    def from_bytes(cls, buf, dialect=None, chunkBytes=PARSE_CHUNK_BYTES):
+        """Parses a buffer holding whole lines of binding sites data with the bulk tokenizer.
+        Falls back to the per-line regex parser if a line holds anything but 4-number edges."""
+        if dialect is None:
+            head = bytes( buf[:DETECT_DIALECT_BYTES] ).decode( errors='ignore' )
+            d = detect_dialect_of_lines( head.splitlines() )
+        else:
+            d = get_dialect( dialect )
+        edgesChunks = []
+        countsChunks = []
+        for start, stop in _iter_line_chunks( buf, chunkBytes ):
+            chunk = buf[start:stop]
+            numbers, numbersPerLine, edgesPerLine = tokenize_bytes( chunk )
+            if not np.array_equal( numbersPerLine, 4 * edgesPerLine ):
+                fallback = cls.from_strs( bytes(chunk).decode().splitlines(), d )
+                edgesChunks.append( fallback.edges )
+                countsChunks.append( fallback.num_edges() )
+                continue
+            edges = numbers.reshape( -1, 4 )
+            if not d.is_identity_order():
+                edges = edges[ :, d.columnOrder ]
+            edgesChunks.append( edges )
+            countsChunks.append( edgesPerLine )
+        if not edgesChunks:
+            return cls.from_strs( [], d )
+        counts = np.concatenate( countsChunks )
+        offsets = np.zeros( len(counts) + 1, dtype=np.int64 )
+        np.cumsum( counts, out=offsets[1:] )
+        return cls( np.concatenate( edgesChunks ), offsets )
+
+    @classmethod
+    def from_strs(cls, iter_s, dialect=None):
+        """Parses an iterable of binding sites strings (one per timestep) into an EdgeTimeline.
+        If dialect is None it is detected from the first recognizable string (as detect_dialect_of_lines);
+        the strings before it are recognized by no dialect, so they hold no edges."""
+        d = None if (dialect is None) else get_dialect( dialect )
+        values = array('i')
+        offsets = array('q', [0])
+        for s in iter_s:
+            if d is None:
+                d = detect_dialect(s)
+            numbers = p2.findall( ",".join( d.pattern.findall(s) )) if d else []  ## 4 integers per matched edge
+            values.extend( map(int, numbers) )
+            offsets.append( offsets[-1] + len(numbers) // 4 )
+        edges = np.frombuffer( values, dtype=np.int32 ).reshape( -1, 4 )
+        if (d is not None) and not d.is_identity_order():
+            edges = edges[ :, d.columnOrder ]
+        return cls( edges, np.frombuffer(offsets, dtype=np.int64) )
+
+    def __len__(self):
+        """Number of timesteps."""
+        return len(self.offsets) - 1
+
+    def __getitem__(self, t):
+        """Returns the edges of timestep t as a zero-copy (numEdges x 4) view."""
+        numTimesteps = len(self)
+        if t < 0:
+            t = numTimesteps + t
+        if (t < 0) or (t >= numTimesteps):
+            raise IndexError( "timestep {} out of range [0,{})".format( t, numTimesteps ))
+        return self.edges[ self.offsets[t] : self.offsets[t+1] ]
+
+    def __iter__(self):
+        for t in range(0, len(self)):
+            yield self.edges[ self.offsets[t] : self.offsets[t+1] ]
+
+    def records(self, t):
+        """Returns the edges of timestep t as a zero-copy record array (fields mol1, bsite1, mol2, bsite2)."""
+        return np.ascontiguousarray( self[t] ).view( EDGE_DTYPE ).reshape( -1 ).view( np.recarray )
+
+    def num_edges(self):
+        """Returns an array with the number of edges in each timestep."""
+        return np.diff( self.offsets )
+
+    def timestep_of_edges(self):
+        """Returns an array with the timestep of each row of self.edges."""
+        return np.repeat( np.arange( len(self), dtype=np.int64 ), self.num_edges() )
+
+    def nbytes(self):
+        return self.edges.nbytes + self.offsets.nbytes
+
+## end class EdgeTimeline
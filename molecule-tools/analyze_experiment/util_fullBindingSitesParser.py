@@ -3,15 +3,80 @@
 
 import re
 
-from collections import deque
+import numpy as np
+from collections import deque, namedtuple
+
+from util_compressedInput import open_input
+from util_components import components_in_order
 
 
 MOLTYPE_UNKNOWN = -1
 MOLTYPE_IGE = 0
 MOLTYPE_LIGAND = 1
 
-p = re.compile('\(\d+,\d+,\d+\,\d+\)')  ## RE for (mol1,b1,mol2,b2)
+p = re.compile('\(\d+[.,]\d+,\s*\d+[.,]\d+\)')  ## RE for (mol1,b1,mol2,b2) or (mol1.b1,mol2.b2)
 p2 = re.compile('\d+')
+pGraph = re.compile(r'\(\d+, \d+, \d+, \d+\)')  ## RE for (mol1, mol2, b1, b2), see writeBindingSitesDataAsGraphs
+pDotted = re.compile(r'\(\d+\.\d+,')  ## an edge that starts like (mol1.b1,
+
+
+class Dialect:
+    """An input format of binding site data: the RE that matches one edge, and where each
+    of (mol1, bsite1, mol2, bsite2) sits among the four integers of a matched edge."""
+    def __init__(self, name, pattern, columnOrder, detect):
+        self.name = name
+        self.pattern = pattern                 ## compiled RE matching a single edge
+        self.columnOrder = tuple(columnOrder)  ## columnOrder[k] = position of field k of (mol1,bsite1,mol2,bsite2)
+        self.detect = detect                   ## detect(line) is True if line is written in this dialect
+
+    def is_identity_order(self):
+        return self.columnOrder == (0, 1, 2, 3)
+
+    def to_edge(self, s):
+        """Returns the BindingEdgeTuple of a single matched edge string s."""
+        numbers = p2.findall(s)
+        return BindingEdgeTuple( *[ int(numbers[k]) for k in self.columnOrder ] )
+
+    def __str__(self):
+        return self.name
+
+## end of class Dialect
+
+DIALECT_GRAPH = 'graph'    ## (0, 20, 1, 4),(4, 21, 1, 4),  <- bindingSitesDataReader.py output
+DIALECT_DOTTED = 'dotted'  ## [(0.1,20.4),(20.4,0.1)],[...]  <- full_bindingsites.data
+DIALECT_COMMA = 'comma'    ## (0,1,20,4),(20,4,0,1)          <- full_bindingsites.data after sed 's/\./,/g'
+
+DIALECTS = {}  ## name -> Dialect; detect_dialect tries them in registration order
+
+def register_dialect(dialect):
+    """Adds (or replaces) an input dialect; every reader of the engine can then parse it."""
+    DIALECTS[ dialect.name ] = dialect
+    return dialect
+
+def get_dialect(dialect=None):
+    """Returns the Dialect for a Dialect, a registered name, or None (dotted/comma form)."""
+    if dialect is None:
+        return DIALECTS[ DIALECT_DOTTED ]
+    if isinstance(dialect, Dialect):
+        return dialect
+    if dialect not in DIALECTS:
+        raise ValueError( "Unknown dialect '{}'; expected one of {}".format( dialect, list(DIALECTS.keys()) ))
+    return DIALECTS[ dialect ]
+
+def detect_dialect(s):
+    """Returns the first registered Dialect that recognizes line s, or None."""
+    for dialect in DIALECTS.values():
+        if dialect.detect(s):
+            return dialect
+    return None
+
+def detect_dialect_of_lines(iter_s):
+    """Returns the Dialect of the first recognizable line in iter_s (dotted/comma by default)."""
+    for s in iter_s:
+        dialect = detect_dialect(s)
+        if dialect is not None:
+            return dialect
+    return get_dialect( None )
 
 def getMoleculeType( mol_id, numRecs, numLigs ):
     molType = MOLTYPE_UNKNOWN
@@ -39,9 +104,8 @@ class BindingEdge:
         self.bsite2 = int(bsite2)
 
     def __init__(self, s):
-        """Constructor given a string representing a tuple (m1,b1,m2,b2)"""
-        clean_s = s[1:-1]  ## removes '(' and ')' characters
-        result = clean_s.split(',')
+        """Constructor given a string representing a tuple (m1,b1,m2,b2) or (m1.b1,m2.b2)"""
+        result = p2.findall(s)  ## the four integers, whichever separators were used
         self.mol1 = int(result[0])
         self.bsite1 = int(result[1])
         self.mol2 = int(result[2])
@@ -54,6 +118,31 @@ class BindingEdge:
 ## end of class BindingEdge
 
 
+class BindingEdgeTuple( namedtuple('BindingEdgeTuple', ['mol1', 'bsite1', 'mol2', 'bsite2']) ):
+    """A light, read-only stand-in for BindingEdge, built from a row of an EdgeTimeline."""
+    __slots__ = ()
+
+    def __str__(self):
+        s = "({},{},{},{})".format( self.mol1, self.bsite1, self.mol2, self.bsite2 )
+        return s
+
+## end of class BindingEdgeTuple
+
+
+register_dialect( Dialect( DIALECT_GRAPH, pGraph, (0, 2, 1, 3), lambda s: pGraph.search(s) is not None ))
+register_dialect( Dialect( DIALECT_DOTTED, p, (0, 1, 2, 3), lambda s: pDotted.search(s) is not None ))
+register_dialect( Dialect( DIALECT_COMMA, p, (0, 1, 2, 3), lambda s: p.search(s) is not None ))
+
+
+def as_binding_edges(edge_list):
+    """Returns edge_list as a sequence of edges with mol1, bsite1, mol2 and bsite2 attributes.
+    A per-timestep view of an EdgeTimeline (an int array of (mol1,bsite1,mol2,bsite2) rows)
+    is turned into BindingEdgeTuples; a list of BindingEdges is returned unchanged."""
+    if isinstance(edge_list, np.ndarray):
+        return [ BindingEdgeTuple._make(row) for row in edge_list.tolist() ]
+    return edge_list
+
+
 class Graph:
     def __init__(self, llist_edges):
         self.raw_llist_edges = llist_edges
@@ -62,47 +151,33 @@ class Graph:
         self.initialize( self.raw_llist_edges )
 
     def initialize(self, edge_list):
-        """llist_edges is a list of list of BindingEdges."""
-        for edge in edge_list:    ##   for each BindingEdge
+        """edge_list is a list of BindingEdges, or a single timestep of an EdgeTimeline."""
+        for edge in as_binding_edges( edge_list ):    ##   for each BindingEdge
             moleculeID = edge.mol1
             if moleculeID not in self.adjDict.keys():
                 self.adjDict[moleculeID] = []
             self.adjDict[moleculeID].append(edge)
 
     def get_connectedComponents(self):
-        """Returns a list of connected components of this graph. Each connected component is a list of moleculeIDs."""
-        listOfExploredVertices = deque()
-        visitedList = deque()
-        listOfCCs = deque()
-        for moleculeID in self.adjDict.keys():          ## for each vertex,
-            if moleculeID not in listOfExploredVertices:  ##   if moleculeID is not already explored,
-                visitedList = deque()
-                visitedList = self.bfs( deque([moleculeID]), deque() )
-                listOfCCs.append( visitedList )
-                listOfExploredVertices.extend( visitedList )
-        return listOfCCs
-        
+        """Returns a list of connected components of this graph. Each connected component is a list of moleculeIDs.
+        Components come in order of their first vertex in adjDict, and cc[0] is that vertex (see util_components)."""
+        pairs = [ (edge.mol1, edge.mol2) for listOfEdges in self.adjDict.values() for edge in listOfEdges ]
+        return deque( deque(cc) for cc in components_in_order( self.adjDict.keys(), pairs ))
 
     def bfs(self, listOfMoleculesToVisit, visitedList):
-        #print("[DEBUG] in bfs...")
-        #print("\tlistOfMoleculesToVisit: {}".format( listOfMoleculesToVisit ))
-        #print("\tvisitedList: {}".format( visitedList ))
-        if not listOfMoleculesToVisit:   ## if list is empty...
-            return visitedList
-        moleculeID = listOfMoleculesToVisit[0]
-        if moleculeID in visitedList:
-            listOfMoleculesToVisit.popleft()  #listOfMoleculesToVisit.pop(0)     ## remove first element,
-            return self.bfs( listOfMoleculesToVisit, visitedList )
-        listOfMoleculesToVisit.popleft()      #listOfMoleculesToVisit.pop(0)
-        visitedList.append( moleculeID )      ##  but add that element to the visited list
-        listOfEdges = self.adjDict[moleculeID]
-        for edge in listOfEdges:
-            adjacent_moleculeID = edge.mol2
-            if adjacent_moleculeID not in listOfMoleculesToVisit:
-                listOfMoleculesToVisit.append( adjacent_moleculeID )
-        return self.bfs(listOfMoleculesToVisit, visitedList)
-            
-    
+        """Appends to visitedList, in breadth-first order, every molecule reachable from listOfMoleculesToVisit."""
+        visited = set( visitedList )
+        while listOfMoleculesToVisit:
+            moleculeID = listOfMoleculesToVisit.popleft()
+            if moleculeID in visited:
+                continue
+            visited.add( moleculeID )
+            visitedList.append( moleculeID )
+            for edge in self.adjDict.get( moleculeID, [] ):
+                if edge.mol2 not in visited:
+                    listOfMoleculesToVisit.append( edge.mol2 )
+        return visitedList
+
     def print_me(self):
         print("Graph contents:")
         print( "len(adjDidct.keys()): {}".format( len(self.adjDict.keys()) ))
@@ -117,27 +192,44 @@ class Graph:
 
 def read_file(fname):
     """Reads aggregated binding sites file, and returns a list of strings."""
-    str_list = []
-    with open(fname) as f:
+    return list( iter_file(fname) )
+
+def iter_file(fname):
+    """Reads aggregated binding sites file lazily, yielding one stripped line at a time.
+    gzip/bz2/xz files are decompressed on the fly."""
+    with open_input(fname) as f:
         for line in f:
-            clean_line = line.strip()
-            str_list.append( clean_line )
-    return str_list
+            yield line.strip()
 
-def parse_edges_from_str_list(list_s):
+def parse_edges_from_str_list(list_s, dialect=None):
     """Parses a list of strings and returns a list of list of tuples."""
     llist_edges = []  ## a list of list of edges
     for s in list_s:
-        edges_list = parse_edges_from_str(s)  ## a list of edges
+        edges_list = parse_edges_from_str(s, dialect)  ## a list of edges
         llist_edges.append( edges_list )
     return llist_edges
 
-def parse_edges_from_str(s):
-    """Parses a string s and returns a list of BindingEdges."""
-    list_of_matched_tuples = p.findall(s)  ## list of strings (each element represents a tuple)
+def iter_edges_from_str_iter(iter_s, dialect=None):
+    """Lazily parses an iterable of strings, yielding one list of BindingEdges per string."""
+    for s in iter_s:
+        yield parse_edges_from_str(s, dialect)
+
+def iter_edges_from_file(fname, dialect=None):
+    """Yields the list of BindingEdges of each timestep in fname, one timestep at a time.
+    Only a single timestep is held in memory, however long the run is.
+    If dialect is None, it is detected from the first lines of fname."""
+    if dialect is None:
+        dialect = detect_dialect_of_lines( iter_file(fname) )
+    return iter_edges_from_str_iter( iter_file(fname), dialect )
+
+def parse_edges_from_str(s, dialect=None):
+    """Parses a string s and returns a list of BindingEdges.
+    dialect defaults to the dotted/comma form; see DIALECTS."""
+    d = get_dialect( dialect )
+    list_of_matched_tuples = d.pattern.findall(s)  ## list of strings (each element represents a tuple)
     edge_list = []  ## list of BindingEdges
     for s in list_of_matched_tuples:
-        edge = BindingEdge(s)
+        edge = BindingEdge(s) if d.is_identity_order() else d.to_edge(s)
         edge_list.append( edge )
     return edge_list
 
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# filename: util_incrementalComponents.py
+# description:
+#   Connected components maintained across consecutive timesteps.
+#
+#   Successive timesteps differ by a handful of bonds, so instead of
+#   recomputing every component for every timestep, the tracker is fed
+#   the edges removed and added between timesteps (see DeltaTimeline):
+#     * an added edge is a union in a disjoint-set forest,
+#     * a removed edge may split its component, so only that component
+#       is re-scanned: its members are reset to singletons and re-united
+#       along the edges they still have.
+#   Work per timestep is proportional to the number of changes (plus the
+#   size of the components a removal touches), not to the number of
+#   edges.
+#
+#   Only molecules with at least one edge belong to a component, like
+#   the vertices of a Graph.
+#--------------------------------------------------------------------
+
+from util_components import DisjointSet
+
+
+class IncrementalComponents:
+    def __init__(self, numMolecules):
+        self.ds = DisjointSet( numMolecules )
+        self.edges = [ set() for m in range(numMolecules) ]  ## edges[m] = {(bsite, otherMol, otherBsite)}
+        self.members = {}  ## root -> set of moleculeIDs, for every component with edges
+
+    def has_edges(self, moleculeID):
+        return len( self.edges[moleculeID] ) > 0
+
+    def component_of(self, moleculeID):
+        """Returns the set of molecules in moleculeID's component (None if it has no edges)."""
+        if not self.has_edges( moleculeID ):
+            return None
+        return self.members[ self.ds.find( moleculeID ) ]
+
+    def components(self):
+        return list( self.members.values() )
+
+    def _add(self, mol1, bsite1, mol2, bsite2):
+        self.edges[mol1].add( (bsite1, mol2, bsite2) )
+        for m in (mol1, mol2):
+            root = self.ds.find(m)
+            if root not in self.members:
+                self.members[root] = { m }
+        root1 = self.ds.find(mol1)
+        root2 = self.ds.find(mol2)
+        if root1 != root2:
+            merged = self.members.pop(root1) | self.members.pop(root2)
+            self.members[ self.ds.union( root1, root2 ) ] = merged
+
+    def _rescan(self, root):
+        """Splits the component at root along the edges its members still have."""
+        members = self.members.pop( root )
+        parent = self.ds.parent
+        rank = self.ds.rank
+        for m in members:
+            parent[m] = m
+            rank[m] = 0
+        for m in members:
+            for bsite, other, otherBsite in self.edges[m]:
+                self.ds.union( m, other )
+        for m in members:
+            if self.edges[m]:
+                self.members.setdefault( self.ds.find(m), set() ).add( m )
+
+    def apply(self, removed, added):
+        """Applies one timestep of changes: removed and added are iterables of
+        (mol1, bsite1, mol2, bsite2) rows (each bond is listed in both directions).
+        Returns (vanished, appeared): the member sets (frozensets) of the components
+        touched by the changes, before and after. A component whose members did not
+        change but whose edges did is in both."""
+        touched = set()
+        for rows in (removed, added):
+            for mol1, bsite1, mol2, bsite2 in rows:
+                touched.add( mol1 )
+                touched.add( mol2 )
+        vanished = self._components_of( touched )
+
+        rootsToRescan = set()
+        for mol1, bsite1, mol2, bsite2 in removed:
+            self.edges[mol1].discard( (bsite1, mol2, bsite2) )
+            rootsToRescan.add( self.ds.find(mol1) )
+        for root in rootsToRescan:
+            if root in self.members:
+                self._rescan( root )
+        for mol1, bsite1, mol2, bsite2 in added:
+            self._add( mol1, bsite1, mol2, bsite2 )
+        return vanished, self._components_of( touched )
+
+    def _components_of(self, moleculeIDs):
+        found = {}
+        for m in moleculeIDs:
+            if self.has_edges(m):
+                root = self.ds.find(m)
+                if root not in found:
+                    found[root] = frozenset( self.members[root] )
+        return list( found.values() )
+
+## end class IncrementalComponents
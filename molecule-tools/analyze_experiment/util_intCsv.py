@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+# filename: util_intCsv.py
+# description:
+#   Writes integer matrices as CSV text without formatting one number
+#   at a time in Python.
+#
+#   format_int_csv(A) returns the same bytes as
+#     np.savetxt(f, A, fmt="%i", delimiter=',')
+#   for non-negative integers: the digits of every cell are computed
+#   with numpy and placed straight into one output buffer
+#   (cell width = number of digits + 1 for the ',' or '\n' after it).
+#   Matrices with negative values fall back to str().
+#
+#   The text is built blockRows rows at a time (iter_int_csv_blocks),
+#   so the temporaries stay a few MB whatever the size of A (which can
+#   be a memmap), and write_int_csv writes each block as it is built.
+#--------------------------------------------------------------------
+
+import numpy as np
+
+
+DEFAULT_BLOCK_ROWS = 4096
+
+def _format_int_csv_slow(A):
+    return "".join( ",".join( map( str, row )) + "\n" for row in A.tolist() ).encode( 'ascii' )
+
+def _format_int_block(A):
+    """The CSV text (bytes) of a 2D block of A."""
+    if (A.size == 0) or (A.min() < 0):
+        return _format_int_csv_slow( A )
+    values = A.astype( np.int64 ).ravel()
+    numDigits = np.ones( values.shape, dtype=np.int64 )
+    power = 10
+    while power <= values.max():
+        numDigits += values >= power
+        power = power * 10
+    ends = np.cumsum( numDigits + 1 )  ## one past each cell's separator
+    buf = np.empty( int(ends[-1]), dtype=np.uint8 )
+    lastDigit = ends - 2
+    buf[ ends - 1 ] = ord(',')
+    buf[ ends[ A.shape[1]-1 :: A.shape[1] ] - 1 ] = ord('\n')
+    rest = values
+    for k in range(0, int(numDigits.max())):
+        m = numDigits > k
+        buf[ lastDigit[m] - k ] = (rest[m] % 10) + ord('0')
+        rest //= 10
+    return buf.tobytes()
+
+def iter_int_csv_blocks(A, blockRows=DEFAULT_BLOCK_ROWS):
+    """Yields the CSV text (bytes) of a 2D integer matrix, blockRows rows at a time."""
+    A = np.asarray( A )
+    if A.ndim == 1:
+        A = A.reshape( -1, 1 )
+    if A.shape[0] == 0:
+        yield b""
+    for start in range(0, A.shape[0], blockRows):
+        yield _format_int_block( A[ start : start+blockRows ] )
+
+def format_int_csv(A, blockRows=DEFAULT_BLOCK_ROWS):
+    """Returns the CSV text (bytes) of a 2D integer matrix, one line per row."""
+    return b"".join( iter_int_csv_blocks( A, blockRows ))
+
+def write_int_csv(fname, A, blockRows=DEFAULT_BLOCK_ROWS):
+    """Writes the CSV text of A to fname, one block of blockRows rows at a time."""
+    with open(fname, 'wb') as f:
+        for block in iter_int_csv_blocks( A, blockRows ):
+            f.write( block )
+    return fname
@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+# filename: util_lineIndex.py
+# description:
+#   A byte-offset index over the lines (timesteps) of a
+#   full_bindingsites.data file, for random access to any timestep.
+#
+#   The index is an int64 array of numLines+1 entries, where
+#   index[t] is the byte offset of the first character of line t and
+#   index[numLines] is the size of the file. It is built once with a
+#   single vectorized newline scan and saved in the timeline cache
+#   directory (see util_timelineCache; <basename>.<key>.lineindex.npy),
+#   keyed by the file's path, size and mtime.
+#
+#   read_timesteps(path, start, stop, step) then seeks straight to the
+#   requested lines through mmap, so reading a slice costs time
+#   proportional to the slice, not to the file.
+#
+#   Compressed (gzip/bz2/xz) files cannot be seeked into: the index then
+#   holds offsets into the decompressed data (built from the decompressed
+#   stream, a chunk at a time), and reads decompress it.
+#--------------------------------------------------------------------
+# usage:
+#   util_lineIndex.py <ifname>
+#
+#   Builds (or refreshes) the line index of <ifname>.
+#--------------------------------------------------------------------
+
+import os
+import sys
+import json
+import mmap
+
+import numpy as np
+
+from util_compressedInput import is_compressed, read_input_bytes, open_input
+from util_fullBindingSitesParser import parse_edges_from_str
+from util_edgeTimeline import detect_dialect_of_file
+from util_timelineCache import get_cache_base, get_cache_dir, get_max_cache_bytes, evict_lru
+
+
+INDEX_SUFFIX = ".lineindex"
+STREAM_CHUNK_BYTES = 1 << 24
+
+USAGE_STR = """
+ Usage:
+   util_lineIndex.py <ifname>
+
+   where, <ifname> = (string) name of input bindingsite data file
+"""
+
+
+def build_line_index(fname):
+    """Scans fname once and returns its line index (see header)."""
+    if is_compressed( fname ):
+        with open_input( fname, 'rb' ) as f:
+            return build_line_index_of_stream( f )
+    if os.path.getsize( fname ) == 0:
+        return np.zeros( 1, dtype=np.int64 )
+    with open(fname, 'rb') as f:
+        with mmap.mmap( f.fileno(), 0, access=mmap.ACCESS_READ ) as mm:
+            return build_line_index_of_bytes( mm )
+
+def build_line_index_of_bytes(buf):
+    """Returns the line index of a buffer of lines (see header)."""
+    size = len(buf)
+    if size == 0:
+        return np.zeros( 1, dtype=np.int64 )
+    b = np.frombuffer( buf, dtype=np.uint8 )
+    newlines = np.flatnonzero( b == ord('\n') )
+    lastByte = b[-1]
+    del b  ## release the exported buffer (buf may be an mmap about to be closed)
+    return _index_of_newlines( newlines, lastByte, size )
+
+def build_line_index_of_stream(f, chunkBytes=STREAM_CHUNK_BYTES):
+    """Returns the line index of the lines read from the binary stream f, chunkBytes at a time."""
+    newlines = []
+    size = 0
+    lastByte = None
+    for chunk in iter( lambda: f.read( chunkBytes ), b'' ):
+        b = np.frombuffer( chunk, dtype=np.uint8 )
+        newlines.append( np.flatnonzero( b == ord('\n') ) + size )
+        size = size + len(chunk)
+        lastByte = b[-1]
+    if size == 0:
+        return np.zeros( 1, dtype=np.int64 )
+    return _index_of_newlines( np.concatenate( newlines ), lastByte, size )
+
+def _index_of_newlines(newlines, lastByte, size):
+    starts = newlines + 1
+    if lastByte == ord('\n'):
+        starts = starts[:-1]  ## a trailing newline does not start a new line
+    index = np.empty( len(starts) + 2, dtype=np.int64 )
+    index[0] = 0
+    index[1:-1] = starts
+    index[-1] = size
+    return index
+
+def get_index_paths(fname, cacheDir=None):
+    base = get_cache_base( fname, cacheDir, INDEX_SUFFIX )
+    return (base + ".npy", base + ".meta.json")
+
+def load_line_index(fname, useCache=True, cacheDir=None):
+    """Returns the line index of fname, reusing the saved one while fname is unchanged."""
+    if not useCache:
+        return build_line_index( fname )
+    indexPath, metaPath = get_index_paths( fname, cacheDir )
+    st = os.stat( fname )
+    ident = { 'source': os.path.abspath( fname ), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns }
+    try:
+        with open(metaPath) as f:
+            if json.load(f) == ident:
+                index = np.load( indexPath, mmap_mode='r' )
+                os.utime( metaPath )  ## mark as recently used
+                return index
+    except (OSError, ValueError):
+        pass
+    index = build_line_index( fname )
+    try:
+        os.makedirs( get_cache_dir( cacheDir ), exist_ok=True )
+        np.save( indexPath, index )
+        with open(metaPath, 'w') as f:
+            json.dump( ident, f )  ## written last: marks the entry complete
+        evict_lru( get_cache_dir( cacheDir ), get_max_cache_bytes() )
+    except OSError as err:
+        print( "[Warning] could not save line index for {}: {}".format( fname, err ), file=sys.stderr )
+    return index
+
+def count_timesteps(fname):
+    """Returns the number of timesteps (lines) in fname."""
+    return len( load_line_index( fname ) ) - 1
+
+def read_timesteps(path, start=0, stop=None, step=1, index=None):
+    """Returns the stripped lines range(start, stop, step) of path, reading only those bytes.
+    start/stop/step follow Python slice semantics (negative values count from the end)."""
+    if index is None:
+        index = load_line_index( path )
+    numLines = len(index) - 1
+    lineIDs = range( numLines )[ slice(start, stop, step) ]
+    if len(lineIDs) == 0:
+        return []
+    if is_compressed( path ):
+        buf = read_input_bytes( path )
+        return [ buf[ index[t] : index[t+1] ].decode().strip() for t in lineIDs ]
+    lines = []
+    with open(path, 'rb') as f:
+        with mmap.mmap( f.fileno(), 0, access=mmap.ACCESS_READ ) as mm:
+            for t in lineIDs:
+                lines.append( mm[ index[t] : index[t+1] ].decode().strip() )
+    return lines
+
+def iter_timestep_edges(path, start=0, stop=None, step=1, index=None, dialect=None):
+    """Yields (timestep, list of BindingEdges) for the lines range(start, stop, step) of path.
+    dialect is a name in DIALECTS (or a Dialect); if None it is detected from the first lines of path."""
+    if index is None:
+        index = load_line_index( path )
+    if dialect is None:
+        dialect = detect_dialect_of_file( path )
+    lineIDs = range( len(index) - 1 )[ slice(start, stop, step) ]
+    for t, s in zip( lineIDs, read_timesteps( path, start, stop, step, index ) ):
+        yield t, parse_edges_from_str( s, dialect )
+
+def read_last_timestep(path):
+    """Returns the stripped last non-empty line of path (like tail -n 1) without an index or a full scan."""
+    if is_compressed( path ):
+        last = ''
+        with open_input( path ) as f:
+            for line in f:
+                if line.strip():
+                    last = line.strip()
+        return last
+    blockSize = 1 << 16
+    with open(path, 'rb') as f:
+        f.seek( 0, os.SEEK_END )
+        end = f.tell()
+        pos = end
+        tail = b''
+        while pos > 0:
+            readSize = min( blockSize, pos )
+            pos = pos - readSize
+            f.seek( pos )
+            tail = f.read( readSize ) + tail
+            if tail.rstrip(b'\n').rfind(b'\n') >= 0:
+                break
+    body = tail.rstrip(b'\n')
+    return body[ body.rfind(b'\n')+1 : ].decode().strip()
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2:
+        print( USAGE_STR )
+        sys.exit( "Incorrect number of arguments." )
+    ifname = sys.argv[1]
+    index = load_line_index( ifname )
+    print( "Indexed {} timesteps of {}".format( len(index)-1, ifname ))
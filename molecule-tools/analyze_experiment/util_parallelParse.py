@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# filename: util_parallelParse.py
+# description:
+#   Parses one large full_bindingsites.data file on several cores.
+#
+#   The file is split at newline boundaries into numWorkers byte ranges
+#   of about the same size, and each range is parsed by the bulk
+#   tokenizer (EdgeTimeline.from_bytes) in a process pool. A worker does
+#   not send its arrays back through pickling: it writes its edges and
+#   per-timestep edge counts into a multiprocessing.shared_memory block
+#   and returns only the block's name and sizes. The parent then copies
+#   the blocks, in range (= timestep) order, into one EdgeTimeline.
+#
+#   Files smaller than numWorkers * minBytesPerWorker, and compressed
+#   files, are parsed serially.
+#--------------------------------------------------------------------
+# usage:
+#   util_parallelParse.py <ifname> [<numWorkers>]
+#--------------------------------------------------------------------
+
+import os
+import sys
+import mmap
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory, resource_tracker
+
+import numpy as np
+
+from util_compressedInput import is_compressed
+from util_edgeTimeline import EdgeTimeline, PARSE_CHUNK_BYTES, detect_dialect_of_file
+from util_fullBindingSitesParser import get_dialect
+
+
+PARSE_WORKERS_ENV = "BINDINGSITES_PARSE_WORKERS"
+MIN_BYTES_PER_WORKER = 32 * (1 << 20)  ## 32 MiB; below that, starting processes costs more than it saves
+
+USAGE_STR = """
+ Usage:
+   util_parallelParse.py <ifname> [<numWorkers>]
+
+   where, <ifname> = (string) name of input bindingsite data file,
+          <numWorkers> = (int) number of parsing processes (default: number of cores)
+"""
+
+
+def get_num_workers(numWorkers=None):
+    """Returns numWorkers, or else $BINDINGSITES_PARSE_WORKERS, or else the number of cores."""
+    if numWorkers is None:
+        numWorkers = int( os.environ.get( PARSE_WORKERS_ENV, 0 )) or os.cpu_count() or 1
+    return max( 1, int(numWorkers) )
+
+def split_at_newlines(buf, numRanges):
+    """Returns up to numRanges (start, stop) byte ranges of buf of about equal size,
+    each starting at the beginning of a line."""
+    size = len(buf)
+    bounds = [0]
+    for i in range(1, numRanges):
+        pos = max( bounds[-1], (size * i) // numRanges )
+        if pos >= size:
+            break
+        cut = buf.find( b'\n', pos )
+        if (cut < 0) or (cut + 1 >= size):
+            break
+        if cut + 1 > bounds[-1]:
+            bounds.append( cut + 1 )
+    bounds.append( size )
+    return list( zip( bounds[:-1], bounds[1:] ))
+
+def _parse_range(fname, start, stop, dialectName, chunkBytes):
+    """Worker: parses bytes [start, stop) of fname into a new shared memory block.
+    Returns (blockName, numEdges, numTimesteps); the block holds the int32 edges
+    followed by the int64 per-timestep edge counts."""
+    with open(fname, 'rb') as f:
+        with mmap.mmap( f.fileno(), 0, access=mmap.ACCESS_READ ) as mm:
+            timeline = EdgeTimeline.from_bytes( mm[start:stop], dialectName, chunkBytes )
+    edges = np.ascontiguousarray( timeline.edges )
+    counts = timeline.num_edges()
+    block = shared_memory.SharedMemory( create=True, size=max( edges.nbytes + counts.nbytes, 1 ))
+    try:
+        np.ndarray( edges.shape, dtype=np.int32, buffer=block.buf )[:] = edges
+        np.ndarray( counts.shape, dtype=np.int64, buffer=block.buf, offset=edges.nbytes )[:] = counts
+    finally:
+        block.close()  ## the parent unlinks it
+    return block.name, len(edges), len(counts)
+
+def parse_file_parallel(fname, numWorkers=None, dialect=None,
+                        chunkBytes=PARSE_CHUNK_BYTES, minBytesPerWorker=MIN_BYTES_PER_WORKER):
+    """Parses fname into an EdgeTimeline using up to numWorkers processes (see header)."""
+    numWorkers = get_num_workers( numWorkers )
+    d = detect_dialect_of_file( fname ) if (dialect is None) else get_dialect( dialect )
+    size = os.path.getsize( fname )
+    numWorkers = min( numWorkers, size // max( minBytesPerWorker, 1 ))
+    if (numWorkers <= 1) or is_compressed( fname ):
+        return EdgeTimeline.from_file( fname, d, chunkBytes )
+
+    with open(fname, 'rb') as f:
+        with mmap.mmap( f.fileno(), 0, access=mmap.ACCESS_READ ) as mm:
+            ranges = split_at_newlines( mm, numWorkers )
+
+    ## workers must share this process' resource tracker, or each would report its blocks as leaked on exit
+    resource_tracker.ensure_running()
+    with ProcessPoolExecutor( max_workers=len(ranges) ) as pool:
+        futures = [ pool.submit( _parse_range, fname, start, stop, d.name, chunkBytes ) for start, stop in ranges ]
+    ## every range is done here; attach to the blocks that were written, even if another range failed
+    results = [ future.result() for future in futures if future.exception() is None ]
+    errors = [ future.exception() for future in futures if future.exception() is not None ]
+    blocks = [ shared_memory.SharedMemory( name=name ) for name, numEdges, numTimesteps in results ]
+
+    try:
+        if errors:
+            raise errors[0]
+        numEdgesTotal = sum( r[1] for r in results )
+        numTimestepsTotal = sum( r[2] for r in results )
+        edges = np.empty( (numEdgesTotal, 4), dtype=np.int32 )
+        offsets = np.zeros( numTimestepsTotal + 1, dtype=np.int64 )
+        edgeRow = 0
+        t = 0
+        for block, (name, numEdges, numTimesteps) in zip( blocks, results ):
+            edges[ edgeRow : edgeRow+numEdges ] = np.ndarray( (numEdges, 4), dtype=np.int32, buffer=block.buf )
+            offsets[ t+1 : t+1+numTimesteps ] = np.ndarray( numTimesteps, dtype=np.int64, buffer=block.buf,
+                                                            offset=numEdges * 4 * 4 )
+            edgeRow = edgeRow + numEdges
+            t = t + numTimesteps
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+    np.cumsum( offsets, out=offsets )
+    return EdgeTimeline( edges, offsets )
+
+
+def main():
+    if (len(sys.argv) < 2) or (len(sys.argv) > 3):
+        print( USAGE_STR )
+        sys.exit( "Incorrect number of arguments." )
+    ifname = sys.argv[1]
+    numWorkers = get_num_workers( int(sys.argv[2]) if len(sys.argv) > 2 else None )
+    start = time.perf_counter()
+    timeline = parse_file_parallel( ifname, numWorkers, minBytesPerWorker=1 )
+    elapsed = time.perf_counter() - start
+    print( "Parsed {} timesteps ({} edges) of {} with {} workers in {:.3f} s".format(
+        len(timeline), len(timeline.edges), ifname, numWorkers, elapsed ))
+    return
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+# filename: util_runDiscovery.py
+# description:
+#   Finds the runs of an experiment in a fixed order, and loads them
+#   concurrently without losing that order.
+#
+#   Run directories are named <expName>_<runID>, e.g. my100GrpTwo_7.
+#   find_runs(pattern) globs the files of the runs (plain or
+#   compressed, one per run) and returns (runID, fname) pairs sorted by
+#   the numeric runID of the directory each file is in directly under
+#   the glob root (the part of the pattern before its first wildcard),
+#   so run 10 comes after run 9 (not after run 1, as in name order).
+#   Only that directory counts: with the root /data/exp_3, a file in
+#   /data/exp_3/notARun/ is not run 3. Files whose directory under the
+#   root is not named <expName>_<runID> come last, by path.
+#
+#   Column i of every cross-run output is the ith run of find_runs, so
+#   outputs of different metrics of one experiment line up.
+#
+#   The files are loaded in a thread pool (the loaders spend their time
+#   in numpy, pandas and I/O):
+#     iter_loaded_runs(fnames, loader)         yields loader(f) in run order
+#     load_runs_into(fnames, loader, store)    calls store(slot, loader(f))
+#                                              as each one is loaded
+#--------------------------------------------------------------------
+
+import os
+import re
+import glob
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from util_compressedInput import glob_inputs
+from util_parallelParse import get_num_workers
+
+
+RUN_DIR_PATTERN = re.compile( r'^(?P<expName>.+)_(?P<runID>\d+)$' )
+
+
+def parse_run_dir(dirname):
+    """Returns (expName, runID) of a run directory name like 'myExp_12', else None."""
+    m = RUN_DIR_PATTERN.match( os.path.basename( os.path.normpath( dirname )))
+    if m is None:
+        return None
+    return m.group('expName'), int( m.group('runID') )
+
+def glob_root(pattern):
+    """Returns the directory part of pattern before its first wildcard, e.g. '/data/exp_3' of
+    '/data/exp_3/*/full_bindingsites.data' ('' for a pattern relative to the current directory)."""
+    parts = os.path.normpath( pattern ).split( os.sep )[:-1]  ## the last part names the files
+    root = []
+    for part in parts:
+        if glob.has_magic( part ):
+            break
+        root.append( part )
+    root = os.sep.join( root )
+    if (root == '') and os.path.isabs( pattern ):
+        root = os.sep
+    return root
+
+def run_of_path(path, root, expName=None):
+    """Returns (expName, runID) of the directory path is in directly under root, if it is a run
+    directory (of experiment expName, if given), else None."""
+    rel = os.path.relpath( path, root or os.curdir ).split( os.sep )
+    if (len(rel) < 2) or (rel[0] == os.pardir):  ## directly in root, or outside it
+        return None
+    run = parse_run_dir( rel[0] )
+    if (run is None) or ((expName is not None) and (run[0] != expName)):
+        return None
+    return run
+
+def find_runs(pattern, expName=None):
+    """Returns the (runID, fname) of every file matching the glob pattern, sorted by runID of its
+    directory under the glob root (runID None, after the others, if that is not a run directory).
+    A compressed copy is only used when there is no plain file. With expName, only runs of that
+    experiment."""
+    root = glob_root( pattern )
+    runs = []
+    for fname in glob_inputs( pattern ):
+        run = run_of_path( fname, root, expName )
+        if (run is None) and (expName is not None):
+            continue
+        runs.append( (None if (run is None) else run[1], fname) )
+    return sorted( runs, key=lambda r: (r[0] is None, r[0] or 0, r[1]) )
+
+def iter_loaded_runs(fnames, loader, numWorkers=None, maxPending=None):
+    """Yields loader(fname) of every fname, in order, loading up to maxPending (default: 2 x numWorkers)
+    files ahead in a thread pool."""
+    numWorkers = get_num_workers( numWorkers )
+    maxPending = maxPending or (2 * numWorkers)
+    with ThreadPoolExecutor( max_workers=numWorkers ) as pool:
+        pending = deque()
+        for fname in fnames:
+            pending.append( pool.submit( loader, fname ))
+            if len(pending) >= maxPending:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def load_runs_into(fnames, loader, store, numWorkers=None):
+    """Calls store(slot, loader(fnames[slot])) for every slot, from a thread pool; store must
+    only write its own slot (e.g. a column of a preallocated array)."""
+    def load_and_store(slot, fname):
+        store( slot, loader( fname ))
+    with ThreadPoolExecutor( max_workers=get_num_workers( numWorkers )) as pool:
+        futures = [ pool.submit( load_and_store, slot, fname ) for slot, fname in enumerate( fnames ) ]
+        for future in futures:
+            future.result()  ## re-raises a loader's exception
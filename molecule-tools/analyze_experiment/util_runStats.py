@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# filename: util_runStats.py
+# description:
+#   Cross-run statistics of per-timestep series, accumulated one run at
+#   a time, so that the (timesteps x runs) matrices never have to be
+#   built to get the mean and spread over the runs.
+#
+#   RunStats(numTimesteps, names) keeps, for every (series, timestep):
+#     * the number of runs, mean and sum of squared deviations
+#       (Welford's update), for the mean and variance,
+#     * a histogram of a fixed numBins bins [0, binWidth),
+#       [binWidth, 2*binWidth), ..., for the quantiles. When a run has a
+#       value past the last bin, the binWidth of that (series, timestep)
+#       is doubled (pairs of its bins are merged) until it fits, so no
+#       value is clipped; negative values are rejected.
+#   A quantile is the lower edge of the bin holding the exact one
+#   (np.quantile method='lower'): exact while binWidth is 1, i.e. while
+#   every value of that (series, timestep) is below numBins, and
+#   otherwise less than binWidth below it, where
+#     binWidth < 2 x (largest value + 1) / numBins.
+#   The rank of the bin is exact. numBins (--bins of the scripts that
+#   write summaries) is the accuracy knob.
+#
+#   Memory is fixed, whatever the number of runs and the values:
+#     series x timesteps x (20 + 2 x numBins) bytes
+#   (mean and m2 in float64, binWidth in uint32, bin counts in uint16,
+#   widened to uint32 past 65535 runs), e.g. 9 classes x 50001
+#   timesteps x 32 bins = 38 MB.
+#
+#   Two RunStats of the same shape merge exactly (Chan et al.'s pairwise
+#   update for the moments, bin-wise sums for the histograms), so runs
+#   can be accumulated in separate processes or jobs, saved
+#   (save_run_stats) and combined later.
+#
+#   A summary has one row per timestep:
+#     mean,std,<quantile 1>,<quantile 2>,...
+#   (std with ddof=1; nan with fewer than 2 runs).
+#--------------------------------------------------------------------
+# usage:
+#   util_runStats.py <ofnamePattern> <stats.npz> [<stats.npz> ...]
+#
+#   Merges the saved RunStats and writes the summary of every series
+#   to <ofnamePattern> with {} replaced by the series name.
+#--------------------------------------------------------------------
+
+import sys
+
+import numpy as np
+
+
+DEFAULT_QUANTILES = (0.05, 0.5, 0.95)
+DEFAULT_NUM_BINS = 32
+SUMMARY_FMT = "%.6g"
+BINS_ARG_PREFIX = "--bins="
+
+USAGE_STR = """
+ Usage:
+   util_runStats.py <ofnamePattern> <stats.npz> [<stats.npz> ...]
+
+   where, <ofnamePattern> = (string) output file name, {} is replaced by the series name,
+          <stats.npz> = (string) RunStats saved with save_run_stats
+"""
+
+
+class RunStats:
+    def __init__(self, numTimesteps, names, numBins=DEFAULT_NUM_BINS, binWidth=1):
+        if numBins < 2:
+            raise ValueError( "RunStats needs at least 2 bins, got {}.".format( numBins ))
+        self.names = list( names )
+        self.numBins = numBins
+        self.binWidth = np.full( (len(self.names), numTimesteps), binWidth, dtype=np.uint32 )  ## per (series, timestep)
+        self.n = 0
+        self.mean = np.zeros( (len(self.names), numTimesteps) )
+        self.m2 = np.zeros( (len(self.names), numTimesteps) )
+        self.hist = np.zeros( (len(self.names), numTimesteps, numBins), dtype=np.uint16 )
+
+    @property
+    def numTimesteps(self):
+        return self.mean.shape[1]
+
+    def add_run(self, series):
+        """Adds one run's (numSteps x len(names)) series. A run with fewer timesteps is padded
+        with its last row (as in the cumulative_class_stats files)."""
+        series = np.asarray( series )
+        numSteps = series.shape[0]
+        if numSteps > self.numTimesteps:
+            raise ValueError( "run has {} timesteps, more than the expected {}.".format( numSteps, self.numTimesteps ))
+        x = np.empty( self.mean.shape )
+        x[:, :numSteps] = series.T
+        x[:, numSteps:] = series[-1][:, np.newaxis]
+        if (x < 0).any():
+            raise ValueError( "RunStats cannot bin negative values." )
+        tooLarge = x >= self.numBins * self.binWidth
+        while tooLarge.any():
+            self.coarsen( tooLarge )
+            tooLarge = x >= self.numBins * self.binWidth
+        bins = (x // self.binWidth).astype( np.int64 )
+        self._fit_counts( self.n + 1 )
+        self.n = self.n + 1
+        delta = x - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (x - self.mean)
+        cells = np.arange( bins.size ).reshape( bins.shape ) * self.numBins + bins  ## one bin per (series, timestep)
+        self.hist.reshape( -1 )[ cells ] += 1
+
+    def coarsen(self, cells):
+        """Doubles the binWidth of the (series, timestep) cells (a boolean mask), merging every
+        pair of their bins (the upper bins become empty)."""
+        self.hist[cells] = _merge_bin_pairs( self.hist[cells] )
+        self.binWidth[cells] *= 2
+
+    def _fit_counts(self, n):
+        """Widens the bin counts to uint32 once a bin could hold more runs than uint16 does."""
+        if n > np.iinfo( self.hist.dtype ).max:
+            self.hist = self.hist.astype( np.uint32 )
+
+    def merge(self, other):
+        """Adds the runs of other (a RunStats of the same series, timesteps and numBins, with bin
+        widths a power of 2 apart) to self. The finer of the two histograms of a cell is coarsened."""
+        if (other.names != self.names) or (other.numTimesteps != self.numTimesteps) or (other.numBins != self.numBins):
+            raise ValueError( "cannot merge RunStats of different series, timesteps or bins." )
+        narrow = np.minimum( self.binWidth, other.binWidth )
+        wide = np.maximum( self.binWidth, other.binWidth )
+        ratio = wide // narrow
+        if (wide % narrow).any() or (ratio & (ratio - 1)).any():
+            raise ValueError( "cannot merge RunStats whose bin widths are not a power of 2 apart." )
+        if other.n == 0:
+            return self
+        otherHist = other.hist
+        otherWidth = other.binWidth
+        if (otherWidth < self.binWidth).any():
+            otherHist = otherHist.copy()
+            otherWidth = otherWidth.copy()
+        while (otherWidth < self.binWidth).any():
+            cells = otherWidth < self.binWidth
+            otherHist[cells] = _merge_bin_pairs( otherHist[cells] )
+            otherWidth[cells] *= 2
+        while (self.binWidth < otherWidth).any():
+            self.coarsen( self.binWidth < otherWidth )
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * (self.n * other.n / n)
+        self.mean += delta * (other.n / n)
+        self.n = n
+        self._fit_counts( n )
+        self.hist += otherHist
+        return self
+
+    def variance(self, ddof=1):
+        """The (len(names) x numTimesteps) variance over the runs."""
+        if self.n <= ddof:
+            return np.full( self.mean.shape, np.nan )
+        return self.m2 / (self.n - ddof)
+
+    def std(self, ddof=1):
+        return np.sqrt( self.variance( ddof ))
+
+    def quantile(self, q, i=None):
+        """The q-quantile over the runs (the lower of two neighbours, as np.quantile method='lower'),
+        of every series, or only of series i, from the histograms: the lower edge of its bin."""
+        hist = self.hist if (i is None) else self.hist[i]
+        binWidth = self.binWidth if (i is None) else self.binWidth[i]
+        if self.n == 0:
+            return np.full( hist.shape[:-1], np.nan )
+        rank = int( np.floor( q * (self.n - 1) ))
+        return np.argmax( np.cumsum( hist, axis=-1 ) > rank, axis=-1 ) * binWidth.astype( np.int64 )
+
+    def summary(self, name, quantiles=DEFAULT_QUANTILES):
+        """The (numTimesteps x (2 + len(quantiles))) mean, std and quantiles of one series."""
+        i = self.names.index( name )
+        return np.column_stack( [ self.mean[i], self.std()[i] ] + [ self.quantile( q, i ) for q in quantiles ] )
+
+## end class RunStats
+
+
+def _merge_bin_pairs(hist):
+    """hist with bins 2j and 2j+1 summed into bin j, and the upper half of the bins empty."""
+    numBins = hist.shape[-1]
+    merged = np.zeros_like( hist )
+    merged[..., : (numBins + 1) // 2 ] = hist[..., 0::2]
+    merged[..., : numBins // 2 ] += hist[..., 1::2]
+    return merged
+
+
+def pop_bins_arg(argv):
+    """Returns (numBins, argv without the --bins=... argument); DEFAULT_NUM_BINS if there is none."""
+    numBins = DEFAULT_NUM_BINS
+    rest = []
+    for arg in argv:
+        if arg.startswith( BINS_ARG_PREFIX ):
+            numBins = int( arg[ len(BINS_ARG_PREFIX) : ] )
+        else:
+            rest.append( arg )
+    return numBins, rest
+
+def merge_run_stats(statsList):
+    """Returns the merge of an iterable of RunStats (the first one is updated)."""
+    merged = None
+    for stats in statsList:
+        merged = stats if (merged is None) else merged.merge( stats )
+    return merged
+
+def save_run_stats(fname, stats):
+    np.savez( fname, names=np.array( stats.names ), n=stats.n, binWidth=stats.binWidth,
+              mean=stats.mean, m2=stats.m2, hist=stats.hist )
+
+def load_run_stats(fname):
+    with np.load( fname ) as data:
+        stats = RunStats( data['mean'].shape[1], data['names'].tolist(), data['hist'].shape[2] )
+        stats.binWidth[...] = data['binWidth']  ## per cell, or one width for all
+        stats.n = int( data['n'] )
+        stats.mean[...] = data['mean']
+        stats.m2[...] = data['m2']
+        stats.hist = data['hist'].copy()  ## uint16 or uint32
+    return stats
+
+def write_summary(fname, summary):
+    np.savetxt( fname, summary, fmt=SUMMARY_FMT, delimiter=',' )
+    return fname
+
+
+def main():
+    if len(sys.argv) < 3:
+        print( USAGE_STR )
+        sys.exit( "Incorrect number of arguments." )
+    ofnamePattern = sys.argv[1]
+    stats = merge_run_stats( load_run_stats( f ) for f in sys.argv[2:] )
+    for name in stats.names:
+        print( "Wrote {}".format( write_summary( ofnamePattern.format( name ), stats.summary( name ))))
+    print( "Done. {} runs.".format( stats.n ))
+    return
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+# filename: util_sampling.py
+# description:
+#   Timestep sampling for the per-timestep analyses, for a quick look
+#   at a run without reading all of its 50001 lines.
+#
+#   A sampling is given on the command line of an analysis as
+#     --sample=<item>[,<item>...]
+#   with items
+#     stride:N         every Nth timestep
+#     window:A:B       timesteps A..B-1 only (B may be left empty)
+#     average:W        average the output over groups of W consecutive
+#                      sampled timesteps, labelled by the first one
+#   e.g. --sample=window:0:10000,stride:10 or --sample=average:100.
+#
+#   Only the sampled lines are parsed: they are located with the line
+#   index (util_lineIndex) and copied into one buffer that is handed
+#   to the bulk tokenizer, so skipped lines are never tokenized. A
+#   compressed file is decompressed as a stream, up to its last sampled
+#   line, keeping only the sampled lines.
+#
+#   Sampled per-timestep outputs carry the (line number) timestep of
+#   each row in an extra first column.
+#--------------------------------------------------------------------
+
+import mmap
+
+import numpy as np
+
+from util_compressedInput import is_compressed, open_input
+from util_edgeTimeline import EdgeTimeline
+from util_lineIndex import load_line_index
+from util_intCsv import format_int_csv
+
+
+SAMPLE_ARG_PREFIX = "--sample="
+
+
+class Sampling:
+    def __init__(self, start=0, stop=None, stride=1, average=None):
+        if (stride < 1) or ((average is not None) and (average < 1)):
+            raise ValueError( "stride and average must be positive." )
+        self.start = start
+        self.stop = stop
+        self.stride = stride
+        self.average = average
+
+    def timesteps(self, numTimesteps):
+        """The sampled timesteps (line numbers) of a run of numTimesteps lines."""
+        return np.arange( numTimesteps )[ self.start : self.stop : self.stride ]
+
+    def reduce(self, rows, timesteps):
+        """Returns (rows, labels) of the output rows of the sampled timesteps: unchanged,
+        or averaged over groups of self.average rows (the last group may be shorter)."""
+        rows = np.asarray( rows )
+        timesteps = np.asarray( timesteps )
+        if (self.average is None) or (len(rows) == 0):
+            return rows, timesteps
+        groupStarts = np.arange( 0, len(rows), self.average )
+        groupSizes = np.diff( np.append( groupStarts, len(rows) ))
+        sums = np.add.reduceat( rows.astype( np.float64 ), groupStarts, axis=0 )
+        sizes = groupSizes.reshape( (-1,) + (1,) * (rows.ndim - 1) )
+        return sums / sizes, timesteps[ groupStarts ]
+
+    def __str__(self):
+        s = "window {}:{}, stride {}".format( self.start, '' if (self.stop is None) else self.stop, self.stride )
+        if self.average is not None:
+            s = s + ", average over {}".format( self.average )
+        return s
+
+## end class Sampling
+
+
+def parse_sampling(spec):
+    """Returns the Sampling of a spec like 'window:0:10000,stride:10' (see header)."""
+    sampling = Sampling()
+    for item in spec.split(','):
+        fields = item.strip().split(':')
+        try:
+            if (fields[0] == 'stride') and (len(fields) == 2):
+                sampling.stride = int( fields[1] )
+            elif (fields[0] == 'window') and (len(fields) == 3):
+                sampling.start = int( fields[1] ) if fields[1] else 0
+                sampling.stop = int( fields[2] ) if fields[2] else None
+            elif (fields[0] == 'average') and (len(fields) == 2):
+                sampling.average = int( fields[1] )
+            else:
+                raise ValueError()
+        except ValueError:
+            raise ValueError( "invalid sampling item '{}' (expected stride:N, window:A:B or average:W).".format( item ))
+    return Sampling( sampling.start, sampling.stop, sampling.stride, sampling.average )
+
+def pop_sampling_arg(argv):
+    """Returns (Sampling or None, argv without the --sample=... argument)."""
+    sampling = None
+    rest = []
+    for arg in argv:
+        if arg.startswith( SAMPLE_ARG_PREFIX ):
+            sampling = parse_sampling( arg[ len(SAMPLE_ARG_PREFIX) : ] )
+        else:
+            rest.append( arg )
+    return sampling, rest
+
+def _gather_lines(buf, index, timesteps):
+    pieces = []
+    for t in timesteps.tolist():
+        line = buf[ index[t] : index[t+1] ]
+        pieces.append( line if line.endswith(b'\n') else line + b'\n' )
+    return b"".join( pieces )
+
+def _gather_lines_of_stream(f, timesteps):
+    """The lines timesteps (sorted) of the binary stream f, read up to the last of them."""
+    pieces = []
+    wanted = iter( timesteps.tolist() )
+    nextT = next( wanted, None )
+    for t, line in enumerate( f ):
+        if nextT is None:
+            break
+        if t == nextT:
+            pieces.append( line if line.endswith(b'\n') else line + b'\n' )
+            nextT = next( wanted, None )
+    return b"".join( pieces )
+
+def load_sampled_timeline(fname, sampling, dialect=None):
+    """Returns (EdgeTimeline, timesteps): the sampled timesteps of fname, parsing only their lines."""
+    index = load_line_index( fname )
+    timesteps = sampling.timesteps( len(index) - 1 )
+    if len(timesteps) == 0:
+        data = b""
+    elif is_compressed( fname ):
+        with open_input( fname, 'rb' ) as f:
+            data = _gather_lines_of_stream( f, timesteps )
+    else:
+        with open(fname, 'rb') as f:
+            with mmap.mmap( f.fileno(), 0, access=mmap.ACCESS_READ ) as mm:
+                data = _gather_lines( mm, index, timesteps )
+    if len(data) == 0:
+        return EdgeTimeline.from_strs( [], dialect ), timesteps
+    return EdgeTimeline.from_bytes( data, dialect ), timesteps
+
+def format_labelled_rows(labels, rows, separator=','):
+    """The CSV text (str) of rows, with each row's timestep label as the first column.
+    Integer rows are written as integers, averaged rows with up to 6 significant digits."""
+    labels = np.asarray( labels )
+    rows = np.asarray( rows ).reshape( len(labels), -1 )
+    if np.issubdtype( rows.dtype, np.integer ):
+        text = format_int_csv( np.column_stack( [labels, rows] )).decode( 'ascii' )
+        return text if (separator == ',') else text.replace( ',', separator )
+    return "".join( separator.join( [ str(t) ] + [ "{:g}".format(x) for x in row ] ) + "\n"
+                    for t, row in zip( labels.tolist(), rows.tolist() ))
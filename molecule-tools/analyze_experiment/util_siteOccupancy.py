@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+# filename: util_siteOccupancy.py
+# description:
+#   Which binding sites of every molecule are bound, for every
+#   timestep, as one (numTimesteps x numMolecules) uint8 array:
+#
+#     occupancy[t, m] bit k set  <=>  site k of molecule m is bound at t
+#
+#   It is built in one vectorized pass over an EdgeTimeline (from the
+#   mol1/bsite1 column of each row; every bond is listed in both
+#   directions, so both ends are covered), after which the per-molecule
+#   site questions are bitwise operations on whole columns:
+#
+#     site_bound(occupancy, k)            -> bool array
+#     all_sites_bound(occupancy, (0, 1))  -> bool array (e.g. "both")
+#     num_sites_bound(occupancy)          -> popcount, uint8 array
+#
+#   Sites 0..7 fit in a uint8. A site holds at most one bond, so
+#   counting set bits counts bound edges.
+#
+#   The array can be written to a .npy and memory-mapped back
+#   (save_occupancy/load_occupancy), or built straight into a slice of
+#   a larger memory-mapped array, e.g. one (runs x T x molecules) file
+#   for a whole experiment (open_occupancy_file).
+#--------------------------------------------------------------------
+# usage:
+#   util_siteOccupancy.py <ifname> [<ofname>] [<numMolecules>]
+#
+#   Writes the occupancy of full_bindingsites.data <ifname> to <ofname>
+#   (default: <ifname>.occupancy.npy).
+#--------------------------------------------------------------------
+
+import sys
+
+import numpy as np
+
+from util_edgeTimeline import EdgeTimeline
+from util_timelineCache import load_timeline
+
+
+OCCUPANCY_SUFFIX = ".occupancy.npy"
+MAX_SITES = 8
+DEFAULT_BLOCK_TIMESTEPS = 1 << 16
+
+POPCOUNT = np.array( [ bin(i).count('1') for i in range(256) ], dtype=np.uint8 )
+
+USAGE_STR = """
+ Usage:
+   util_siteOccupancy.py <ifname> [<ofname>] [<numMolecules>]
+
+   where, <ifname> = (string) name of input bindingsite data file,
+          <ofname> = (string) name of output .npy file (default: <ifname>{}),
+          <numMolecules> = (int) number of molecules (default: 1 + largest molecule ID)
+""".format( OCCUPANCY_SUFFIX )
+
+
+def as_timeline(llist_edges):
+    """Returns llist_edges as an EdgeTimeline (it may also be a list of lists of BindingEdges)."""
+    if isinstance(llist_edges, EdgeTimeline):
+        return llist_edges
+    return EdgeTimeline.from_edge_lists( llist_edges )
+
+def num_molecules_of(timeline):
+    return 1 + int( timeline.edges[:, [0, 2]].max() ) if len(timeline.edges) else 0
+
+def occupancy_block(timeline, start, stop, numMolecules, out=None):
+    """Returns (or fills out with) the (stop-start x numMolecules) occupancy of timesteps [start, stop)."""
+    numTimesteps = stop - start
+    if (out is not None) and not out.flags.c_contiguous:
+        out[...] = occupancy_block( timeline, start, stop, numMolecules )
+        return out
+    if out is None:
+        out = np.zeros( (numTimesteps, numMolecules), dtype=np.uint8 )
+    else:
+        out[...] = 0
+    edges = np.asarray( timeline.edges[ timeline.offsets[start] : timeline.offsets[stop] ] )
+    if len(edges) == 0:
+        return out
+    if edges[:, 1].max() >= MAX_SITES:
+        raise ValueError( "binding site {} does not fit in a uint8 occupancy mask.".format( edges[:, 1].max() ))
+    tOfEdge = np.repeat( np.arange( numTimesteps, dtype=np.int64 ), np.diff( np.asarray( timeline.offsets[ start : stop+1 ] )))
+    cells = tOfEdge * numMolecules + edges[:, 0]
+    flat = out.reshape( -1 )
+    for k in np.unique( edges[:, 1] ).tolist():
+        flat[ cells[ edges[:, 1] == k ] ] |= np.uint8( 1 << k )  ## repeated cells all get the same bit
+    return out
+
+def build_occupancy(llist_edges, numMolecules=None, out=None, blockTimesteps=DEFAULT_BLOCK_TIMESTEPS):
+    """Returns the (numTimesteps x numMolecules) occupancy of an EdgeTimeline (or list of lists of
+    BindingEdges). If out is given (e.g. a slice of a memmap), the occupancy is written into it."""
+    timeline = as_timeline( llist_edges )
+    if numMolecules is None:
+        numMolecules = num_molecules_of( timeline ) if (out is None) else out.shape[1]
+    if out is None:
+        out = np.zeros( (len(timeline), numMolecules), dtype=np.uint8 )
+    for start in range(0, len(timeline), blockTimesteps):
+        stop = min( start + blockTimesteps, len(timeline) )
+        occupancy_block( timeline, start, stop, numMolecules, out=out[ start : stop ] )
+    return out
+
+def open_occupancy_file(fname, shape):
+    """Creates a .npy file of uint8 zeros with the given shape, memory-mapped for writing."""
+    return np.lib.format.open_memmap( fname, mode='w+', dtype=np.uint8, shape=shape )
+
+def save_occupancy(fname, occupancy):
+    np.save( fname, occupancy )
+
+def load_occupancy(fname, mmap_mode='r'):
+    return np.load( fname, mmap_mode=mmap_mode )
+
+
+def site_bound(occupancy, k):
+    """True where site k is bound."""
+    return (occupancy & np.uint8( 1 << k )) != 0
+
+def all_sites_bound(occupancy, sites):
+    """True where every site in sites is bound."""
+    mask = np.uint8( sum( 1 << k for k in sites ))
+    return (occupancy & mask) == mask
+
+def num_sites_bound(occupancy):
+    """The number of bound sites of each molecule (popcount of each mask)."""
+    return POPCOUNT[ occupancy ]
+
+def count_sites_bound(occupancy, sites, axis=None):
+    """The number of molecules with every site in sites bound, summed over axis."""
+    return np.count_nonzero( all_sites_bound( occupancy, sites ), axis=axis )
+
+
+def main():
+    if (len(sys.argv) < 2) or (len(sys.argv) > 4):
+        print( USAGE_STR )
+        sys.exit( "Incorrect number of arguments." )
+    ifname = sys.argv[1]
+    ofname = sys.argv[2] if len(sys.argv) > 2 else ifname + OCCUPANCY_SUFFIX
+    timeline = load_timeline( ifname )
+    numMolecules = int(sys.argv[3]) if len(sys.argv) > 3 else num_molecules_of( timeline )
+
+    occupancy = build_occupancy( timeline, out=open_occupancy_file( ofname, (len(timeline), numMolecules) ))
+    occupancy.flush()
+    print( "Wrote {} x {} occupancy to {}".format( occupancy.shape[0], occupancy.shape[1], ofname ))
+    return
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# filename: util_sizeBins.py
+# description:
+#   Size-class binning of popkins histograms.
+#
+#   A popkins row (see gen_popkinsForChains) has the columns
+#     Free, SingletonA, SingletonB, SingletonAB, 2mer, 3mer, ..., (numRecs-1)mer
+#   so aggregates of s >= 2 receptors are column s+2, and singletons
+#   (s = 1) are columns 1..3.
+#
+#   A bin spec is a comma separated list of size bins, each one of
+#     N        aggregates of exactly N receptors
+#     A-B      aggregates of A..B receptors
+#     A+       aggregates of A or more receptors
+#   optionally followed by =name (the default names are Nmer, A-Bmer
+#   and A+mer). E.g.
+#     2,3,4,5,6-9,10+
+#   Every bin becomes a class (name, startCol, stopCol) summing the
+#   columns [startCol, stopCol) (stopCol None = to the last column).
+#
+#   The classes of several specs are computed together from one
+#   cumulative sum over the columns (bin = cs[stop] - cs[start]), so
+#   any number of binnings come out of a single read of the data.
+#
+#   A bin that starts past the last column of the matrix is an error
+#   (a typo such as 6-90, or fewer receptors than expected); one that
+#   only ends past it is summed up to the last column, with a warning.
+#
+#   DEFAULT_BIN_SPEC reproduces the classes written before bins were
+#   configurable: 2mer..5mer and "6mer" = 6..9 receptors.
+#--------------------------------------------------------------------
+
+import sys
+
+import numpy as np
+
+
+DEFAULT_BIN_SPEC = "2,3,4,5,6-9=6mer"
+SPEC_SEPARATOR = ";"  ## between several specs given as one string
+
+## the classes written before the size bins: (name, startCol, stopCol)
+BASE_CLASSES = [ ('free', 0, 1),
+                 ('singletonsA', 1, 2),
+                 ('singletonsB', 2, 3),
+                 ('singletonsAB', 3, 4) ]
+
+SINGLETON_START_COL = 1
+XMER_BASE_COL = 2  ## column of an aggregate of s >= 2 receptors is s + XMER_BASE_COL
+
+
+def size_to_col(size):
+    """The first popkins column of aggregates of size receptors."""
+    if size < 1:
+        raise ValueError( "aggregate size must be at least 1, got {}.".format( size ))
+    return SINGLETON_START_COL if (size == 1) else (size + XMER_BASE_COL)
+
+def parse_bin(token):
+    """Returns the class (name, startCol, stopCol) of one bin spec item, e.g. '6-9' or '10+=big'."""
+    token = token.strip()
+    name = None
+    if '=' in token:
+        token, name = [ x.strip() for x in token.split('=', 1) ]
+    try:
+        if token.endswith('+'):
+            lo = int( token[:-1] )
+            hi = None
+        elif '-' in token:
+            lo, hi = [ int(x) for x in token.split('-', 1) ]
+        else:
+            lo = hi = int( token )
+    except ValueError:
+        raise ValueError( "invalid size bin '{}' (expected N, A-B or A+).".format( token ))
+    if (hi is not None) and (hi < lo):
+        raise ValueError( "invalid size bin '{}': {} < {}.".format( token, hi, lo ))
+    if name is None:
+        name = "{}mer".format( token )
+    stopCol = None if (hi is None) else (size_to_col( hi ) + (3 if (hi == 1) else 1))
+    return (name, size_to_col( lo ), stopCol)
+
+def parse_bin_spec(spec):
+    """Returns the classes of a bin spec such as '2,3,4,5,6-9,10+'."""
+    return [ parse_bin(token) for token in spec.split(',') if token.strip() ]
+
+def classes_of_bin_specs(specs, base=BASE_CLASSES):
+    """Returns base followed by the classes of every spec (a list, or one string of specs
+    separated by SPEC_SEPARATOR), without repeats."""
+    if isinstance(specs, str):
+        specs = specs.split( SPEC_SEPARATOR )
+    classes = list( base )
+    for spec in specs:
+        for c in parse_bin_spec( spec ):
+            if c in classes:
+                continue
+            if c[0] in [ x[0] for x in classes ]:
+                raise ValueError( "two different size bins are named '{}'.".format( c[0] ))
+            classes.append( c )
+    return classes
+
+def bin_columns(matrix, classes):
+    """Returns the (numRows x len(classes)) sums of each class's columns of matrix,
+    from one cumulative sum over its columns."""
+    matrix = np.asarray( matrix )
+    numCols = matrix.shape[1]
+    cs = np.zeros( (matrix.shape[0], numCols + 1), dtype=np.int64 )
+    np.cumsum( matrix, axis=1, out=cs[:, 1:] )
+    starts = []
+    stops = []
+    for name, startCol, stopCol in classes:
+        if startCol >= numCols:
+            raise ValueError( "size bin '{}' starts at column {}, past the {} columns of the matrix.".format(
+                name, startCol, numCols ))
+        if (stopCol is not None) and (stopCol > numCols):
+            print( "[Warning] size bin '{}' ends at column {}, past the {} columns of the matrix; "
+                   "summing up to the last column.".format( name, stopCol, numCols ), file=sys.stderr )
+            stopCol = numCols
+        starts.append( startCol )
+        stops.append( numCols if (stopCol is None) else stopCol )
+    return cs[:, stops] - cs[:, starts]
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+# filename: util_testFixtures.py
+# description:
+#   Synthetic full_bindingsites.data inputs shared by the unit tests
+#   (test_*.py) and bench_parseTimeline.py.
+#
+#   gen_synthetic_file writes the edges of each line in random order,
+#   as the simulations do, so a component may be listed ligand first.
+#   The LIGAND_FIRST_* lines and rows pin down how singletons are typed
+#   in that case (see classify_aggregate of gen_popkinsForChains.py).
+#--------------------------------------------------------------------
+
+import random
+
+
+## single-receptor components listed ligand first; expected rows (Free..3mer of 40 molecules, 20 receptors)
+## as written by the original gen_popkinsForChains.py, which typed singletons by the sites of cc[0]
+LIGAND_FIRST_LINES = [ "[(21.4,1.1),(1.1,21.4)]",
+                       "[(21.0,1.1),(1.1,21.0)]",
+                       "[(1.0,22.2),(22.2,1.0),(23.1,2.1),(2.1,23.1),(23.0,3.0),(3.0,23.0)]",
+                       "[(24.1,4.0),(4.0,24.1),(4.1,25.2),(25.2,4.1)]" ]
+LIGAND_FIRST_ROWS = [ [19, 0, 0, 0, 0, 0], [19, 1, 0, 0, 0, 0], [17, 1, 0, 0, 2, 0], [19, 0, 1, 0, 0, 0] ]
+LIGAND_FIRST_ROWS_BY_RECEPTOR = [ [19, 0, 1, 0, 0, 0], [19, 0, 1, 0, 0, 0], [17, 1, 0, 0, 2, 0], [19, 0, 0, 1, 0, 0] ]
+
+
+def gen_synthetic_file(fname, numTimesteps=50001, numRecs=20, numLigs=20, seed=0):
+    """Writes a random but well-formed binding sites file: every bond is listed in both directions,
+    in random order."""
+    rng = random.Random( seed )
+    bonds = {}  ## (mol,site) -> (mol,site)
+    with open(fname, 'w') as f:
+        for t in range(0, numTimesteps):
+            if bonds and (rng.random() < 0.3):
+                k = rng.choice( list(bonds.keys()) )
+                bonds.pop( bonds.pop(k) )
+            else:
+                a = (rng.randrange(numRecs), rng.randrange(2))
+                b = (rng.randrange(numRecs, numRecs+numLigs), rng.randrange(4))
+                if (a not in bonds) and (b not in bonds):
+                    bonds[a] = b
+                    bonds[b] = a
+            pairs = list( bonds.items() )
+            rng.shuffle( pairs )
+            edges = [ "({}.{},{}.{})".format( a[0], a[1], b[0], b[1] ) for a, b in pairs ]
+            f.write( "[{}]\n".format( ",".join(edges) ))
+    return
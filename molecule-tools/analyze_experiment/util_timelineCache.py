@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# filename: util_timelineCache.py
+# description:
+#   A persistent cache of parsed binding site timelines.
+#
+#   The first time a full_bindingsites.data file is read, its parsed
+#   EdgeTimeline is written as two .npy files (edges and offsets) plus
+#   a small .meta.json describing the source file. Later reads
+#   memory-map the .npy files instead of re-parsing the text.
+#
+#   A cache entry is keyed by the source file's absolute path, size,
+#   mtime and content hash (and the input dialect it was parsed with):
+#     * same size and mtime         -> entry is used as is,
+#     * same size, different mtime  -> content hash decides,
+#     * anything else               -> entry is rebuilt.
+#
+#   Entries go to one cache directory: the cacheDir argument, else the
+#   BINDINGSITES_CACHE_DIR environment variable, else
+#   $XDG_CACHE_HOME/bindingsites (~/.cache/bindingsites), named
+#   <basename>.<hash of the absolute path>.timeline.*. The least
+#   recently used entries are evicted once the directory grows past
+#   maxCacheBytes (BINDINGSITES_CACHE_MAX_BYTES, default 4 GiB).
+#   Nothing is written next to the source files. The line indexes of
+#   util_lineIndex share the directory and the cap.
+#--------------------------------------------------------------------
+
+import os
+import sys
+import json
+import glob
+import hashlib
+
+import numpy as np
+
+from util_fullBindingSitesParser import get_dialect
+from util_edgeTimeline import EdgeTimeline, detect_dialect_of_file
+from util_parallelParse import parse_file_parallel
+
+
+CACHE_VERSION = 2
+CACHE_SUFFIX = ".timeline"
+CACHE_DIR_ENV = "BINDINGSITES_CACHE_DIR"
+CACHE_MAX_BYTES_ENV = "BINDINGSITES_CACHE_MAX_BYTES"
+DEFAULT_MAX_CACHE_BYTES = 4 * (1024 ** 3)  ## 4 GiB
+DEFAULT_CACHE_SUBDIR = "bindingsites"
+
+HASH_CHUNK_BYTES = 1 << 20
+
+
+def hash_file(fname):
+    """Returns a hex digest of the content of fname."""
+    h = hashlib.blake2b( digest_size=16 )
+    with open(fname, 'rb') as f:
+        for chunk in iter( lambda: f.read(HASH_CHUNK_BYTES), b'' ):
+            h.update( chunk )
+    return h.hexdigest()
+
+def get_cache_dir(cacheDir=None):
+    """Returns cacheDir, or else $BINDINGSITES_CACHE_DIR, or else $XDG_CACHE_HOME/bindingsites."""
+    if cacheDir is None:
+        cacheDir = os.environ.get( CACHE_DIR_ENV ) or None
+    if cacheDir is None:
+        xdgCache = os.environ.get( 'XDG_CACHE_HOME' ) or os.path.join( os.path.expanduser('~'), '.cache' )
+        cacheDir = os.path.join( xdgCache, DEFAULT_CACHE_SUBDIR )
+    return cacheDir
+
+def get_max_cache_bytes(maxCacheBytes=None):
+    if maxCacheBytes is None:
+        maxCacheBytes = int( os.environ.get( CACHE_MAX_BYTES_ENV, DEFAULT_MAX_CACHE_BYTES ))
+    return maxCacheBytes
+
+def get_cache_base(fname, cacheDir=None, suffix=CACHE_SUFFIX):
+    """Returns the path (without extension) of the cache entry of fname, in get_cache_dir(cacheDir)."""
+    absName = os.path.abspath( fname )
+    key = hashlib.sha1( absName.encode() ).hexdigest()[:16]
+    return os.path.join( get_cache_dir( cacheDir ), "{}.{}{}".format( os.path.basename(fname), key, suffix ))
+
+def _entry_paths(base):
+    return (base + ".edges.npy", base + ".offsets.npy", base + ".meta.json")
+
+def _entry_files(base):
+    """Every file of the entry at base (timeline or line index)."""
+    return glob.glob( glob.escape( base ) + ".*" )
+
+def _source_identity(fname):
+    st = os.stat( fname )
+    return { 'source': os.path.abspath(fname), 'size': st.st_size, 'mtime_ns': st.st_mtime_ns }
+
+def _read_meta(metaPath):
+    try:
+        with open(metaPath) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+def _write_json_atomic(path, obj):
+    tmpPath = path + ".tmp"
+    with open(tmpPath, 'w') as f:
+        json.dump( obj, f )
+    os.replace( tmpPath, path )
+
+def _is_entry_valid(fname, base, dialectName):
+    """Checks whether the cache entry at base still describes fname parsed as dialectName."""
+    edgesPath, offsetsPath, metaPath = _entry_paths(base)
+    meta = _read_meta( metaPath )
+    if (meta is None) or (meta.get('version') != CACHE_VERSION) or (meta.get('dialect') != dialectName):
+        return False
+    if not (os.path.exists(edgesPath) and os.path.exists(offsetsPath)):
+        return False
+    ident = _source_identity( fname )
+    if (meta.get('source') != ident['source']) or (meta.get('size') != ident['size']):
+        return False
+    if meta.get('mtime_ns') == ident['mtime_ns']:
+        return True
+    ## the file was touched; only its content can tell if the entry is stale.
+    if meta.get('hash') != hash_file( fname ):
+        return False
+    meta['mtime_ns'] = ident['mtime_ns']
+    _write_json_atomic( metaPath, meta )
+    return True
+
+def read_cache_entry(base):
+    """Loads a cached EdgeTimeline, memory-mapped read-only."""
+    edgesPath, offsetsPath, metaPath = _entry_paths(base)
+    edges = np.load( edgesPath, mmap_mode='r' )
+    offsets = np.load( offsetsPath, mmap_mode='r' )
+    os.utime( metaPath )  ## mark as recently used
+    return EdgeTimeline( edges, offsets )
+
+def write_cache_entry(fname, base, timeline, dialectName):
+    """Writes timeline (fname parsed as dialectName) as the cache entry of fname at base."""
+    edgesPath, offsetsPath, metaPath = _entry_paths(base)
+    meta = _source_identity( fname )
+    meta['version'] = CACHE_VERSION
+    meta['dialect'] = dialectName
+    meta['hash'] = hash_file( fname )
+    for path, a in ((edgesPath, timeline.edges), (offsetsPath, timeline.offsets)):
+        tmpPath = path + ".tmp.npy"
+        np.save( tmpPath, a )
+        os.replace( tmpPath, path )
+    _write_json_atomic( metaPath, meta )  ## written last: marks the entry complete
+    return
+
+def evict_lru(cacheDir, maxCacheBytes):
+    """Removes least recently used entries from cacheDir until it holds at most maxCacheBytes."""
+    entries = []  ## (lastUsed, numBytes, base)
+    totalBytes = 0
+    for metaPath in glob.glob( os.path.join( glob.escape( cacheDir ), "*.meta.json" )):
+        base = metaPath[ :-len(".meta.json") ]
+        numBytes = 0
+        for path in _entry_files(base):
+            numBytes = numBytes + os.path.getsize(path)
+        entries.append( (os.path.getmtime(metaPath), numBytes, base) )
+        totalBytes = totalBytes + numBytes
+    entries.sort()
+    for lastUsed, numBytes, base in entries:
+        if totalBytes <= maxCacheBytes:
+            break
+        for path in _entry_files(base):
+            os.remove(path)
+        totalBytes = totalBytes - numBytes
+    return totalBytes
+
+def load_timeline(fname, dialect=None, cacheDir=None, maxCacheBytes=None, useCache=True, numWorkers=None):
+    """Returns the EdgeTimeline of fname, from the cache if possible.
+    On a miss the file is parsed (by up to numWorkers processes if it is large,
+    see util_parallelParse) and the cache entry (re)written.
+    dialect is a name in DIALECTS (or a Dialect); if None it is detected from the data."""
+    d = detect_dialect_of_file( fname ) if (dialect is None) else get_dialect( dialect )
+    if not useCache:
+        return parse_file_parallel( fname, numWorkers, d )
+    cacheDir = get_cache_dir( cacheDir )
+    maxCacheBytes = get_max_cache_bytes( maxCacheBytes )
+
+    base = get_cache_base( fname, cacheDir )
+    if _is_entry_valid( fname, base, d.name ):
+        return read_cache_entry( base )
+
+    timeline = parse_file_parallel( fname, numWorkers, d )
+    try:
+        os.makedirs( cacheDir, exist_ok=True )
+        write_cache_entry( fname, base, timeline, d.name )
+        evict_lru( cacheDir, maxCacheBytes )
+    except OSError as err:
+        print( "[Warning] could not write timeline cache for {}: {}".format( fname, err ), file=sys.stderr )
+    return timeline